@@ -1,12 +1,73 @@
 import os
+import socket
+import time
+import multiprocessing
 from waitress import serve
-from wsgi import application
+
+from src.main.config import Config
+
+
+def _serve_options():
+    return {
+        "threads": Config.WAITRESS_THREADS,
+        "connection_limit": Config.CONNECTION_LIMIT,
+        "channel_timeout": Config.CHANNEL_TIMEOUT,
+    }
+
+
+def _bind(host, port):
+    sock = socket.socket(socket.AF_INET, socket.SOCK_STREAM)
+    sock.setsockopt(socket.SOL_SOCKET, socket.SO_REUSEADDR, 1)
+    sock.bind((host, port))
+    sock.listen(1024)
+    return sock
+
+
+def _worker(sock):
+    # Each worker builds its own app; background duties elect a single leader between them
+    from wsgi import application
+    print(f"Worker {os.getpid()} serving with {Config.WAITRESS_THREADS} threads.")
+    serve(application, sockets=[sock], **_serve_options())
+
+
+def _run_workers(sock, count):
+    def spawn():
+        p = multiprocessing.Process(target=_worker, args=(sock,), daemon=True)
+        p.start()
+        return p
+
+    workers = [spawn() for _ in range(count)]
+    try:
+        while True:
+            time.sleep(1)
+            for i, p in enumerate(workers):
+                if not p.is_alive():
+                    print(f"Worker {p.pid} exited with code {p.exitcode}; restarting.")
+                    workers[i] = spawn()
+    except KeyboardInterrupt:
+        print("Shutting down workers...")
+    finally:
+        for p in workers:
+            p.terminate()
+        for p in workers:
+            p.join(5)
+        sock.close()
+
 
 if __name__ == "__main__":
+    multiprocessing.freeze_support()
     host = os.getenv("FLASK_HOST", "0.0.0.0")
     port = int(os.getenv("FLASK_PORT", "8080")) # Default to 8080 for production if not set
-    
-    print(f"Starting Production Server on {host}:{port}...")
-    # Threads default is 4, which is reasonable. 
-    # connection_limit default is 75.
-    serve(application, host=host, port=port)
+    processes = max(1, Config.WEB_PROCESSES)
+
+    print(f"Starting Production Server on {host}:{port} ({processes} process(es))...")
+    if processes == 1:
+        from wsgi import application
+        serve(application, host=host, port=port, **_serve_options())
+    else:
+        if Config.SCANNER_MODE != 'remote':
+            print("Note: with several processes only the elected leader opens the scanner; the others "
+                  "refuse to, so live scans and enrolment stay in that process. "
+                  "Run scripts/scanner_service.py and set SCANNER_MODE=remote to share them.")
+        # The listening socket is created once and inherited by every worker
+        _run_workers(_bind(host, port), processes)
@@ -44,6 +44,17 @@ CREATE TABLE IF NOT EXISTS `Users` (
   UNIQUE KEY uniq_user_fingerprint_id (fingerprint_id)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Login index: one row per username across every role
+CREATE TABLE IF NOT EXISTS `Accounts` (
+  id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  username VARCHAR(64) NOT NULL,
+  role ENUM('admin','teacher','student','parent') NOT NULL,
+  person_id INT UNSIGNED NOT NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY uniq_account_username (username),
+  UNIQUE KEY uniq_account_person (role, person_id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- Fingerprint Logs
 CREATE TABLE IF NOT EXISTS `FingerprintLogs` (
   id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
@@ -51,10 +62,45 @@ CREATE TABLE IF NOT EXISTS `FingerprintLogs` (
   person_id INT UNSIGNED NOT NULL,
   log_type ENUM('IN', 'OUT') NOT NULL DEFAULT 'IN',
   timestamp DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  device_index TINYINT UNSIGNED NULL, -- reader (gate lane) that took the scan
   PRIMARY KEY (id),
   KEY idx_logs_person_day (person_type, person_id, timestamp)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Enrolled fingers: one merged template per finger (supersedes Users/Teachers.fingerprint_template)
+CREATE TABLE IF NOT EXISTS `FingerprintTemplates` (
+  id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+  person_type ENUM('student','teacher') NOT NULL,
+  person_id INT UNSIGNED NOT NULL,
+  finger TINYINT UNSIGNED NOT NULL, -- 0-9, see FINGER_NAMES in hardware/fingerprint.py
+  template BLOB NOT NULL,
+  quality TINYINT UNSIGNED NULL, -- weakest cross-match score among the enrolment samples
+  duplicate_of VARCHAR(32) NULL, -- 'student_12': suspected same finger (DUPLICATE_POLICY=flag)
+  duplicate_score TINYINT UNSIGNED NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  PRIMARY KEY (id),
+  UNIQUE KEY uq_templates_person_finger (person_type, person_id, finger)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Scans whose best and second-best people scored within MATCH_MIN_MARGIN (see scripts/ambiguity_report.py)
+CREATE TABLE IF NOT EXISTS `AmbiguousMatches` (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+  device_index TINYINT UNSIGNED NULL,
+  decision ENUM('rejected','flagged') NOT NULL, -- AMBIGUOUS_POLICY at the time: flagged scans were logged
+  best_person_type ENUM('student','teacher') NOT NULL,
+  best_person_id INT UNSIGNED NOT NULL,
+  best_score SMALLINT UNSIGNED NOT NULL,
+  second_person_type ENUM('student','teacher') NOT NULL,
+  second_person_id INT UNSIGNED NOT NULL,
+  second_score SMALLINT UNSIGNED NOT NULL,
+  margin SMALLINT NOT NULL,
+  candidates TEXT NULL, -- JSON [[key, score], ...], best first
+  PRIMARY KEY (id),
+  KEY idx_ambiguous_best (best_person_type, best_person_id, created_at),
+  KEY idx_ambiguous_second (second_person_type, second_person_id, created_at)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- Parents Table
 CREATE TABLE IF NOT EXISTS `Parents` (
   id INT UNSIGNED NOT NULL AUTO_INCREMENT,
@@ -155,6 +201,13 @@ CREATE TABLE IF NOT EXISTS `Settings` (
   UNIQUE KEY uniq_setting_key (`key`)
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Change counter for Settings: bumped with every write, polled by each process's settings cache
+CREATE TABLE IF NOT EXISTS `SettingsVersion` (
+  id TINYINT UNSIGNED NOT NULL,
+  version BIGINT UNSIGNED NOT NULL DEFAULT 0,
+  PRIMARY KEY (id)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- Exam Results Table
 CREATE TABLE IF NOT EXISTS `ExamResults` (
   `id` INT UNSIGNED AUTO_INCREMENT PRIMARY KEY,
@@ -174,9 +227,60 @@ CREATE TABLE IF NOT EXISTS `ExamResults` (
   FOREIGN KEY (`teacher_id`) REFERENCES `Teachers`(`id`) ON DELETE SET NULL
 ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
 
+-- Background Jobs (report generation, PDF exports)
+CREATE TABLE IF NOT EXISTS `Jobs` (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  job_type VARCHAR(64) NOT NULL,
+  params TEXT NULL,
+  status ENUM('queued','running','succeeded','failed') NOT NULL DEFAULT 'queued',
+  progress TINYINT UNSIGNED NOT NULL DEFAULT 0,
+  message VARCHAR(255) NULL,
+  attempts INT UNSIGNED NOT NULL DEFAULT 0,
+  max_attempts INT UNSIGNED NOT NULL DEFAULT 3,
+  owner VARCHAR(64) NULL,
+  result LONGBLOB NULL,
+  result_mimetype VARCHAR(128) NULL,
+  result_filename VARCHAR(255) NULL,
+  error TEXT NULL,
+  run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  started_at DATETIME NULL,
+  finished_at DATETIME NULL,
+  PRIMARY KEY (id),
+  KEY idx_jobs_status_run_after (status, run_after)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
+-- Email Outbox (durable, idempotent report delivery)
+CREATE TABLE IF NOT EXISTS `EmailOutbox` (
+  id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+  recipient VARCHAR(128) NOT NULL,
+  report_key VARCHAR(128) NOT NULL,
+  report_date DATE NOT NULL,
+  subject VARCHAR(255) NOT NULL,
+  body TEXT NOT NULL,
+  attachment LONGBLOB NULL,
+  attachment_filename VARCHAR(255) NULL,
+  status ENUM('queued','sending','sent','failed') NOT NULL DEFAULT 'queued',
+  attempts INT UNSIGNED NOT NULL DEFAULT 0,
+  next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  claim_token CHAR(32) NULL,
+  claimed_at DATETIME NULL,
+  last_error TEXT NULL,
+  created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+  sent_at DATETIME NULL,
+  PRIMARY KEY (id),
+  UNIQUE KEY uniq_outbox_recipient_report (recipient, report_key, report_date),
+  KEY idx_outbox_status_next (status, next_attempt_at),
+  KEY idx_outbox_claim (claim_token)
+) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+
 -- Insert defaults
 INSERT INTO Settings (`key`, `value`)
 VALUES 
 ('send_days', '1,2,3,4,5'),
-('fingerprint_listener_enabled', '1')
+('fingerprint_listener_enabled', '1'),
+('parent_digest_frequency', 'off')
 ON DUPLICATE KEY UPDATE `key`=`key`;
+
+INSERT INTO SettingsVersion (id, version) VALUES (1, 0)
+ON DUPLICATE KEY UPDATE id = id;
@@ -0,0 +1,99 @@
+#!/usr/bin/env python3
+"""
+Per-person ambiguity rates from AmbiguousMatches: how often each person's scans
+(or scans of someone else) came out too close to call, and which pairs get
+confused. People above --redo-rate are the enrolments to redo.
+
+    python scripts/ambiguity_report.py                  # last 30 days
+    python scripts/ambiguity_report.py --days 7 --min-events 2 --redo-rate 0.02
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+from datetime import datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--days", type=int, default=30)
+    parser.add_argument("--min-events", type=int, default=3, help="ignore people with fewer ambiguous scans")
+    parser.add_argument("--redo-rate", type=float, default=0.05, help="ambiguous share of scans that calls for re-enrolment")
+    parser.add_argument("--show", type=int, default=30)
+    args = parser.parse_args()
+
+    from src.main.database import get_db
+
+    since = datetime.now() - timedelta(days=args.days)
+    conn = get_db()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        # Each event counts against both people: either enrolment may be the bad one
+        cursor.execute("""
+            SELECT a.person_type, a.person_id, COUNT(*) AS ambiguous,
+                   SUM(a.as_best) AS as_best, SUM(a.rejected) AS rejected,
+                   COALESCE(u.name, t.name) AS name
+            FROM (
+                SELECT best_person_type AS person_type, best_person_id AS person_id,
+                       1 AS as_best, decision = 'rejected' AS rejected
+                FROM AmbiguousMatches WHERE created_at >= %s
+                UNION ALL
+                SELECT second_person_type, second_person_id, 0, 0
+                FROM AmbiguousMatches WHERE created_at >= %s
+            ) a
+            LEFT JOIN Users u ON a.person_type = 'student' AND u.id = a.person_id
+            LEFT JOIN Teachers t ON a.person_type = 'teacher' AND t.id = a.person_id
+            GROUP BY a.person_type, a.person_id, name
+            HAVING COUNT(*) >= %s
+        """, (since, since, args.min_events))
+        people = cursor.fetchall()
+
+        cursor.execute("""
+            SELECT person_type, person_id, COUNT(*) AS scans
+            FROM FingerprintLogs WHERE timestamp >= %s
+            GROUP BY person_type, person_id
+        """, (since,))
+        scans = {(r['person_type'], r['person_id']): r['scans'] for r in cursor.fetchall()}
+
+        cursor.execute("""
+            SELECT best_person_type, best_person_id, second_person_type, second_person_id,
+                   COUNT(*) AS events, ROUND(AVG(margin), 1) AS avg_margin
+            FROM AmbiguousMatches WHERE created_at >= %s
+            GROUP BY best_person_type, best_person_id, second_person_type, second_person_id
+            ORDER BY events DESC
+            LIMIT %s
+        """, (since, args.show))
+        pairs = cursor.fetchall()
+    finally:
+        conn.close()
+
+    for p in people:
+        # Rejected scans never reached FingerprintLogs, so add them back to the denominator
+        total = scans.get((p['person_type'], p['person_id']), 0) + int(p['rejected'] or 0)
+        p['scans'] = total
+        p['rate'] = p['ambiguous'] / total if total else 1.0
+    people.sort(key=lambda p: (p['rate'], p['ambiguous']), reverse=True)
+
+    print(f"Ambiguous matches since {since:%Y-%m-%d} (people with at least {args.min_events}):")
+    print(f"  {'person':<22} {'name':<28} {'ambig':>6} {'scans':>6} {'rate':>7}")
+    for p in people[:args.show]:
+        flag = "  re-enrol" if p['rate'] >= args.redo_rate else ""
+        print(f"  {p['person_type'] + ' ' + str(p['person_id']):<22} {(p['name'] or '?')[:28]:<28} "
+              f"{p['ambiguous']:>6} {p['scans']:>6} {p['rate']:>6.1%}{flag}")
+    redo = sum(p['rate'] >= args.redo_rate for p in people)
+    print(f"{redo} of {len(people)} people at or above {args.redo_rate:.0%}.")
+
+    if pairs:
+        print("\nMost confused pairs (best -> runner-up):")
+        for r in pairs:
+            print(f"  {r['events']:5}x  {r['best_person_type']} {r['best_person_id']} -> "
+                  f"{r['second_person_type']} {r['second_person_id']}  (avg margin {r['avg_margin']})")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,133 @@
+#!/usr/bin/env python3
+"""
+Finds fingers enrolled for more than one person: matches every stored template
+against every other person's templates, in parallel, and lists pairs scoring at
+or above the duplicate threshold.
+
+    python scripts/audit_duplicate_fingers.py                        # DUPLICATE_THRESHOLD, all CPUs
+    python scripts/audit_duplicate_fingers.py --threshold 60 --workers 4
+    python scripts/audit_duplicate_fingers.py --backend simulator
+
+Exits with status 1 when collisions are found, so it can run from cron.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import time
+from multiprocessing import Pool
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Per worker process: one matcher instance and the template store
+_zk = None
+_templates = None
+_threshold = None
+
+
+def _init_worker(backend, templates, threshold):
+    global _zk, _templates, _threshold
+    os.environ["FINGERPRINT_BACKEND"] = backend
+    from src.main.hardware import fingerprint
+
+    _zk = fingerprint._load_driver()()
+    _zk.Init()
+    _zk.DBInit()  # matching needs the algorithm cache, not an open device
+    _templates = templates
+    _threshold = threshold
+
+
+def _match_row(i):
+    """Matches template i against every later template of a different person."""
+    key, person, template = _templates[i]
+    collisions = []
+    for other_key, other_person, other in _templates[i + 1:]:
+        if other_person == person:
+            continue
+        try:
+            score = _zk.DBMatch(template, other)
+        except Exception:
+            continue
+        if score >= _threshold:
+            collisions.append((key, other_key, score))
+    return collisions
+
+
+def describe(key):
+    """'student_12:1' -> 'student 12 (Right index)', 'student_12' -> 'student 12 (legacy template)'"""
+    from src.main.hardware.fingerprint import FINGER_NAMES, person_label
+
+    finger = key.split(':')[1] if ':' in key else None
+    return f"{person_label(key)} ({FINGER_NAMES[int(finger)] if finger else 'legacy template'})"
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--threshold", type=int, help="duplicate score (default DUPLICATE_THRESHOLD)")
+    parser.add_argument("--workers", type=int, default=os.cpu_count() or 1)
+    parser.add_argument("--backend", choices=("zkfp", "simulator"), help="matcher engine (default FINGERPRINT_BACKEND)")
+    parser.add_argument("--show", type=int, default=50, help="collisions to list")
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["FINGERPRINT_BACKEND"] = args.backend
+    logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "WARNING").upper(), logging.WARNING),
+                        format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
+    from src.main.database import get_db
+    from src.main.hardware import fingerprint
+    from src.main.hardware.fingerprint_listener import fetch_templates
+
+    if fingerprint._load_driver() is None:
+        print("No matcher backend available: install the ZKFinger SDK or use --backend simulator.")
+        sys.exit(2)
+
+    conn = get_db()
+    try:
+        cursor = conn.cursor(dictionary=True)
+        store = fetch_templates(cursor)
+        cursor.execute("SELECT person_type, person_id, finger, duplicate_of, duplicate_score "
+                       "FROM FingerprintTemplates WHERE duplicate_of IS NOT NULL")
+        flagged = cursor.fetchall()
+    finally:
+        conn.close()
+
+    threshold = args.threshold if args.threshold is not None else fingerprint.DUPLICATE_THRESHOLD
+    templates = [(key, key.split(':')[0], bytes(template)) for key, template in sorted(store.items())]
+    pairs = len(templates) * (len(templates) - 1) // 2
+    print(f"Matching {len(templates)} templates ({pairs:,} pairs) at threshold {threshold} "
+          f"with {args.workers} worker(s), {fingerprint.FINGERPRINT_BACKEND} backend.")
+
+    started = time.time()
+    collisions = []
+    with Pool(args.workers, initializer=_init_worker,
+              initargs=(fingerprint.FINGERPRINT_BACKEND, templates, threshold)) as pool:
+        # Row i compares against the n-i-1 rows after it; small chunks keep the workers evenly loaded
+        for found in pool.imap_unordered(_match_row, range(len(templates)), chunksize=8):
+            collisions.extend(found)
+    elapsed = time.time() - started
+    print(f"Done in {elapsed:.1f}s ({pairs / elapsed if elapsed else 0:,.0f} matches/s).")
+
+    collisions.sort(key=lambda c: c[2], reverse=True)
+    people = {key.split(':')[0] for a, b, _ in collisions for key in (a, b)}
+    print(f"\n{len(collisions)} colliding pair(s) involving {len(people)} people:")
+    for a, b, score in collisions[:args.show]:
+        print(f"  {score:4}  {describe(a):<40} {describe(b)}")
+    if len(collisions) > args.show:
+        print(f"  ... {len(collisions) - args.show} more")
+
+    if flagged:
+        print(f"\n{len(flagged)} template(s) flagged at enrolment:")
+        for row in flagged[:args.show]:
+            key = f"{row['person_type']}_{row['person_id']}:{row['finger']}"
+            print(f"  {row['duplicate_score']:4}  {describe(key):<40} {row['duplicate_of'].replace('_', ' ')}")
+
+    sys.exit(1 if collisions else 0)
+
+
+if __name__ == "__main__":
+    main()
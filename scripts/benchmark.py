@@ -0,0 +1,478 @@
+#!/usr/bin/env python3
+"""
+Hot-path benchmarks with regression thresholds. Runs without scanner hardware.
+
+    python scripts/benchmark.py --no-db                         # matcher + PDF only
+    python scripts/benchmark.py --output results.json           # everything (seeded DB)
+    python scripts/benchmark.py --baseline bench_baseline.json  # fail on regressions
+    python scripts/benchmark.py --save-baseline bench_baseline.json
+
+DB benchmarks expect a scratch database seeded with scripts/generate_dataset.py.
+They write attendance logs and outbox rows, and remove them again afterwards.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import json
+import platform
+import queue
+import socketserver
+import statistics
+import threading
+import time
+from datetime import date, datetime, timedelta
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# name -> (function, needs_db)
+BENCHMARKS = {}
+
+
+def benchmark(name, needs_db=False):
+    def decorator(func):
+        BENCHMARKS[name] = (func, needs_db)
+        return func
+    return decorator
+
+
+def timed(fn, repeat, warmup=1):
+    """Calls fn `warmup` times untimed, then `repeat` times; returns per-call seconds."""
+    for _ in range(warmup):
+        fn()
+    samples = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        fn()
+        samples.append(time.perf_counter() - start)
+    return samples
+
+
+def summarize(samples):
+    ordered = sorted(samples)
+    p95 = ordered[min(len(ordered) - 1, int(round(0.95 * (len(ordered) - 1))))]
+    median = statistics.median(ordered)
+    return {
+        "runs": len(ordered),
+        "median_ms": round(median * 1000, 3),
+        "p95_ms": round(p95 * 1000, 3),
+        "min_ms": round(ordered[0] * 1000, 3),
+        "ops_per_sec": round(1 / median, 1) if median else None,
+    }
+
+
+# --- Fixtures ---------------------------------------------------------------
+
+class MockMatcher:
+    """Stands in for ZKFP2: identical templates score 100, anything else scores low."""
+
+    def DBMatch(self, stored, scanned):
+        return 100 if stored == scanned else (stored[0] ^ scanned[0]) % 40
+
+
+def make_scanner(template_count, recent=False):
+    from src.main.hardware import fingerprint as fp
+    from src.main.hardware.recent import RecentMatches
+
+    # Never touch a real device from the benchmark
+    fp._driver_loaded = True
+    fp.ZKFP2 = None
+    scanner = fp.FingerprintScanner()
+    scanner.zk = MockMatcher()
+    if not recent:
+        # The repeated probe would hit the recent-match cache and skip the 1:N search being measured
+        scanner.recent = RecentMatches(ttl=0)
+    scanner.load_users({f"student_{i}": i.to_bytes(4, 'big') * 128 for i in range(template_count)})
+    return scanner
+
+
+class SmtpSink(socketserver.ThreadingTCPServer):
+    """Minimal local SMTP server that accepts and discards every message."""
+    daemon_threads = True
+    allow_reuse_address = True
+
+    def __init__(self):
+        super().__init__(("127.0.0.1", 0), _SmtpSinkHandler)
+        self.messages = 0
+        self.lock = threading.Lock()
+
+    def __enter__(self):
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def __exit__(self, *exc):
+        self.shutdown()
+        self.server_close()
+
+
+class _SmtpSinkHandler(socketserver.StreamRequestHandler):
+    def _reply(self, line):
+        self.wfile.write(line + b"\r\n")
+
+    def handle(self):
+        self._reply(b"220 bench-sink ESMTP")
+        in_data = False
+        while True:
+            line = self.rfile.readline()
+            if not line:
+                return
+            if in_data:
+                if line.rstrip(b"\r\n") == b".":
+                    in_data = False
+                    with self.server.lock:
+                        self.server.messages += 1
+                    self._reply(b"250 OK")
+                continue
+            command = line[:4].upper()
+            if command == b"EHLO":
+                self._reply(b"250-bench-sink")
+                self._reply(b"250 SIZE 104857600")
+            elif command == b"DATA":
+                in_data = True
+                self._reply(b"354 End data with <CR><LF>.<CR><LF>")
+            elif command == b"QUIT":
+                self._reply(b"221 Bye")
+                return
+            else:
+                self._reply(b"250 OK")
+
+
+class DbContext:
+    """Sample ids from the seeded database, shared by the DB benchmarks."""
+
+    def __init__(self):
+        from src.main.database import get_db
+
+        self.get_db = get_db
+        conn = get_db()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            cursor.execute("SELECT class, COUNT(*) AS n FROM Users GROUP BY class ORDER BY n DESC LIMIT 1")
+            row = cursor.fetchone()
+            if not row:
+                raise SystemExit("No students found. Seed the database with scripts/generate_dataset.py first.")
+            self.class_name = row["class"]
+            cursor.execute("SELECT id FROM Users WHERE class = %s ORDER BY id", (self.class_name,))
+            self.class_student_ids = [r["id"] for r in cursor.fetchall()]
+            cursor.execute("SELECT MAX(DATE(timestamp)) AS d FROM FingerprintLogs")
+            self.busy_day = (cursor.fetchone() or {}).get("d") or date.today()
+            cursor.execute("SELECT id FROM Admins ORDER BY id LIMIT 1")
+            self.admin_id = (cursor.fetchone() or {}).get("id")
+            cursor.execute("SELECT id, name FROM Teachers WHERE class = %s ORDER BY id LIMIT 1", (self.class_name,))
+            self.teacher = cursor.fetchone()
+            cursor.execute("SELECT parent_id FROM StudentParents GROUP BY parent_id ORDER BY COUNT(*) DESC, parent_id LIMIT 1")
+            self.parent_id = (cursor.fetchone() or {}).get("parent_id")
+            cursor.execute("SELECT id, name FROM Users WHERE id = %s", (self.class_student_ids[0],))
+            self.student = cursor.fetchone()
+        finally:
+            conn.close()
+        self._app = None
+
+    @property
+    def app(self):
+        if self._app is None:
+            from src.main import create_app
+            from src.main.config import Config
+
+            class BenchConfig(Config):
+                TESTING = True
+                WTF_CSRF_ENABLED = False
+                SCANNER_MODE = 'remote'  # no listener thread in the benchmark process
+                OUTBOX_POLL_SECONDS = 3600
+
+            self._app = create_app(BenchConfig)
+        return self._app
+
+
+# --- Benchmarks -------------------------------------------------------------
+
+def _match_benchmark(count):
+    def run(args, ctx):
+        scanner = make_scanner(count)
+        probe = (count - 1).to_bytes(4, 'big') * 128  # worst case: last template matches
+        return timed(lambda: scanner.match_template(probe), args.repeat)
+    return run
+
+
+for _count in (100, 1000, 5000):
+    benchmark(f"match_template[{_count}]")(_match_benchmark(_count))
+
+
+@benchmark("match_template.recent_hit[5000]")
+def bench_match_recent_hit(args, ctx):
+    # A repeat placement: answered 1:1 from the recent-match cache after the first search
+    scanner = make_scanner(5000, recent=True)
+    probe = (5000 - 1).to_bytes(4, 'big') * 128
+    return timed(lambda: scanner.match_template(probe), args.repeat)
+
+
+@benchmark("pdf.attendance")
+def bench_pdf_attendance(args, ctx):
+    from src.main.utils.pdf import generate_attendance_pdf
+
+    student = {"id": 1, "name": "Bench Student", "class": "Form 1A", "fingerprint_id": None}
+    today = date.today()
+    logs = [{"date": today - timedelta(days=i), "first_scan": datetime.now(), "last_scan": datetime.now(),
+             "scan_count": 2} for i in range(180)]
+    return timed(lambda: generate_attendance_pdf(student, logs), max(3, args.repeat // 10))
+
+
+@benchmark("pdf.class_attendance")
+def bench_pdf_class(args, ctx):
+    from src.main.utils.pdf import generate_class_attendance_pdf
+
+    students = [{"name": f"Student {i}", "status": "Checked In" if i % 3 else "Checked Out"} for i in range(60)]
+    return timed(lambda: generate_class_attendance_pdf("Form 1A", students, date.today()), max(3, args.repeat // 10))
+
+
+@benchmark("pdf.audit_report")
+def bench_pdf_audit(args, ctx):
+    from src.main.utils.pdf import generate_audit_report_pdf
+
+    student = {"id": 1, "name": "Bench Student", "class": "Form 1A"}
+    records = [{"subject_name": f"Subject {i}", "status": "Cleared", "notes": "Returned all textbooks"} for i in range(14)]
+    return timed(lambda: generate_audit_report_pdf(student, records), max(3, args.repeat // 10))
+
+
+@benchmark("pdf.exam_results")
+def bench_pdf_exam(args, ctx):
+    from src.main.utils.pdf import generate_exam_results_pdf
+
+    student = {"id": 1, "name": "Bench Student", "class": "Form 1A"}
+    results = [{"subject_name": f"Subject {i % 8}", "term": f"Term {i // 16 + 1}", "exam_type": "Final",
+                "score": 71.5, "max_score": 100, "grade": "B", "remarks": "Good progress"} for i in range(48)]
+    return timed(lambda: generate_exam_results_pdf(student, results), max(3, args.repeat // 10))
+
+
+@benchmark("attendance_status.per_student", needs_db=True)
+def bench_status_loop(args, ctx):
+    from src.main.utils.common import _get_student_attendance_status
+
+    def run():
+        conn = ctx.get_db()
+        try:
+            cursor = conn.cursor(dictionary=True)
+            for student_id in ctx.class_student_ids:
+                _get_student_attendance_status(cursor, student_id, ctx.busy_day)
+        finally:
+            conn.close()
+    return timed(run, max(3, args.repeat // 10))
+
+
+@benchmark("attendance_status.bulk", needs_db=True)
+def bench_status_bulk(args, ctx):
+    from src.main.utils.common import _get_bulk_attendance_status
+
+    def run():
+        conn = ctx.get_db()
+        try:
+            _get_bulk_attendance_status(conn.cursor(dictionary=True), ctx.class_student_ids, ctx.busy_day)
+        finally:
+            conn.close()
+    return timed(run, max(3, args.repeat // 10))
+
+
+@benchmark("log_fingerprint", needs_db=True)
+def bench_log_fingerprint(args, ctx):
+    from src.main.hardware.fingerprint_listener import FingerprintListener
+
+    listener = FingerprintListener(None, queue.Queue(), scanner=object())
+    conn = ctx.get_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT COALESCE(MAX(id), 0) FROM FingerprintLogs")
+        high_water = cursor.fetchone()[0]
+    finally:
+        conn.close()
+
+    ids = ctx.class_student_ids
+    counter = iter(range(10 ** 9))
+    try:
+        return timed(lambda: listener.log_fingerprint('student', ids[next(counter) % len(ids)]), args.repeat)
+    finally:
+        conn = ctx.get_db()
+        try:
+            conn.cursor().execute("DELETE FROM FingerprintLogs WHERE id > %s", (high_water,))
+            conn.commit()
+        finally:
+            conn.close()
+
+
+def _dashboard_benchmark(path, session_values):
+    def run(args, ctx):
+        values = session_values(ctx)
+        if values is None:
+            print(f"  skipped {path}: no matching user in the dataset", file=sys.stderr)
+            return []
+        client = ctx.app.test_client()
+        with client.session_transaction() as sess:
+            sess.update(values)
+
+        def get():
+            response = client.get(path)
+            if response.status_code != 200:
+                raise RuntimeError(f"{path} returned {response.status_code}")
+        return timed(get, max(3, args.repeat // 5))
+    return run
+
+
+benchmark("dashboard.admin", needs_db=True)(_dashboard_benchmark(
+    "/admin/dashboard", lambda ctx: {"admin_id": ctx.admin_id} if ctx.admin_id else None))
+benchmark("dashboard.teacher", needs_db=True)(_dashboard_benchmark(
+    "/teacher/dashboard",
+    lambda ctx: {"teacher_id": ctx.teacher["id"], "teacher_name": ctx.teacher["name"]} if ctx.teacher else None))
+benchmark("dashboard.parent", needs_db=True)(_dashboard_benchmark(
+    "/parent/dashboard", lambda ctx: {"parent_id": ctx.parent_id} if ctx.parent_id else None))
+benchmark("dashboard.student", needs_db=True)(_dashboard_benchmark(
+    "/student/dashboard",
+    lambda ctx: {"student_id": ctx.student["id"], "student_name": ctx.student["name"]}))
+
+
+@benchmark("generate_and_send_reports", needs_db=True)
+def bench_reports(args, ctx):
+    from src.main.utils import email as email_utils
+    from src.main.utils import outbox
+
+    def clear_outbox():
+        conn = ctx.get_db()
+        try:
+            conn.cursor().execute(
+                "DELETE FROM EmailOutbox WHERE report_date = %s AND report_key LIKE 'class_attendance:%%'",
+                (date.today(),))
+            conn.commit()
+        finally:
+            conn.close()
+
+    conn = ctx.get_db()
+    try:
+        cursor = conn.cursor()
+        cursor.execute("SELECT `value` FROM Settings WHERE `key` = 'send_days'")
+        row = cursor.fetchone()
+        original_send_days = row[0] if row else None
+        cursor.execute("INSERT INTO Settings (`key`, `value`) VALUES ('send_days', '0,1,2,3,4,5,6') "
+                       "ON DUPLICATE KEY UPDATE `value` = '0,1,2,3,4,5,6'")
+        conn.commit()
+    finally:
+        conn.close()
+
+    with SmtpSink() as sink:
+        email_utils.SMTP_HOST, email_utils.SMTP_PORT = sink.server_address
+        email_utils.SMTP_STARTTLS = False
+        email_utils.SMTP_USERNAME = email_utils.SMTP_PASSWORD = None
+        email_utils.SMTP_FROM = "bench@localhost"
+        email_utils.SMTP_MAX_PER_MINUTE = 0
+        outbox.OUTBOX_PER_HOST_PER_MINUTE = 0
+
+        def run():
+            clear_outbox()
+            email_utils.generate_and_send_reports()
+
+        try:
+            samples = timed(run, max(2, args.repeat // 20), warmup=0)
+            print(f"  SMTP sink received {sink.messages} message(s)", file=sys.stderr)
+            return samples
+        finally:
+            clear_outbox()
+            conn = ctx.get_db()
+            try:
+                cursor = conn.cursor()
+                if original_send_days is None:
+                    cursor.execute("DELETE FROM Settings WHERE `key` = 'send_days'")
+                else:
+                    cursor.execute("UPDATE Settings SET `value` = %s WHERE `key` = 'send_days'", (original_send_days,))
+                conn.commit()
+            finally:
+                conn.close()
+
+
+# --- Runner -----------------------------------------------------------------
+
+def compare(results, baseline, default_threshold, overrides):
+    """Returns a list of regression messages (median slower than baseline by more than the threshold)."""
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get("results", {}).get(name)
+        if not base or not result.get("median_ms") or not base.get("median_ms"):
+            continue
+        threshold = overrides.get(name, default_threshold)
+        ratio = result["median_ms"] / base["median_ms"]
+        result["baseline_median_ms"] = base["median_ms"]
+        result["ratio"] = round(ratio, 3)
+        if ratio > 1 + threshold:
+            regressions.append(f"{name}: {result['median_ms']}ms vs baseline {base['median_ms']}ms "
+                               f"(+{(ratio - 1) * 100:.0f}%, allowed +{threshold * 100:.0f}%)")
+    return regressions
+
+
+def parse_overrides(values):
+    overrides = {}
+    for value in values or []:
+        name, _, ratio = value.partition("=")
+        overrides[name] = float(ratio)
+    return overrides
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Run hot-path benchmarks and compare with a baseline.")
+    parser.add_argument("--only", action="append", help="run benchmarks whose name starts with this (repeatable)")
+    parser.add_argument("--no-db", action="store_true", help="skip benchmarks that need a seeded database")
+    parser.add_argument("--repeat", type=int, default=50, help="base number of timed runs per benchmark")
+    parser.add_argument("--output", help="write JSON results here (default: stdout)")
+    parser.add_argument("--baseline", help="baseline JSON to compare against")
+    parser.add_argument("--save-baseline", help="write these results as the new baseline")
+    parser.add_argument("--threshold", type=float, default=0.25,
+                        help="allowed median slowdown vs baseline, as a fraction (default 0.25)")
+    parser.add_argument("--threshold-for", action="append", metavar="NAME=FRACTION",
+                        help="per-benchmark threshold override (repeatable)")
+    args = parser.parse_args()
+
+    selected = [
+        (name, func, needs_db) for name, (func, needs_db) in BENCHMARKS.items()
+        if (not args.only or any(name.startswith(prefix) for prefix in args.only))
+        and not (needs_db and args.no_db)
+    ]
+    ctx = DbContext() if any(needs_db for _, _, needs_db in selected) else None
+
+    results = {}
+    for name, func, _ in selected:
+        print(f"Running {name}...", file=sys.stderr)
+        samples = func(args, ctx)
+        if samples:
+            results[name] = summarize(samples)
+
+    report = {
+        "meta": {
+            "timestamp": datetime.now().isoformat(timespec="seconds"),
+            "python": platform.python_version(),
+            "platform": platform.platform(),
+            "repeat": args.repeat,
+        },
+        "results": results,
+    }
+
+    regressions = []
+    if args.baseline:
+        with open(args.baseline) as f:
+            regressions = compare(results, json.load(f), args.threshold, parse_overrides(args.threshold_for))
+        report["regressions"] = regressions
+
+    text = json.dumps(report, indent=2)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(text + "\n")
+    else:
+        print(text)
+    if args.save_baseline:
+        with open(args.save_baseline, "w") as f:
+            f.write(text + "\n")
+
+    for message in regressions:
+        print(f"REGRESSION {message}", file=sys.stderr)
+    sys.exit(1 if regressions else 0)
+
+
+if __name__ == "__main__":
+    main()
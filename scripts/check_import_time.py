@@ -0,0 +1,78 @@
+#!/usr/bin/env python3
+"""
+Import-time budget check. Imports each entry point in a fresh interpreter and
+fails (exit code 1) if it takes longer than its budget or drags in modules
+that should only load on first use (PDF toolkit, scanner SDK).
+
+    python scripts/check_import_time.py            # default budgets
+    python scripts/check_import_time.py --scale 2  # slower machine
+"""
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# (import statement, budget in seconds)
+ENTRY_POINTS = (
+    ("import src.main", 1.5),
+    ("from src.main.utils.email import generate_and_send_reports", 1.5),
+    ("from src.main.utils.digest import send_parent_digests", 1.5),
+    ("from src.main.hardware.fingerprint import get_scanner", 1.0),
+)
+
+# Must not be imported as a side effect of any entry point above
+LAZY_MODULES = ("reportlab", "pypdf", "zkfp", "pyzkfp")
+
+PROBE = """
+import json, sys, time
+start = time.perf_counter()
+{statement}
+elapsed = time.perf_counter() - start
+loaded = sorted(m for m in {lazy!r} if m in sys.modules)
+print(json.dumps({{"seconds": elapsed, "loaded": loaded}}))
+"""
+
+
+def measure(statement, runs):
+    best = None
+    for _ in range(runs):
+        out = subprocess.run(
+            [sys.executable, "-c", PROBE.format(statement=statement, lazy=LAZY_MODULES)],
+            cwd=ROOT, capture_output=True, text=True, check=True,
+        )
+        result = json.loads(out.stdout.strip().splitlines()[-1])
+        if best is None or result["seconds"] < best["seconds"]:
+            best = result
+    return best
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--scale", type=float, default=1.0, help="multiply every budget by this factor")
+    parser.add_argument("--runs", type=int, default=3, help="take the best of this many runs")
+    args = parser.parse_args()
+
+    failures = 0
+    for statement, budget in ENTRY_POINTS:
+        budget *= args.scale
+        try:
+            result = measure(statement, args.runs)
+        except subprocess.CalledProcessError as e:
+            print(f"FAIL  {statement}\n      import raised:\n{e.stderr}")
+            failures += 1
+            continue
+
+        ok = result["seconds"] <= budget and not result["loaded"]
+        failures += not ok
+        print(f"{'ok  ' if ok else 'FAIL'}  {result['seconds']:.3f}s / {budget:.2f}s  {statement}")
+        if result["loaded"]:
+            print(f"      loaded eagerly: {', '.join(result['loaded'])}")
+
+    sys.exit(1 if failures else 0)
+
+
+if __name__ == "__main__":
+    main()
@@ -6,6 +6,7 @@ import getpass
 import bcrypt
 try:
     from src.main.database import get_db
+    from src.main.utils.accounts import username_taken, register_account
 except Exception as e:
     raise SystemExit("Cannot import get_db from the new src.main layout. Please ensure the new structure exists.") from e
 
@@ -21,9 +22,8 @@ def main():
     try:
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
-        cursor.execute("SELECT id FROM Admins WHERE username = %s", (username,))
-        if cursor.fetchone():
-            print(f"Admin '{username}' already exists.")
+        if username_taken(cursor, username):
+            print(f"Username '{username}' already exists.")
             sys.exit(1)
 
         while True:
@@ -39,6 +39,7 @@ def main():
 
         hashed = bcrypt.hashpw(pw.encode(), bcrypt.gensalt()).decode()
         cursor.execute("INSERT INTO Admins (username, password_hash) VALUES (%s, %s)", (username, hashed))
+        register_account(cursor, username, 'admin', cursor.lastrowid)
         conn.commit()
         print(f"Admin '{username}' created successfully.")
     except Exception as e:
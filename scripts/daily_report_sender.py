@@ -5,6 +5,11 @@ try:
     from src.main.utils.email import generate_and_send_reports
 except Exception:
     from main.utils.email import generate_and_send_reports
+import logging
+
+# .env is loaded by the import above
+logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+                    format="%(asctime)s %(levelname)s %(name)s - %(message)s")
 
 if __name__ == "__main__":
     generate_and_send_reports()
@@ -0,0 +1,412 @@
+#!/usr/bin/env python3
+"""
+Synthetic school dataset for scale testing.
+
+Populates an initialised schema (see init_db.py) with students, classes,
+teachers, parents and links, subjects, timetables, exam results and years of
+FingerprintLogs with realistic arrival/departure curves. Output is
+deterministic for a given --seed and --end-date.
+
+    python scripts/generate_dataset.py --students 2000 --years 2
+    python scripts/generate_dataset.py --students 8000 --years 4 --load-data   # ~10M logs
+
+Every generated account uses the same password (--password). --fingerprints
+stores simulator templates (see src/main/hardware/simulator.py) so the
+generated people can be scanned with FINGERPRINT_BACKEND=simulator.
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import csv
+import random
+import tempfile
+import time
+from datetime import date, datetime, timedelta
+
+import bcrypt
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+FIRST_NAMES = (
+    "Amara", "Kwame", "Chloe", "Tendai", "Liam", "Nia", "Farai", "Grace", "Tinashe", "Noah",
+    "Ruvimbo", "Ethan", "Chipo", "Mason", "Tariro", "Ava", "Kuda", "Olivia", "Tafadzwa", "Lucas",
+    "Rudo", "Emma", "Tatenda", "James", "Nyasha", "Sophia", "Blessing", "Daniel", "Rutendo", "Isaac",
+)
+LAST_NAMES = (
+    "Moyo", "Ncube", "Smith", "Dube", "Sibanda", "Brown", "Mpofu", "Ndlovu", "Chikwanha", "Taylor",
+    "Banda", "Phiri", "Wilson", "Mutasa", "Nkomo", "Johnson", "Gumbo", "Zulu", "Mhlanga", "Clarke",
+)
+SUBJECTS = (
+    "Mathematics", "English Language", "Physics", "Chemistry", "Biology", "History", "Geography",
+    "Computer Science", "Accounting", "Literature", "French", "Art", "Music", "Physical Education",
+    "Economics", "Business Studies", "Agriculture", "Religious Studies",
+)
+FORMS = ("Form 1", "Form 2", "Form 3", "Form 4", "Lower 6", "Upper 6")
+EXAM_TYPES = ("Midterm", "Final")
+TERMS = ("Term 1", "Term 2", "Term 3")
+WEEKDAYS = ("Monday", "Tuesday", "Wednesday", "Thursday", "Friday")
+PERIODS = ((7, 30), (8, 20), (9, 10), (10, 20), (11, 10), (12, 0), (13, 30), (14, 20))
+# School holidays by month/day (start, end) inclusive
+HOLIDAYS = (((4, 10), (5, 5)), ((8, 8), (9, 8)), ((12, 5), (1, 12)))
+
+# Tables emptied by --truncate, children first. Admins and Settings are kept.
+GENERATED_TABLES = (
+    "FingerprintLogs", "FingerprintTemplates", "AmbiguousMatches", "ExamResults", "StudentAudit",
+    "StudentSubjects", "Timetable", "TeacherSubjectAssignments", "StudentParents", "Parents", "Users",
+    "Teachers", "Subjects",
+)
+
+
+def connect(local_infile=False):
+    return mysql.connector.connect(
+        host=os.getenv("DB_HOST", "localhost"),
+        user=os.getenv("DB_USER", "root"),
+        password=os.getenv("DB_PASSWORD", ""),
+        database=os.getenv("DB_NAME", "fpsnsdb"),
+        port=int(os.getenv("DB_PORT", 3306)),
+        allow_local_infile=local_infile,
+    )
+
+
+def insert_many(cursor, conn, sql, rows, batch_size):
+    """executemany in batches, committing each so the undo log stays small."""
+    total = 0
+    batch = []
+    for row in rows:
+        batch.append(row)
+        if len(batch) >= batch_size:
+            cursor.executemany(sql, batch)
+            conn.commit()
+            total += len(batch)
+            batch = []
+    if batch:
+        cursor.executemany(sql, batch)
+        conn.commit()
+        total += len(batch)
+    return total
+
+
+def person_name(rng):
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(LAST_NAMES)}"
+
+
+def is_school_day(day):
+    if day.weekday() >= 5:
+        return False
+    for (sm, sd), (em, ed) in HOLIDAYS:
+        start, end = (sm, sd), (em, ed)
+        key = (day.month, day.day)
+        if start <= end:
+            if start <= key <= end:
+                return False
+        elif key >= start or key <= end:
+            return False
+    return True
+
+
+def clock(rng, mean_minutes, sd_minutes, low, high):
+    """Minutes after midnight drawn from a clipped normal curve."""
+    return min(high, max(low, rng.gauss(mean_minutes, sd_minutes)))
+
+
+def build_school(rng, args):
+    classes = []
+    streams = max(1, -(-args.classes // len(FORMS)))  # round up; the slice below trims the excess
+    for form in FORMS:
+        for s in range(streams):
+            classes.append(f"{form}{chr(ord('A') + s)}")
+    classes = classes[:args.classes] or [f"{FORMS[0]}A"]
+
+    subjects = list(SUBJECTS[:args.subjects])
+    subject_ids = {name: i + 1 for i, name in enumerate(subjects)}
+
+    teachers = []
+    for i in range(len(classes) + args.extra_teachers):
+        tid = i + 1
+        homeroom = classes[i] if i < len(classes) else rng.choice(classes)
+        teachers.append({"id": tid, "name": person_name(rng), "username": f"teacher{tid}",
+                         "email": f"teacher{tid}@school.test", "class": homeroom,
+                         "arrival_bias": rng.gauss(0, 8)})
+
+    students = []
+    for i in range(args.students):
+        sid = i + 1
+        students.append({
+            "id": sid, "name": person_name(rng), "username": f"student{sid}",
+            "class": classes[i % len(classes)],
+            # Per-student habits: attendance rate and how early they tend to arrive
+            "attendance": min(0.995, max(0.6, rng.gauss(0.93, 0.05))),
+            "arrival_bias": rng.gauss(0, 10),
+            "subjects": rng.sample(subjects, min(len(subjects), args.subjects_per_student)),
+        })
+
+    # Families of 1-3 siblings with 1-2 parents each
+    parents, links = [], []
+    i = 0
+    while i < len(students):
+        family = students[i:i + rng.choice((1, 1, 1, 2, 2, 3))]
+        i += len(family)
+        surname = rng.choice(LAST_NAMES)
+        for relationship in ("Mother", "Father")[:rng.choice((1, 2, 2))]:
+            pid = len(parents) + 1
+            parents.append({"id": pid, "name": f"{rng.choice(FIRST_NAMES)} {surname}",
+                            "username": f"parent{pid}", "email": f"parent{pid}@family.test",
+                            "phone": f"+263 77{rng.randint(1000000, 9999999)}"})
+            for child in family:
+                links.append((child["id"], pid, relationship))
+
+    return classes, subjects, subject_ids, teachers, students, parents, links
+
+
+def school_days(end_date, years):
+    day = end_date - timedelta(days=int(365.25 * years))
+    while day <= end_date:
+        if is_school_day(day):
+            yield day
+        day += timedelta(days=1)
+
+
+def fingerprint_log_rows(rng, days, students, teachers):
+    """Yields (person_type, person_id, log_type, timestamp) in time order so ids stay chronological."""
+    for day in days:
+        midnight = datetime.combine(day, datetime.min.time())
+        scans = []
+        for t in teachers:
+            if rng.random() < 0.97:
+                arrive = clock(rng, 6 * 60 + 55 + t["arrival_bias"], 10, 6 * 60, 9 * 60)
+                leave = clock(rng, 16 * 60 + 30, 30, 14 * 60, 19 * 60)
+                scans.append((arrive, 'teacher', t["id"], 'IN'))
+                scans.append((leave, 'teacher', t["id"], 'OUT'))
+        for s in students:
+            if rng.random() >= s["attendance"]:
+                continue
+            # Morning peak around 07:20 with a late tail
+            mean = 7 * 60 + 20 + s["arrival_bias"]
+            arrive = clock(rng, mean, 9, 6 * 60, 8 * 60) if rng.random() > 0.06 else clock(rng, 8 * 60 + 15, 25, 7 * 60 + 45, 10 * 60)
+            scans.append((arrive, 'student', s["id"], 'IN'))
+            if rng.random() < 0.88:
+                # Afternoon curve: end of lessons, then clubs and sport
+                leave = clock(rng, 15 * 60 + 40, 12, 13 * 60, 16 * 60 + 30) if rng.random() < 0.75 else clock(rng, 17 * 60, 30, 16 * 60, 19 * 60)
+                scans.append((leave, 'student', s["id"], 'OUT'))
+        scans.sort()
+        for minutes, person_type, person_id, log_type in scans:
+            ts = midnight + timedelta(minutes=minutes, milliseconds=rng.randint(0, 999))
+            yield (person_type, person_id, log_type, ts.strftime('%Y-%m-%d %H:%M:%S.%f')[:-3])
+
+
+def load_logs_via_infile(cursor, conn, rows, chunk_rows):
+    """Streams rows to temporary CSV files and bulk loads each with LOAD DATA LOCAL INFILE."""
+    total = 0
+    rows = iter(rows)
+    while True:
+        with tempfile.NamedTemporaryFile("w", newline="", suffix=".csv", delete=False) as f:
+            path = f.name
+            writer = csv.writer(f)
+            written = 0
+            for row in rows:
+                writer.writerow(row)
+                written += 1
+                if written >= chunk_rows:
+                    break
+        try:
+            if written:
+                cursor.execute(f"""
+                    LOAD DATA LOCAL INFILE '{path.replace(os.sep, '/')}'
+                    INTO TABLE FingerprintLogs
+                    FIELDS TERMINATED BY ',' OPTIONALLY ENCLOSED BY '"'
+                    LINES TERMINATED BY '\\r\\n'
+                    (person_type, person_id, log_type, timestamp)
+                """)
+                conn.commit()
+                total += written
+                print(f"  ... {total:,} logs")
+        finally:
+            os.remove(path)
+        if written < chunk_rows:
+            return total
+
+
+def truncate(cursor, conn):
+    cursor.execute("SHOW TABLES")
+    existing = {row[0] for row in cursor.fetchall()}
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 0")
+    for table in GENERATED_TABLES:
+        if table not in existing:
+            print(f"  skipping {table} (not migrated)")
+            continue
+        cursor.execute(f"TRUNCATE TABLE `{table}`")
+    cursor.execute("DELETE FROM Accounts WHERE role <> 'admin'")
+    cursor.execute("SET FOREIGN_KEY_CHECKS = 1")
+    conn.commit()
+
+
+def generate(args):
+    rng = random.Random(args.seed)
+    end_date = datetime.strptime(args.end_date, "%Y-%m-%d").date() if args.end_date else date.today()
+    started = time.time()
+
+    classes, subjects, subject_ids, teachers, students, parents, links = build_school(rng, args)
+    password_hash = bcrypt.hashpw(args.password.encode(), bcrypt.gensalt(args.bcrypt_rounds)).decode()
+
+    conn = None
+    try:
+        conn = connect(local_infile=args.load_data)
+        cursor = conn.cursor()
+
+        cursor.execute("SELECT COUNT(*) FROM Users")
+        if cursor.fetchone()[0] and not args.truncate:
+            print("Users is not empty. Re-run with --truncate to replace existing data.")
+            sys.exit(1)
+        if args.truncate:
+            print("Clearing existing data (admins and settings are kept)...")
+            truncate(cursor, conn)
+
+        # Bulk loads run faster without per-row key checks; the generator guarantees consistency
+        cursor.execute("SET unique_checks = 0")
+        cursor.execute("SET foreign_key_checks = 0")
+
+        print(f"Generating {len(students):,} students in {len(classes)} classes, "
+              f"{len(teachers)} teachers, {len(parents):,} parents (seed {args.seed}).")
+        b = args.batch_size
+
+        insert_many(cursor, conn, "INSERT INTO Subjects (id, name) VALUES (%s, %s)",
+                    ((subject_ids[name], name) for name in subjects), b)
+        if args.fingerprints:
+            from src.main.hardware.simulator import synthetic_template
+            template = lambda key: synthetic_template(key, seed=args.seed)
+        else:
+            template = lambda key: None
+        insert_many(cursor, conn,
+                    "INSERT INTO Teachers (id, name, username, email, class, password_hash, fingerprint_template) "
+                    "VALUES (%s, %s, %s, %s, %s, %s, %s)",
+                    ((t["id"], t["name"], t["username"], t["email"], t["class"], password_hash,
+                      template(f"teacher_{t['id']}")) for t in teachers), b)
+        insert_many(cursor, conn,
+                    "INSERT INTO Users (id, name, username, password_hash, class, fingerprint_template) "
+                    "VALUES (%s, %s, %s, %s, %s, %s)",
+                    ((s["id"], s["name"], s["username"], password_hash, s["class"],
+                      template(f"student_{s['id']}")) for s in students), b)
+        insert_many(cursor, conn,
+                    "INSERT INTO Parents (id, name, email, phone, username, password_hash) VALUES (%s, %s, %s, %s, %s, %s)",
+                    ((p["id"], p["name"], p["email"], p["phone"], p["username"], password_hash) for p in parents), b)
+        insert_many(cursor, conn,
+                    "INSERT INTO StudentParents (student_id, parent_id, relationship) VALUES (%s, %s, %s)",
+                    links, b)
+
+        accounts = [(t["username"], 'teacher', t["id"]) for t in teachers]
+        accounts += [(s["username"], 'student', s["id"]) for s in students]
+        accounts += [(p["username"], 'parent', p["id"]) for p in parents]
+        insert_many(cursor, conn, "INSERT INTO Accounts (username, role, person_id) VALUES (%s, %s, %s)", accounts, b)
+
+        # Each class gets a teacher per subject and a weekly timetable
+        subject_teacher = {}
+        assignments = []
+        for class_name in classes:
+            for name in subjects:
+                teacher = rng.choice(teachers)
+                subject_teacher[(class_name, name)] = teacher["id"]
+                assignments.append((teacher["id"], subject_ids[name], class_name))
+        insert_many(cursor, conn,
+                    "INSERT INTO TeacherSubjectAssignments (teacher_id, subject_id, class) VALUES (%s, %s, %s)",
+                    assignments, b)
+
+        timetable = []
+        for class_name in classes:
+            for day in WEEKDAYS:
+                for hour, minute in PERIODS[:args.periods]:
+                    name = rng.choice(subjects)
+                    start = f"{hour:02d}:{minute:02d}:00"
+                    end = f"{hour:02d}:{minute + 45:02d}:00" if minute + 45 < 60 else f"{hour + 1:02d}:{minute - 15:02d}:00"
+                    timetable.append((class_name, subject_ids[name], subject_teacher[(class_name, name)], day, start, end))
+        insert_many(cursor, conn,
+                    "INSERT INTO Timetable (class, subject_id, teacher_id, day_of_week, start_time, end_time) VALUES (%s, %s, %s, %s, %s, %s)",
+                    timetable, b)
+
+        insert_many(cursor, conn, "INSERT INTO StudentSubjects (student_id, subject_id) VALUES (%s, %s)",
+                    ((s["id"], subject_ids[name]) for s in students for name in s["subjects"]), b)
+        insert_many(cursor, conn, "INSERT INTO StudentAudit (student_id, subject_id, status) VALUES (%s, %s, %s)",
+                    ((s["id"], subject_ids[name], rng.choice(('Pending', 'Cleared', 'Cleared', 'Not Cleared')))
+                     for s in students for name in s["subjects"]), b)
+
+        def exam_rows():
+            for s in students:
+                ability = rng.gauss(62, 12)
+                for term in TERMS:
+                    for exam_type in EXAM_TYPES:
+                        for name in s["subjects"]:
+                            score = round(min(100, max(0, rng.gauss(ability, 10))), 2)
+                            grade = 'A' if score >= 75 else 'B' if score >= 65 else 'C' if score >= 50 else 'D' if score >= 40 else 'F'
+                            yield (s["id"], subject_ids[name], subject_teacher[(s["class"], name)],
+                                   exam_type, term, score, 100, grade)
+        count = insert_many(cursor, conn,
+                            "INSERT INTO ExamResults (student_id, subject_id, teacher_id, exam_type, term, score, max_score, grade) "
+                            "VALUES (%s, %s, %s, %s, %s, %s, %s, %s)",
+                            exam_rows(), b)
+        print(f"Inserted {count:,} exam results.")
+
+        # Optional tables added by later migrations
+        for sql, rows in (
+            ("INSERT IGNORE INTO ExamTypes (name) VALUES (%s)", [(t,) for t in EXAM_TYPES]),
+            ("INSERT IGNORE INTO PublishedExams (term, exam_type, is_published) VALUES (%s, %s, 1)",
+             [(term, t) for term in TERMS for t in EXAM_TYPES]),
+        ):
+            try:
+                insert_many(cursor, conn, sql, rows, b)
+            except mysql.connector.Error as e:
+                print(f"Skipped optional table: {e.msg}")
+
+        print(f"Generating {args.years} year(s) of fingerprint logs up to {end_date}...")
+        days = list(school_days(end_date, args.years))
+        rows = fingerprint_log_rows(rng, days, students, teachers)
+        if args.load_data:
+            count = load_logs_via_infile(cursor, conn, rows, args.infile_rows)
+        else:
+            count = insert_many(cursor, conn,
+                                "INSERT INTO FingerprintLogs (person_type, person_id, log_type, timestamp) VALUES (%s, %s, %s, %s)",
+                                rows, b)
+        print(f"Inserted {count:,} fingerprint logs over {len(days)} school days.")
+
+        cursor.execute("SET unique_checks = 1")
+        cursor.execute("SET foreign_key_checks = 1")
+        print(f"Dataset generated in {time.time() - started:.1f}s. All accounts use password '{args.password}'.")
+
+    except mysql.connector.Error as e:
+        print(f"MySQL Error: {e}")
+        sys.exit(1)
+    finally:
+        if conn:
+            conn.close()
+
+
+def main():
+    parser = argparse.ArgumentParser(description="Generate a synthetic school dataset for scale testing.")
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--students", type=int, default=2000)
+    parser.add_argument("--classes", type=int, default=36)
+    parser.add_argument("--extra-teachers", type=int, default=20, help="teachers beyond one homeroom teacher per class")
+    parser.add_argument("--subjects", type=int, default=14, help=f"number of subjects (max {len(SUBJECTS)})")
+    parser.add_argument("--subjects-per-student", type=int, default=8)
+    parser.add_argument("--periods", type=int, default=6, help=f"timetable periods per day (max {len(PERIODS)})")
+    parser.add_argument("--years", type=float, default=2, help="years of attendance history")
+    parser.add_argument("--end-date", help="last day of attendance history, YYYY-MM-DD (default: today)")
+    parser.add_argument("--password", default="password123", help="password for every generated account")
+    parser.add_argument("--bcrypt-rounds", type=int, default=10)
+    parser.add_argument("--batch-size", type=int, default=5000, help="rows per executemany batch")
+    parser.add_argument("--load-data", action="store_true",
+                        help="load FingerprintLogs with LOAD DATA LOCAL INFILE (server needs local_infile=ON)")
+    parser.add_argument("--infile-rows", type=int, default=1000000, help="rows per LOAD DATA file")
+    parser.add_argument("--truncate", action="store_true", help="delete existing generated tables first")
+    parser.add_argument("--fingerprints", action="store_true",
+                        help="store synthetic templates for FINGERPRINT_BACKEND=simulator")
+    args = parser.parse_args()
+    args.subjects = max(1, min(args.subjects, len(SUBJECTS)))
+    args.periods = max(1, min(args.periods, len(PERIODS)))
+    generate(args)
+
+
+if __name__ == "__main__":
+    main()
@@ -63,6 +63,7 @@ def init_db():
             import bcrypt
             pw_hash = bcrypt.hashpw('admin123'.encode(), bcrypt.gensalt()).decode()
             cursor.execute("INSERT INTO Admins (username, password_hash) VALUES (%s, %s)", ('admin', pw_hash))
+            cursor.execute("INSERT INTO Accounts (username, role, person_id) VALUES (%s, 'admin', %s)", ('admin', cursor.lastrowid))
             conn.commit()
             print("Default admin created: admin / admin123")
             
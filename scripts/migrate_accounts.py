@@ -0,0 +1,99 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+# Role tables in priority order: when a username exists in several tables the
+# earliest role (then the lowest id) keeps it and the others are renamed.
+ROLE_TABLES = (
+    ('admin', 'Admins'),
+    ('teacher', 'Teachers'),
+    ('student', 'Users'),
+    ('parent', 'Parents'),
+)
+USERNAME_MAX_LENGTH = 64
+
+
+def _renamed(username, role, person_id, taken):
+    suffix = f"_{role}{person_id}"
+    candidate = username[:USERNAME_MAX_LENGTH - len(suffix)] + suffix
+    n = 2
+    while candidate.lower() in taken:
+        extra = f"{suffix}_{n}"
+        candidate = username[:USERNAME_MAX_LENGTH - len(extra)] + extra
+        n += 1
+    return candidate
+
+
+def migrate():
+    print("Migrating database... Adding Accounts table.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        # Create Accounts Table
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS `Accounts` (
+          id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+          username VARCHAR(64) NOT NULL,
+          role ENUM('admin','teacher','student','parent') NOT NULL,
+          person_id INT UNSIGNED NOT NULL,
+          PRIMARY KEY (id),
+          UNIQUE KEY uniq_account_username (username),
+          UNIQUE KEY uniq_account_person (role, person_id)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        print("Accounts table created/verified.")
+
+        # Existing index rows (from a previous run) keep their usernames
+        cursor.execute("SELECT username, role, person_id FROM Accounts")
+        existing = cursor.fetchall()
+        indexed = {(role, person_id) for _, role, person_id in existing}
+        # utf8mb4 collations compare case-insensitively, so track lowercase
+        taken = {username.lower() for username, _, _ in existing}
+
+        rows = []
+        for role, table in ROLE_TABLES:
+            cursor.execute(f"SELECT id, username FROM `{table}` ORDER BY id")
+            rows.extend((role, table, person_id, username) for person_id, username in cursor.fetchall())
+
+        added = 0
+        renamed = 0
+        for role, table, person_id, username in rows:
+            if (role, person_id) in indexed:
+                continue
+            if username.lower() in taken:
+                new_username = _renamed(username, role, person_id, taken)
+                cursor.execute(f"UPDATE `{table}` SET username = %s WHERE id = %s", (new_username, person_id))
+                print(f"Username '{username}' is already used; {role} #{person_id} renamed to '{new_username}'.")
+                username = new_username
+                renamed += 1
+            cursor.execute(
+                "INSERT INTO Accounts (username, role, person_id) VALUES (%s, %s, %s)",
+                (username, role, person_id)
+            )
+            taken.add(username.lower())
+            added += 1
+
+        conn.commit()
+        print(f"Indexed {added} account(s), renamed {renamed} colliding username(s).")
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
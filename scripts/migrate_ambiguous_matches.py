@@ -0,0 +1,52 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding AmbiguousMatches table.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS `AmbiguousMatches` (
+          id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+          created_at DATETIME(3) NOT NULL DEFAULT CURRENT_TIMESTAMP(3),
+          device_index TINYINT UNSIGNED NULL,
+          decision ENUM('rejected','flagged') NOT NULL,
+          best_person_type ENUM('student','teacher') NOT NULL,
+          best_person_id INT UNSIGNED NOT NULL,
+          best_score SMALLINT UNSIGNED NOT NULL,
+          second_person_type ENUM('student','teacher') NOT NULL,
+          second_person_id INT UNSIGNED NOT NULL,
+          second_score SMALLINT UNSIGNED NOT NULL,
+          margin SMALLINT NOT NULL,
+          candidates TEXT NULL,
+          PRIMARY KEY (id),
+          KEY idx_ambiguous_best (best_person_type, best_person_id, created_at),
+          KEY idx_ambiguous_second (second_person_type, second_person_id, created_at)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        print("AmbiguousMatches table created/verified.")
+        conn.commit()
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,58 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding EmailOutbox table.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        # Create EmailOutbox Table
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS `EmailOutbox` (
+          id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+          recipient VARCHAR(128) NOT NULL,
+          report_key VARCHAR(128) NOT NULL,
+          report_date DATE NOT NULL,
+          subject VARCHAR(255) NOT NULL,
+          body TEXT NOT NULL,
+          attachment LONGBLOB NULL,
+          attachment_filename VARCHAR(255) NULL,
+          status ENUM('queued','sending','sent','failed') NOT NULL DEFAULT 'queued',
+          attempts INT UNSIGNED NOT NULL DEFAULT 0,
+          next_attempt_at DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          claim_token CHAR(32) NULL,
+          claimed_at DATETIME NULL,
+          last_error TEXT NULL,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          sent_at DATETIME NULL,
+          PRIMARY KEY (id),
+          UNIQUE KEY uniq_outbox_recipient_report (recipient, report_key, report_date),
+          KEY idx_outbox_status_next (status, next_attempt_at),
+          KEY idx_outbox_claim (claim_token)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        print("EmailOutbox table created/verified.")
+        conn.commit()
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,48 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding FingerprintTemplates table.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        # Existing single templates stay in Users/Teachers.fingerprint_template and are
+        # used until the person is re-enrolled with three samples per finger
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS `FingerprintTemplates` (
+          id INT UNSIGNED NOT NULL AUTO_INCREMENT,
+          person_type ENUM('student','teacher') NOT NULL,
+          person_id INT UNSIGNED NOT NULL,
+          finger TINYINT UNSIGNED NOT NULL,
+          template BLOB NOT NULL,
+          quality TINYINT UNSIGNED NULL,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          PRIMARY KEY (id),
+          UNIQUE KEY uq_templates_person_finger (person_type, person_id, finger)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        print("FingerprintTemplates table created/verified.")
+        conn.commit()
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,57 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding Jobs table.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        # Create Jobs Table
+        cursor.execute("""
+        CREATE TABLE IF NOT EXISTS `Jobs` (
+          id BIGINT UNSIGNED NOT NULL AUTO_INCREMENT,
+          job_type VARCHAR(64) NOT NULL,
+          params TEXT NULL,
+          status ENUM('queued','running','succeeded','failed') NOT NULL DEFAULT 'queued',
+          progress TINYINT UNSIGNED NOT NULL DEFAULT 0,
+          message VARCHAR(255) NULL,
+          attempts INT UNSIGNED NOT NULL DEFAULT 0,
+          max_attempts INT UNSIGNED NOT NULL DEFAULT 3,
+          owner VARCHAR(64) NULL,
+          result LONGBLOB NULL,
+          result_mimetype VARCHAR(128) NULL,
+          result_filename VARCHAR(255) NULL,
+          error TEXT NULL,
+          run_after DATETIME NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          created_at TIMESTAMP NOT NULL DEFAULT CURRENT_TIMESTAMP,
+          started_at DATETIME NULL,
+          finished_at DATETIME NULL,
+          PRIMARY KEY (id),
+          KEY idx_jobs_status_run_after (status, run_after)
+        ) ENGINE=InnoDB DEFAULT CHARSET=utf8mb4;
+        """)
+        print("Jobs table created/verified.")
+        conn.commit()
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
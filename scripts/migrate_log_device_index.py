@@ -0,0 +1,40 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding device_index to FingerprintLogs.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        cursor.execute("SHOW COLUMNS FROM FingerprintLogs LIKE 'device_index'")
+        if cursor.fetchone():
+            print("'device_index' column already exists.")
+            return
+
+        # Existing rows keep NULL: they predate per-lane capture
+        cursor.execute("ALTER TABLE FingerprintLogs ADD COLUMN device_index TINYINT UNSIGNED NULL AFTER timestamp")
+        conn.commit()
+        print("Column added successfully.")
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,44 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import mysql.connector
+from dotenv import load_dotenv
+
+load_dotenv()
+
+def migrate():
+    print("Migrating database... Adding duplicate flags to FingerprintTemplates.")
+    conn = None
+    try:
+        conn = mysql.connector.connect(
+            host=os.getenv("DB_HOST", "localhost"),
+            user=os.getenv("DB_USER", "root"),
+            password=os.getenv("DB_PASSWORD", ""),
+            database=os.getenv("DB_NAME", "fpsnsdb"),
+            port=int(os.getenv("DB_PORT", 3306))
+        )
+        cursor = conn.cursor()
+
+        cursor.execute("SHOW COLUMNS FROM FingerprintTemplates LIKE 'duplicate_of'")
+        if cursor.fetchone():
+            print("'duplicate_of' column already exists.")
+            return
+
+        # Existing templates are unflagged; run scripts/audit_duplicate_fingers.py to check them
+        cursor.execute("""
+            ALTER TABLE FingerprintTemplates
+              ADD COLUMN duplicate_of VARCHAR(32) NULL AFTER quality,
+              ADD COLUMN duplicate_score TINYINT UNSIGNED NULL AFTER duplicate_of
+        """)
+        conn.commit()
+        print("Columns added successfully.")
+
+    except mysql.connector.Error as e:
+        print(f"Error migrating: {e}")
+    finally:
+        if conn:
+            conn.close()
+
+if __name__ == "__main__":
+    migrate()
@@ -0,0 +1,17 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+try:
+    from src.main.utils.digest import send_parent_digests
+except Exception:
+    from main.utils.digest import send_parent_digests
+import logging
+
+# .env is loaded by the import above
+logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+                    format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
+if __name__ == "__main__":
+    # Optional argument overrides the setting and sends regardless of the day: daily|weekly
+    frequency = sys.argv[1] if len(sys.argv) > 1 else None
+    send_parent_digests(frequency, force=frequency is not None)
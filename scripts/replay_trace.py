@@ -0,0 +1,186 @@
+#!/usr/bin/env python3
+"""
+Replays a scan trace (FINGERPRINT_TRACE_PATH) through the matcher and,
+optionally, the attendance writer, and compares the outcome with what the
+gate recorded.
+
+    python scripts/replay_trace.py gate.trace                        # as fast as possible
+    python scripts/replay_trace.py gate.trace --speed 1              # original timing
+    python scripts/replay_trace.py gate.trace --threshold 70 --backend simulator
+    python scripts/replay_trace.py gate.trace --write --speed 10     # also write logs (scratch DB!)
+
+Templates are loaded from the configured database, so replay against the
+database the trace was recorded on (or a copy of it).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import queue
+import time
+from collections import Counter
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def percentile(values, pct):
+    if not values:
+        return None
+    ordered = sorted(values)
+    return ordered[min(len(ordered) - 1, int(round(pct / 100 * (len(ordered) - 1))))]
+
+
+def latency_line(label, seconds):
+    if not seconds:
+        return f"  {label:<18} -"
+    ms = [s * 1000 for s in seconds]
+    return (f"  {label:<18} p50 {percentile(ms, 50):8.2f} ms   p95 {percentile(ms, 95):8.2f} ms   "
+            f"max {max(ms):8.2f} ms   n={len(ms)}")
+
+
+class Matcher:
+    """Linear DBMatch over the enrolled templates, as FingerprintScanner.match_template does."""
+
+    def __init__(self, driver, templates, threshold):
+        self.zk = driver()
+        self.zk.Init()
+        self.zk.DBInit()  # matching needs the algorithm cache, not an open device
+        self.templates = list(templates.items())
+        self.threshold = threshold
+
+    def match(self, scanned):
+        best_id, best_score = None, 0
+        for uid, stored in self.templates:
+            try:
+                score = self.zk.DBMatch(stored, scanned)
+            except Exception:
+                continue
+            if score > self.threshold and score > best_score:
+                best_id, best_score = uid, score
+        return best_id, best_score
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("trace")
+    parser.add_argument("--speed", type=float, default=0, help="1 = original timing, 10 = ten times faster, 0 = no waiting")
+    parser.add_argument("--threshold", type=int, help="match threshold (default MATCH_THRESHOLD)")
+    parser.add_argument("--backend", choices=("zkfp", "simulator"), help="matcher engine (default FINGERPRINT_BACKEND)")
+    parser.add_argument("--write", action="store_true", help="write replayed matches to FingerprintLogs")
+    parser.add_argument("--debounce", type=float, default=60, help="seconds before the same person is logged again")
+    parser.add_argument("--show", type=int, default=10, help="changed decisions to list")
+    args = parser.parse_args()
+
+    if args.backend:
+        os.environ["FINGERPRINT_BACKEND"] = args.backend
+    os.environ.pop("FINGERPRINT_TRACE_PATH", None)  # never record the replay itself
+    logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "WARNING").upper(), logging.WARNING),
+                        format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
+    from src.main.database import get_db
+    from src.main.hardware import fingerprint
+    from src.main.hardware.fingerprint_listener import FingerprintListener, fetch_templates, parse_person_key
+    from src.main.hardware.trace import read_trace, CAPTURE, MATCH, WRITE, ERROR, CACHE
+
+    driver = fingerprint._load_driver()
+    if driver is None:
+        print("No matcher backend available: install the ZKFinger SDK or use --backend simulator.")
+        sys.exit(1)
+
+    conn = get_db()
+    try:
+        templates = fetch_templates(conn.cursor(dictionary=True))
+    finally:
+        conn.close()
+    threshold = args.threshold if args.threshold is not None else fingerprint.MATCH_THRESHOLD
+    matcher = Matcher(driver, templates, threshold)
+    writer = FingerprintListener(None, queue.Queue(), scanner=None) if args.write else None
+
+    started_epoch, records = read_trace(args.trace)
+    print(f"Replaying {args.trace} (recorded {time.strftime('%Y-%m-%d %H:%M:%S', time.localtime(started_epoch))}) "
+          f"against {len(templates)} templates, threshold {threshold}, {fingerprint.FINGERPRINT_BACKEND} backend.")
+
+    counts = Counter()
+    errors = Counter()
+    decisions = Counter()
+    changed = []
+    recorded_capture, recorded_match, recorded_write = [], [], []
+    replay_match, replay_write = [], []
+    last_logged = {}
+    pending = None  # replayed (at, key, score) awaiting the recorded MATCH record
+    clock = time.perf_counter()
+
+    for rec in records:
+        counts[rec.kind] += 1
+        if args.speed > 0:
+            delay = rec.at / args.speed - (time.perf_counter() - clock)
+            if delay > 0:
+                time.sleep(delay)
+
+        if rec.kind == CAPTURE:
+            recorded_capture.append(rec.seconds)
+            start = time.perf_counter()
+            key, score = matcher.match(rec.template)
+            replay_match.append(time.perf_counter() - start)
+            pending = (rec.at, key, score)
+
+            last = last_logged.get(key)
+            if key and writer and (last is None or rec.at - last >= args.debounce):
+                last_logged[key] = rec.at
+                p_type, p_id = parse_person_key(key)
+                start = time.perf_counter()
+                writer.log_fingerprint(p_type, p_id)
+                replay_write.append(time.perf_counter() - start)
+
+        elif rec.kind == MATCH:
+            recorded_match.append(rec.seconds)
+            if pending is None:
+                continue
+            at, key, score = pending
+            pending = None
+            if key == rec.key:
+                decisions["same" if key else "both unmatched"] += 1
+            else:
+                outcome = "gained" if rec.key is None else "lost" if key is None else "different person"
+                decisions[outcome] += 1
+                if len(changed) < args.show:
+                    changed.append(f"  {at:9.1f}s  recorded {rec.key or '-'} ({rec.score})  "
+                                   f"replayed {key or '-'} ({score})")
+
+        elif rec.kind == WRITE:
+            recorded_write.append(rec.seconds)
+            if not rec.ok:
+                counts["write failures"] += 1
+
+        elif rec.kind == ERROR:
+            errors[f"device {rec.device}: {rec.message}"] += 1
+
+    elapsed = time.perf_counter() - clock
+    print(f"\n{counts[CAPTURE]} captures, {counts[WRITE]} recorded writes "
+          f"({counts['write failures']} failed), {counts[CACHE]} cache reloads, "
+          f"{sum(errors.values())} device errors; replayed in {elapsed:.1f}s.")
+    print("\nDecisions (replay vs recorded):")
+    for outcome in ("same", "both unmatched", "different person", "gained", "lost"):
+        print(f"  {outcome:<18} {decisions[outcome]}")
+    if changed:
+        print("\nChanged decisions:")
+        print("\n".join(changed))
+    print("\nLatency:")
+    print(latency_line("capture (recorded)", recorded_capture))
+    print(latency_line("match (recorded)", recorded_match))
+    print(latency_line("match (replay)", replay_match))
+    print(latency_line("write (recorded)", recorded_write))
+    if writer:
+        print(latency_line("write (replay)", replay_write))
+    if errors:
+        print("\nDevice errors:")
+        for message, n in errors.most_common():
+            print(f"  {n:5}  {message}")
+
+
+if __name__ == "__main__":
+    main()
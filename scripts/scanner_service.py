@@ -0,0 +1,21 @@
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+import logging
+from dotenv import load_dotenv
+
+load_dotenv()
+logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "INFO").upper(), logging.INFO),
+                    format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
+try:
+    from src.main.hardware.scanner_service import ScannerService
+except Exception:
+    from main.hardware.scanner_service import ScannerService
+
+if __name__ == "__main__":
+    # Owns the USB scanner; run the web app with SCANNER_MODE=remote alongside it
+    try:
+        ScannerService().serve_forever()
+    except KeyboardInterrupt:
+        print("Scanner service stopped.")
@@ -0,0 +1,94 @@
+#!/usr/bin/env python3
+"""
+Runs the fingerprint listener against the simulated scanner and the configured
+database, replaying an arrival script, and reports throughput as it goes.
+
+    python scripts/simulate_gate.py                                   # 600 scans over 20 minutes
+    python scripts/simulate_gate.py --script 600/1200 --speed 10      # same, in 2 minutes
+    python scripts/simulate_gate.py --speed 10 --disconnect-every 60  # with a flaky USB cable
+
+Scans are written to FingerprintLogs like real ones: point DB_NAME at a scratch
+database (see generate_dataset.py --fingerprints for enrolled templates).
+"""
+import sys
+import os
+sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import argparse
+import logging
+import queue
+import time
+
+from dotenv import load_dotenv
+
+load_dotenv()
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.strip().splitlines()[0])
+    parser.add_argument("--script", help="arrival script, e.g. 600/1200 or 400/600,200/900")
+    parser.add_argument("--speed", type=float, help="time compression factor")
+    parser.add_argument("--seed", type=int)
+    parser.add_argument("--devices", type=int)
+    parser.add_argument("--disconnect-every", type=float, help="mean seconds between unplugs (0 = never)")
+    parser.add_argument("--disconnect-seconds", type=float, help="how long a device stays unplugged")
+    parser.add_argument("--interval", type=float, default=5, help="seconds between progress lines")
+    parser.add_argument("--grace", type=float, default=15, help="seconds to keep running after the script ends")
+    args = parser.parse_args()
+
+    # The simulator reads its settings at import, so they are set before anything is imported
+    os.environ["FINGERPRINT_BACKEND"] = "simulator"
+    os.environ["SCANNER_MODE"] = "embedded"
+    for flag, name in (("script", "SIMULATOR_SCRIPT"), ("speed", "SIMULATOR_SPEED"), ("seed", "SIMULATOR_SEED"),
+                       ("devices", "SIMULATOR_DEVICES"), ("disconnect_every", "SIMULATOR_DISCONNECT_EVERY_SECONDS"),
+                       ("disconnect_seconds", "SIMULATOR_DISCONNECT_SECONDS")):
+        if getattr(args, flag) is not None:
+            os.environ[name] = str(getattr(args, flag))
+
+    logging.basicConfig(level=getattr(logging, os.getenv("LOG_LEVEL", "WARNING").upper(), logging.WARNING),
+                        format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+
+    from src.main.hardware import simulator
+    from src.main.hardware.fingerprint import get_scanner
+    from src.main.hardware.fingerprint_listener import FingerprintListener
+
+    script_seconds = sum(seconds for _, seconds in simulator.parse_script(simulator.SIMULATOR_SCRIPT))
+    run_for = script_seconds / simulator.SIMULATOR_SPEED + args.grace
+
+    scans = queue.Queue()
+    scanner = get_scanner()
+    listener = FingerprintListener(None, scans, scanner=scanner)
+    listener.start()
+
+    print(f"Replaying '{simulator.SIMULATOR_SCRIPT}' at {simulator.SIMULATOR_SPEED:g}x "
+          f"on {simulator.SIMULATOR_DEVICES} device(s); running for {run_for:.0f}s.")
+    started = time.time()
+    logged = 0
+    next_report = started + args.interval
+    try:
+        while time.time() - started < run_for:
+            try:
+                scans.get(timeout=0.5)
+                logged += 1
+            except queue.Empty:
+                pass
+            if time.time() >= next_report:
+                next_report += args.interval
+                stats = scanner.zk.stats if scanner.zk is not None else {}
+                health = listener.health()
+                elapsed = time.time() - started
+                print(f"{elapsed:6.0f}s  placed {stats.get('placements', 0):5}  logged {logged:5} "
+                      f"({logged / elapsed:5.2f}/s)  unplugs {stats.get('disconnects', 0):3}  "
+                      f"connected {health['connected']!s:5}  down {health['disconnected_seconds']:5.1f}s  "
+                      f"backlog {health['writer_backlog']}")
+    except KeyboardInterrupt:
+        pass
+
+    stats = scanner.zk.stats if scanner.zk is not None else {}
+    print(f"Done: {stats.get('placements', 0)} placements ({stats.get('repeats', 0)} repeats, "
+          f"{stats.get('unknown', 0)} unknown fingers), {logged} logged, "
+          f"{stats.get('disconnects', 0)} disconnects, {stats.get('matches', 0):,} comparisons.")
+
+
+if __name__ == "__main__":
+    main()
@@ -30,6 +30,8 @@ def create_app(config_class=Config):
 
     from .blueprints.parent import parent_bp
     from .blueprints.student import student_bp
+    from .blueprints.jobs import jobs_bp
+    from .blueprints.health import health_bp
 
     # Register blueprints
     app.register_blueprint(main_bp)
@@ -37,6 +39,20 @@ def create_app(config_class=Config):
     app.register_blueprint(teacher_bp, url_prefix='/teacher')
     app.register_blueprint(parent_bp, url_prefix='/parent')
     app.register_blueprint(student_bp, url_prefix='/student')
+    app.register_blueprint(jobs_bp, url_prefix='/jobs')
+    app.register_blueprint(health_bp)
+
+    # Password hashing runs on a bounded pool; when it is full, ask the client to retry
+    from flask import render_template, flash
+    from .utils.passwords import HasherBusy
+
+    @app.errorhandler(HasherBusy)
+    def hasher_busy(e):
+        headers = {"Retry-After": str(e.retry_after)}
+        if request.endpoint == 'main.login':
+            flash(f"The system is busy signing people in. Please try again in {e.retry_after} seconds.", "error")
+            return render_template('login.html'), 503, headers
+        return f"Server busy, please retry in {e.retry_after} seconds.", 503, headers
 
     # Configure logging
     log_level = getattr(logging, app.config["LOG_LEVEL"], logging.INFO)
@@ -59,24 +75,82 @@ def create_app(config_class=Config):
                         format="%(asctime)s %(levelname)s %(name)s - %(message)s",
                         force=True)
 
-    # Start the fingerprint listener
-    from .hardware.fingerprint_listener import FingerprintListener
-    import queue
+    # Open the DB pool and load heavy modules off the startup path
+    import threading
+    from .database import warm_up
+    threading.Thread(target=warm_up, name="warm-up", daemon=True).start()
+
+    # Start the background job dispatcher (reports, PDF exports). In embedded mode jobs that
+    # need the scanner (enrolment) are left to a worker in the process that owns it.
+    from .utils.jobs import JobWorker, get_duty_job_types
+    scanner_jobs = get_duty_job_types('scanner') if app.config["SCANNER_MODE"] != 'remote' else ()
+    job_worker = JobWorker(
+        workers=app.config["JOB_WORKERS"],
+        poll_interval=app.config["JOB_POLL_INTERVAL"],
+        retry_base=app.config["JOB_RETRY_BASE_SECONDS"],
+        stale_after=app.config["JOB_STALE_SECONDS"],
+        exclude_types=scanner_jobs,
+    )
+    job_worker.start()
+
+    # Singleton duties run in one elected process when several share the socket
+    from .utils.leader import run_as_leader
 
-    scan_queue = queue.Queue()
-    fingerprint_thread = FingerprintListener(app, scan_queue)
-    fingerprint_thread.start()
+    # Drain the email outbox so failed report emails are retried
+    from .utils.outbox import OutboxDispatcher
+    outbox_dispatcher = OutboxDispatcher(poll_interval=app.config["OUTBOX_POLL_SECONDS"])
+    run_as_leader('outbox', outbox_dispatcher.start)
 
-    # Create a blueprint for the API
-    from flask import Blueprint, jsonify
+    # Start the fingerprint listener, unless a separate scanner service owns the device
+    from flask import Blueprint, jsonify, request
     api_bp = Blueprint('api', __name__)
 
-    @api_bp.route('/fingerprint_scans')
-    def fingerprint_scans():
-        scans = []
-        while not scan_queue.empty():
-            scans.append(scan_queue.get())
-        return jsonify(scans)
+    if app.config["SCANNER_MODE"] == 'remote':
+        from .hardware.scanner_service import fetch_events
+        last_seq = {"value": 0}
+
+        @api_bp.route('/fingerprint_scans')
+        def fingerprint_scans():
+            # Callers may pass ?after=<seq>; otherwise this process tracks its own cursor
+            after = request.args.get('after', type=int)
+            events, seq = fetch_events(last_seq["value"] if after is None else after)
+            if after is None:
+                last_seq["value"] = seq
+            return jsonify(events)
+    else:
+        from .hardware.fingerprint import require_scanner_ownership, claim_scanner
+        from .hardware.fingerprint_listener import FingerprintListener
+        import queue
+
+        scan_queue = queue.Queue()
+        fingerprint_thread = FingerprintListener(app, scan_queue)
+        # Only the leader opens the device; get_scanner() refuses everywhere else.
+        # Use SCANNER_MODE=remote to share scans across processes
+        require_scanner_ownership()
+
+        def own_scanner():
+            claim_scanner()
+            fingerprint_thread.start()
+            # One at a time: an enrolment holds the readers until its samples are in
+            JobWorker(
+                workers=1,
+                poll_interval=app.config["JOB_POLL_INTERVAL"],
+                retry_base=app.config["JOB_RETRY_BASE_SECONDS"],
+                stale_after=app.config["JOB_STALE_SECONDS"],
+                job_types=scanner_jobs,
+                name="scanner-jobs",
+            ).start()
+
+        scanner_elector = run_as_leader('scanner', own_scanner)
+        app.extensions['fingerprint_listener'] = fingerprint_thread
+        app.extensions['scanner_elector'] = scanner_elector
+
+        @api_bp.route('/fingerprint_scans')
+        def fingerprint_scans():
+            scans = []
+            while not scan_queue.empty():
+                scans.append(scan_queue.get())
+            return jsonify(scans)
 
     app.register_blueprint(api_bp, url_prefix='/api')
 
@@ -1,10 +1,14 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
 from datetime import datetime
-import bcrypt
 import mysql.connector
 from ..database import get_db
 from ..utils.common import _get_student_attendance_status
-from ..utils.email import generate_and_send_reports
+from ..utils.passwords import hash_password
+from ..utils.accounts import username_taken, register_account, remove_account
+from ..utils.jobs import enqueue_job, get_recent_jobs
+from ..utils.outbox import get_outbox_counts
+from ..utils.settings import get_settings, write_setting
+from ..utils import report_jobs  # noqa: F401 - registers the report job handlers
 import logging
 
 logger = logging.getLogger(__name__)
@@ -34,13 +38,11 @@ def admin_dashboard():
         for user in users:
             user["status"] = _get_student_attendance_status(cursor, user["id"], today)
 
-        cursor.execute("SELECT `value` FROM Settings WHERE `key` = 'send_days'")
-        send_days_setting = cursor.fetchone()
-        send_days = send_days_setting['value'].split(',') if send_days_setting else []
-
-        cursor.execute("SELECT `value` FROM `Settings` WHERE `key` = 'fingerprint_listener_enabled'")
-        listener_setting = cursor.fetchone()
-        listener_enabled = listener_setting['value'] == '1' if listener_setting else True
+        settings = get_settings()
+        send_days_setting = settings.get('send_days')
+        send_days = send_days_setting.split(',') if send_days_setting is not None else []
+        listener_enabled = settings.get('fingerprint_listener_enabled', '1') == '1'
+        parent_digest_frequency = settings.get('parent_digest_frequency', 'off')
 
         cursor.execute("SELECT * FROM Parents ORDER BY name")
         parents = cursor.fetchall()
@@ -132,6 +134,9 @@ def admin_dashboard():
         """)
         exam_results = cursor.fetchall()
 
+        recent_jobs = get_recent_jobs(cursor)
+        outbox_counts = get_outbox_counts(cursor)
+
         return render_template(
             "admin_dashboard.html",
             teachers=teachers,
@@ -146,6 +151,7 @@ def admin_dashboard():
             exam_results=exam_results,
             send_days=send_days,
             listener_enabled=listener_enabled,
+            parent_digest_frequency=parent_digest_frequency,
             student_count=student_count,
             teacher_count=teacher_count,
             subject_count=subject_count,
@@ -153,7 +159,9 @@ def admin_dashboard():
             pending_count=pending_count,
             total_audit=total_audit,
             exam_types=exam_types,
-            exam_publishing_list=exam_publishing_list
+            exam_publishing_list=exam_publishing_list,
+            recent_jobs=recent_jobs,
+            outbox_counts=outbox_counts
         )
 
     except mysql.connector.Error as e:
@@ -184,12 +192,12 @@ def send_reports():
         return redirect(url_for("admin.admin_login"))
 
     try:
-        flash("Sending reports... This may take a moment.", "info")
-        generate_and_send_reports()
-        flash("Reports sent successfully!", "success")
+        job_id = enqueue_job('send_reports', owner=f"admin:{session['admin_id']}",
+                             max_attempts=current_app.config["JOB_MAX_ATTEMPTS"])
+        flash(f"Reports queued for sending (job #{job_id}).", "info")
     except Exception as e:
-        logger.exception(f"Error sending reports: {e}")
-        flash(f"An error occurred while sending the reports: {e}", "error")
+        logger.exception(f"Error queueing reports: {e}")
+        flash(f"An error occurred while queueing the reports: {e}", "error")
 
     return redirect(url_for("admin.admin_dashboard"))
 
@@ -208,16 +216,20 @@ def create_teacher():
         flash("Missing fields", "error")
         return redirect(url_for("admin.admin_dashboard"))
 
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    password_hash = hash_password(password)
 
     conn = None
     try:
         conn = get_db()
         cursor = conn.cursor()
+        if username_taken(cursor, username):
+            flash(f"Username '{username}' is already taken", "error")
+            return redirect(url_for("admin.admin_dashboard"))
         cursor.execute(
             "INSERT INTO Teachers (name, username, email, class, password_hash) VALUES (%s, %s, %s, %s, %s)",
             (name, username, email, teacher_class, password_hash)
         )
+        register_account(cursor, username, 'teacher', cursor.lastrowid)
         conn.commit()
         flash("Teacher created successfully!", "success")
         return redirect(url_for("admin.admin_dashboard"))
@@ -246,11 +258,10 @@ def toggle_fingerprint_listener():
         if setting is None or setting['value'] == '0':
             new_value = '1'
 
-        cursor.execute(
-            "INSERT INTO `Settings` (`key`, `value`) VALUES ('fingerprint_listener_enabled', %s) ON DUPLICATE KEY UPDATE `value` = %s",
-            (new_value, new_value)
-        )
+        # The listener subscribes to this key and pauses/resumes within SETTINGS_POLL_SECONDS
+        write_setting(cursor, 'fingerprint_listener_enabled', new_value)
         conn.commit()
+        get_settings().invalidate()
         flash(f"Fingerprint listener {'enabled' if new_value == '1' else 'disabled'}!", "success")
     except mysql.connector.Error as e:
         logger.exception("MySQL Error toggling listener: %s", e)
@@ -268,13 +279,18 @@ def save_settings():
 
     send_days = request.form.getlist("send_days")
     send_days_str = ",".join(send_days)
+    digest_frequency = request.form.get("parent_digest_frequency", "off")
+    if digest_frequency not in ("off", "daily", "weekly"):
+        digest_frequency = "off"
 
     conn = None
     try:
         conn = get_db()
         cursor = conn.cursor()
-        cursor.execute("INSERT INTO Settings (`key`, `value`) VALUES ('send_days', %s) ON DUPLICATE KEY UPDATE `value` = %s", (send_days_str, send_days_str))
+        write_setting(cursor, 'send_days', send_days_str)
+        write_setting(cursor, 'parent_digest_frequency', digest_frequency)
         conn.commit()
+        get_settings().invalidate()
         flash("Settings saved successfully!", "success")
     except mysql.connector.Error as e:
         logger.exception("MySQL Error saving settings: %s", e)
@@ -307,6 +323,8 @@ def delete_student(user_id):
                 logger.warning("Could not delete fingerprint from sensor: %s", e)
 
         cursor.execute("DELETE FROM Users WHERE id = %s", (user_id,))
+        cursor.execute("DELETE FROM FingerprintTemplates WHERE person_type = 'student' AND person_id = %s", (user_id,))
+        remove_account(cursor, 'student', user_id)
         conn.commit()
         flash("Student deleted successfully!", "success")
         return redirect(url_for("admin.admin_dashboard"))
@@ -340,6 +358,8 @@ def delete_teacher(teacher_id):
                 logger.warning("Could not delete fingerprint from sensor: %s", e)
 
         cursor.execute("DELETE FROM Teachers WHERE id = %s", (teacher_id,))
+        cursor.execute("DELETE FROM FingerprintTemplates WHERE person_type = 'teacher' AND person_id = %s", (teacher_id,))
+        remove_account(cursor, 'teacher', teacher_id)
         conn.commit()
         flash("Teacher deleted successfully!", "success")
         return redirect(url_for("admin.admin_dashboard"))
@@ -589,16 +609,20 @@ def create_parent():
         flash("Missing required fields", "error")
         return redirect(url_for("admin.admin_dashboard"))
 
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    password_hash = hash_password(password)
 
     conn = None
     try:
         conn = get_db()
         cursor = conn.cursor()
+        if username_taken(cursor, username):
+            flash(f"Username '{username}' is already taken", "error")
+            return redirect(url_for("admin.admin_dashboard"))
         cursor.execute(
             "INSERT INTO Parents (name, username, email, phone, password_hash) VALUES (%s, %s, %s, %s, %s)",
             (name, username, email, phone, password_hash)
         )
+        register_account(cursor, username, 'parent', cursor.lastrowid)
         conn.commit()
         flash(f"Parent account created successfully! Username: {username}", "success")
         return redirect(url_for("admin.admin_dashboard"))
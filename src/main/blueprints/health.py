@@ -0,0 +1,94 @@
+from flask import Blueprint, jsonify, current_app
+import time
+import mysql.connector
+from ..database import get_db
+from ..utils.passwords import get_password_metrics
+import logging
+
+logger = logging.getLogger(__name__)
+
+health_bp = Blueprint('health', __name__)
+
+
+@health_bp.route('/healthz')
+def healthz():
+    """Liveness: the process is up and serving requests. Touches no dependencies."""
+    return jsonify({"status": "ok"})
+
+
+def _check_db(max_latency_ms):
+    conn = None
+    start = time.perf_counter()
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT 1")
+        cursor.fetchall()
+        latency_ms = round((time.perf_counter() - start) * 1000, 1)
+        ok = not max_latency_ms or latency_ms <= max_latency_ms
+        return {"ok": ok, "latency_ms": latency_ms, "threshold_ms": max_latency_ms}
+    except mysql.connector.Error as e:
+        logger.warning("Readiness DB ping failed: %s", e)
+        return {"ok": False, "error": str(e)}
+    finally:
+        if conn:
+            conn.close()
+
+
+def _scanner_state():
+    """Returns (state, owned_here). Remote mode asks the scanner service."""
+    if current_app.config["SCANNER_MODE"] == 'remote':
+        from ..hardware.scanner_service import fetch_status
+        return fetch_status(), True
+
+    listener = current_app.extensions.get('fingerprint_listener')
+    elector = current_app.extensions.get('scanner_elector')
+    if listener is None:
+        return None, True
+    # Another web process was elected to own the device
+    if elector is not None and not elector.lock.held:
+        return None, False
+    return listener.health(), True
+
+
+def _check_scanner(state, config):
+    if state is None:
+        return {"ok": not config["READY_REQUIRE_SCANNER"], "error": "scanner unavailable"}
+
+    failures = []
+    if config["READY_REQUIRE_SCANNER"] and not state["connected"]:
+        failures.append("device disconnected")
+    if config["READY_MIN_CACHE_SIZE"] and state["cache_size"] < config["READY_MIN_CACHE_SIZE"]:
+        failures.append("template cache below minimum")
+    cache_age = state.get("last_cache_refresh_age_seconds")
+    if config["READY_MAX_CACHE_AGE_SECONDS"] and state["running"] and (
+            cache_age is None or cache_age > config["READY_MAX_CACHE_AGE_SECONDS"]):
+        failures.append("template cache stale")
+    scan_age = state.get("last_write_age_seconds")
+    if config["READY_MAX_SCAN_AGE_SECONDS"] and (scan_age is None or scan_age > config["READY_MAX_SCAN_AGE_SECONDS"]):
+        failures.append("no recent scan written")
+    if config["READY_MAX_WRITER_BACKLOG"] and state["writer_backlog"] > config["READY_MAX_WRITER_BACKLOG"]:
+        failures.append("attendance writer backlog")
+
+    return dict(state, ok=not failures, failures=failures)
+
+
+@health_bp.route('/readyz')
+def readyz():
+    """Readiness: DB round trip and scanner/matcher/writer state against configured thresholds."""
+    config = current_app.config
+    checks = {"database": _check_db(config["READY_DB_LATENCY_MS"])}
+
+    state, owned_here = _scanner_state()
+    if owned_here:
+        checks["scanner"] = _check_scanner(state, config)
+    else:
+        checks["scanner"] = {"ok": True, "skipped": "owned by another process"}
+
+    ready = all(check["ok"] for check in checks.values())
+    body = {
+        "status": "ready" if ready else "not ready",
+        "checks": checks,
+        "password_pool": get_password_metrics(),
+    }
+    return jsonify(body), 200 if ready else 503
@@ -0,0 +1,200 @@
+import io
+from flask import (Blueprint, request, redirect, url_for, session, flash, jsonify, current_app, render_template,
+                   send_file)
+import mysql.connector
+from datetime import datetime
+from ..database import get_db
+from ..utils.jobs import enqueue_job, get_job, get_job_roles
+from ..utils import report_jobs  # noqa: F401 - registers the report job handlers
+from ..utils import enrollment_jobs  # noqa: F401 - registers the fingerprint enrolment handler
+import logging
+
+logger = logging.getLogger(__name__)
+
+jobs_bp = Blueprint('jobs', __name__)
+
+ROLE_SESSION_KEYS = (
+    ('admin', 'admin_id'),
+    ('teacher', 'teacher_id'),
+    ('parent', 'parent_id'),
+    ('student', 'student_id'),
+)
+
+
+def _current_owner():
+    """Returns (role, 'role:id') for the logged in user, or (None, None)."""
+    for role, key in ROLE_SESSION_KEYS:
+        if key in session:
+            return role, f"{role}:{session[key]}"
+    return None, None
+
+
+def _teacher_can_report_class(teacher_id, class_name):
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("""
+            SELECT id FROM Teachers WHERE id = %s AND class = %s
+            UNION
+            SELECT teacher_id FROM TeacherSubjectAssignments WHERE teacher_id = %s AND class = %s
+        """, (teacher_id, class_name, teacher_id, class_name))
+        return cursor.fetchone() is not None
+    finally:
+        if conn:
+            conn.close()
+
+
+def _teacher_can_enroll_student(teacher_id, student_id):
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute("SELECT class FROM Users WHERE id = %s", (student_id,))
+        row = cursor.fetchone()
+    finally:
+        if conn:
+            conn.close()
+    return row is not None and _teacher_can_report_class(teacher_id, row[0])
+
+
+def queue_download(job_type, params):
+    """
+    Queues an export for the logged in user and sends them to the page that waits for
+    it. Used by dashboard download links after they have checked access themselves.
+    """
+    _, owner = _current_owner()
+    job_id = enqueue_job(job_type, params, owner=owner, max_attempts=current_app.config["JOB_MAX_ATTEMPTS"])
+    return redirect(url_for("jobs.job_wait", job_id=job_id))
+
+
+def _wants_json():
+    return request.is_json or request.accept_mimetypes.best == 'application/json'
+
+
+@jobs_bp.route('/<job_type>', methods=['POST'])
+def enqueue(job_type):
+    role, owner = _current_owner()
+    if role is None:
+        return redirect(url_for("main.login"))
+
+    allowed_roles = get_job_roles(job_type)
+    if allowed_roles is None or role not in allowed_roles:
+        return jsonify({"error": "Not allowed"}), 403
+
+    params = request.get_json(silent=True) if request.is_json else request.form.to_dict()
+    params = {k: v for k, v in (params or {}).items() if k != 'csrf_token' and v != ''}
+    if not request.is_json and len(request.form.getlist('fingers')) > 1:
+        params['fingers'] = ",".join(request.form.getlist('fingers'))
+    max_attempts = current_app.config["JOB_MAX_ATTEMPTS"]
+
+    try:
+        if job_type == 'class_report':
+            if not params.get('class_name'):
+                return jsonify({"error": "class_name is required"}), 400
+            if params.get('date'):
+                try:
+                    datetime.strptime(params['date'], "%Y-%m-%d")
+                except ValueError:
+                    return jsonify({"error": "date must be YYYY-MM-DD"}), 400
+            if role == 'teacher' and not _teacher_can_report_class(session['teacher_id'], params['class_name']):
+                return jsonify({"error": "Not allowed"}), 403
+        elif job_type == 'enroll_fingerprint':
+            if params.get('person_type') not in ('student', 'teacher') or not str(params.get('person_id', '')).isdigit():
+                return jsonify({"error": "person_type and person_id are required"}), 400
+            try:
+                enrollment_jobs.parse_fingers(params.get('fingers', '1'))
+            except ValueError as e:
+                return jsonify({"error": str(e)}), 400
+            if role == 'teacher' and (params['person_type'] != 'student' or
+                                      not _teacher_can_enroll_student(session['teacher_id'], params['person_id'])):
+                return jsonify({"error": "Not allowed"}), 403
+            # Someone has to be at the scanner: a failed enrolment is redone by hand, not retried later
+            max_attempts = 1
+
+        job_id = enqueue_job(job_type, params, owner=owner, max_attempts=max_attempts)
+    except mysql.connector.Error as e:
+        logger.exception("Could not enqueue %s job: %s", job_type, e)
+        if _wants_json():
+            return jsonify({"error": "Could not queue job"}), 500
+        flash(f"Could not queue job: {e}", "error")
+        return redirect(request.referrer or url_for("main.home"))
+
+    if _wants_json():
+        return jsonify({
+            "id": job_id,
+            "status_url": url_for("jobs.job_status", job_id=job_id),
+            "download_url": url_for("jobs.job_download", job_id=job_id),
+        }), 202
+
+    flash(f"Job #{job_id} queued. It will appear under recent jobs when finished.", "info")
+    return redirect(request.referrer or url_for("main.home"))
+
+
+def _load_owned_job(job_id, include_result=False):
+    role, owner = _current_owner()
+    if role is None:
+        return None, (jsonify({"error": "Login required"}), 401)
+
+    job = get_job(job_id, include_result=include_result)
+    if not job or (role != 'admin' and job['owner'] != owner):
+        return None, (jsonify({"error": "Job not found"}), 404)
+    return job, None
+
+
+@jobs_bp.route('/<int:job_id>')
+def job_status(job_id):
+    try:
+        job, error = _load_owned_job(job_id)
+    except mysql.connector.Error as e:
+        logger.exception("MySQL Error reading job %s: %s", job_id, e)
+        return jsonify({"error": "Database error"}), 500
+    if error:
+        return error
+
+    return jsonify({
+        "id": job["id"],
+        "type": job["job_type"],
+        "status": job["status"],
+        "progress": job["progress"],
+        "message": job["message"],
+        "attempts": job["attempts"],
+        "max_attempts": job["max_attempts"],
+        "error": job["error"],
+        "created_at": job["created_at"].isoformat() if job["created_at"] else None,
+        "started_at": job["started_at"].isoformat() if job["started_at"] else None,
+        "finished_at": job["finished_at"].isoformat() if job["finished_at"] else None,
+        "download_url": url_for("jobs.job_download", job_id=job_id) if job["result_filename"] else None,
+    })
+
+
+@jobs_bp.route('/<int:job_id>/wait')
+def job_wait(job_id):
+    """Polls the job and starts the download when it is ready."""
+    try:
+        job, error = _load_owned_job(job_id)
+    except mysql.connector.Error as e:
+        logger.exception("MySQL Error reading job %s: %s", job_id, e)
+        flash("Database error", "error")
+        return redirect(url_for("main.home"))
+    if error:
+        return error
+    return render_template('job_wait.html', job=job, back_url=request.referrer or url_for("main.home"))
+
+
+@jobs_bp.route('/<int:job_id>/download')
+def job_download(job_id):
+    try:
+        job, error = _load_owned_job(job_id, include_result=True)
+    except mysql.connector.Error as e:
+        logger.exception("MySQL Error reading job %s: %s", job_id, e)
+        return jsonify({"error": "Database error"}), 500
+    if error:
+        return error
+
+    if job["status"] != 'succeeded' or job["result"] is None:
+        return jsonify({"error": "Result not available", "status": job["status"]}), 409
+
+    # send_file quotes the name (and adds a UTF-8 filename*), whatever class or student it came from
+    return send_file(io.BytesIO(bytes(job["result"])), mimetype=job["result_mimetype"] or 'application/octet-stream',
+                     as_attachment=True, download_name=job["result_filename"])
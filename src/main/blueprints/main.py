@@ -1,7 +1,8 @@
 from flask import Blueprint, render_template, request, redirect, url_for, session, flash
-import bcrypt
 import mysql.connector
 from ..database import get_db
+from ..utils.accounts import find_account, update_password_hash
+from ..utils.passwords import HasherBusy, hash_password, verify_password, needs_rehash
 import logging
 
 logger = logging.getLogger(__name__)
@@ -29,40 +30,33 @@ def login():
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
         
-        # Check admin credentials
-        cursor.execute("SELECT * FROM Admins WHERE username = %s", (username,))
-        admin = cursor.fetchone()
-        
-        if admin and bcrypt.checkpw(password.encode(), admin["password_hash"].encode()):
-            session["admin_id"] = admin["id"]
-            return redirect(url_for("admin.admin_dashboard"))
-        
-        # Check teacher credentials
-        cursor.execute("SELECT * FROM Teachers WHERE username = %s", (username,))
-        teacher = cursor.fetchone()
-        
-        if teacher and bcrypt.checkpw(password.encode(), teacher["password_hash"].encode()):
-            session["teacher_id"] = teacher["id"]
-            session["teacher_name"] = teacher["name"]
-            return redirect(url_for("teacher.teacher_dashboard"))
-        
-        # Check student credentials
-        cursor.execute("SELECT * FROM Users WHERE username = %s", (username,))
-        student = cursor.fetchone()
-        
-        if student and student.get("password_hash") and bcrypt.checkpw(password.encode(), student["password_hash"].encode()):
-            session["student_id"] = student["id"]
-            session["student_name"] = student["name"]
-            return redirect(url_for("student.student_dashboard"))
-        
-        # Check parent credentials
-        cursor.execute("SELECT * FROM Parents WHERE username = %s", (username,))
-        parent = cursor.fetchone()
-        
-        if parent and bcrypt.checkpw(password.encode(), parent["password_hash"].encode()):
-            session["parent_id"] = parent["id"]
-            return redirect(url_for("parent.parent_dashboard"))
-        
+        # One indexed lookup resolves the username to its role and id
+        account = find_account(cursor, username)
+
+        if account and verify_password(password, account["password_hash"]):
+            role = account["role"]
+            if needs_rehash(account["password_hash"]):
+                # Upgrade to the configured work factor; skip it if the pool is saturated
+                try:
+                    update_password_hash(cursor, role, account["person_id"], hash_password(password))
+                    conn.commit()
+                except HasherBusy:
+                    pass
+            if role == 'admin':
+                session["admin_id"] = account["person_id"]
+                return redirect(url_for("admin.admin_dashboard"))
+            if role == 'teacher':
+                session["teacher_id"] = account["person_id"]
+                session["teacher_name"] = account["name"]
+                return redirect(url_for("teacher.teacher_dashboard"))
+            if role == 'student':
+                session["student_id"] = account["person_id"]
+                session["student_name"] = account["name"]
+                return redirect(url_for("student.student_dashboard"))
+            if role == 'parent':
+                session["parent_id"] = account["person_id"]
+                return redirect(url_for("parent.parent_dashboard"))
+
         # No matching credentials found
         flash("Invalid username or password", "error")
         return redirect(url_for("main.login"))
@@ -1,10 +1,10 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
+from collections import defaultdict
 from datetime import datetime, timedelta
-import bcrypt
 import mysql.connector
 from ..database import get_db
-from ..utils.common import _get_student_attendance_status
-from ..utils.pdf import generate_exam_results_pdf
+from ..utils.common import _get_bulk_attendance_status
+from .jobs import queue_download
 import logging
 
 logger = logging.getLogger(__name__)
@@ -42,54 +42,74 @@ def parent_dashboard():
         """, (session["parent_id"],))
         children = cursor.fetchall()
 
-        # For each child, get today's status and recent attendance
-        for child in children:
-            child["status"] = _get_student_attendance_status(cursor, child["id"], today)
-            
-            # Get attendance for last 7 days
-            cursor.execute("""
-                SELECT DATE(timestamp) as date, COUNT(*) as scan_count
+        # Load every child's data with one query per section rather than per child
+        child_ids = [child["id"] for child in children]
+        child_classes = sorted({child["class"] for child in children})
+        statuses = _get_bulk_attendance_status(cursor, child_ids, today)
+        recent_attendance = defaultdict(list)
+        audits = defaultdict(list)
+        timetables = defaultdict(list)
+        results = defaultdict(list)
+
+        if child_ids:
+            id_placeholders = ','.join(['%s'] * len(child_ids))
+
+            # Attendance for last 7 days
+            cursor.execute(f"""
+                SELECT person_id, DATE(timestamp) as date, COUNT(*) as scan_count
                 FROM FingerprintLogs
-                WHERE person_type = 'student' AND person_id = %s
-                AND DATE(timestamp) >= %s
-                GROUP BY DATE(timestamp)
+                WHERE person_type = 'student' AND person_id IN ({id_placeholders})
+                AND timestamp >= %s
+                GROUP BY person_id, DATE(timestamp)
                 ORDER BY date DESC
-            """, (child["id"], seven_days_ago))
-            child["recent_attendance"] = cursor.fetchall()
+            """, (*child_ids, datetime.combine(seven_days_ago, datetime.min.time())))
+            for row in cursor.fetchall():
+                recent_attendance[row["person_id"]].append(row)
 
-            # Get all enrolled subjects and clearance status
-            cursor.execute("""
-                SELECT s.name as subject_name, sa.status, sa.notes
+            # All enrolled subjects and clearance status
+            cursor.execute(f"""
+                SELECT ss.student_id, s.name as subject_name, sa.status, sa.notes
                 FROM StudentSubjects ss
                 JOIN Subjects s ON ss.subject_id = s.id
                 LEFT JOIN StudentAudit sa ON (ss.student_id = sa.student_id AND ss.subject_id = sa.subject_id)
-                WHERE ss.student_id = %s
+                WHERE ss.student_id IN ({id_placeholders})
                 ORDER BY s.name
-            """, (child["id"],))
-            child["audits"] = cursor.fetchall()
-
-            # Get timetable for child's class
-            cursor.execute("""
-                SELECT t.day_of_week, s.name as subject_name, t.start_time, t.end_time, te.name as teacher_name
+            """, tuple(child_ids))
+            for row in cursor.fetchall():
+                audits[row["student_id"]].append(row)
+
+            # Timetables for the children's classes
+            class_placeholders = ','.join(['%s'] * len(child_classes))
+            cursor.execute(f"""
+                SELECT t.class, t.day_of_week, s.name as subject_name, t.start_time, t.end_time, te.name as teacher_name
                 FROM Timetable t
                 JOIN Subjects s ON t.subject_id = s.id
                 LEFT JOIN Teachers te ON t.teacher_id = te.id
-                WHERE t.class = %s
+                WHERE t.class IN ({class_placeholders})
                 ORDER BY FIELD(t.day_of_week, 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday', 'Sunday'), t.start_time
-            """, (child["class"],))
-            child["timetable"] = cursor.fetchall()
+            """, tuple(child_classes))
+            for row in cursor.fetchall():
+                timetables[row["class"]].append(row)
 
-            # Get Exam Results
-            cursor.execute("""
-                SELECT er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks, te.name as teacher_name
+            # Published exam results
+            cursor.execute(f"""
+                SELECT er.student_id, er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks, te.name as teacher_name
                 FROM ExamResults er
                 JOIN Subjects s ON er.subject_id = s.id
                 LEFT JOIN Teachers te ON er.teacher_id = te.id
                 JOIN PublishedExams pe ON (er.term = pe.term AND er.exam_type = pe.exam_type)
-                WHERE er.student_id = %s AND pe.is_published = 1
+                WHERE er.student_id IN ({id_placeholders}) AND pe.is_published = 1
                 ORDER BY er.term DESC, er.exam_type ASC
-            """, (child["id"],))
-            child["results"] = cursor.fetchall()
+            """, tuple(child_ids))
+            for row in cursor.fetchall():
+                results[row["student_id"]].append(row)
+
+        for child in children:
+            child["status"] = statuses.get(child["id"], "Checked Out")
+            child["recent_attendance"] = recent_attendance[child["id"]]
+            child["audits"] = audits[child["id"]]
+            child["timetable"] = timetables[child["class"]]
+            child["results"] = results[child["id"]]
 
         return render_template("parent_dashboard.html", parent_info=parent_info, children=children)
 
@@ -124,42 +144,7 @@ def child_results_pdf(student_id):
             flash("Unauthorized access.", "error")
             return redirect(url_for("parent.parent_dashboard"))
 
-        # Student info
-        cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
-        student = cursor.fetchone()
-
-        # Build dynamic query for Exam Results
-        query = """
-            SELECT er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks
-            FROM ExamResults er
-            JOIN Subjects s ON er.subject_id = s.id
-            WHERE er.student_id = %s
-        """
-        params = [student_id]
-        
-        if term:
-            query += " AND er.term = %s"
-            params.append(term)
-        if exam_type:
-            query += " AND er.exam_type = %s"
-            params.append(exam_type)
-            
-        query += " ORDER BY er.term DESC, er.exam_type ASC"
-        
-        cursor.execute(query, tuple(params))
-        exam_results = cursor.fetchall()
-
-        pdf_content = generate_exam_results_pdf(student, exam_results)
-
-        filename = f"results_{student['name'].replace(' ', '_')}"
-        if term: filename += f"_{term.replace(' ', '_')}"
-        if exam_type: filename += f"_{exam_type.replace(' ', '_')}"
-
-        return Response(
-            pdf_content,
-            mimetype="application/pdf",
-            headers={"Content-disposition": f"attachment; filename={filename}.pdf"}
-        )
+        return queue_download('exam_results_pdf', {"student_id": student_id, "term": term, "exam_type": exam_type})
     except Exception as e:
         logger.exception("Error generating parent results PDF: %s", e)
         flash("Could not generate PDF.", "error")
@@ -195,22 +180,8 @@ def child_audit_pdf(student_id):
             flash("You are not authorized to view this child's record.", "error")
             return redirect(url_for("parent.parent_dashboard"))
 
-        cursor.execute("""
-            SELECT s.name as subject_name, sa.status, sa.notes
-            FROM StudentAudit sa
-            JOIN Subjects s ON sa.subject_id = s.id
-            WHERE sa.student_id = %s
-            ORDER BY s.name
-        """, (student_id,))
-        audit_records = cursor.fetchall()
-
-        from ..utils.pdf import generate_audit_report_pdf
-        pdf_data = generate_audit_report_pdf(student, audit_records)
-
-        from flask import Response
-        response = Response(pdf_data, mimetype='application/pdf')
-        response.headers['Content-Disposition'] = f'attachment; filename=child_clearance_{student_id}.pdf'
-        return response
+        return queue_download('student_audit_pdf', {"student_id": student_id,
+                                                    "filename": f"child_clearance_{student_id}.pdf"})
 
     except mysql.connector.Error as e:
         logger.exception("MySQL Error generating child audit PDF: %s", e)
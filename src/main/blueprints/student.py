@@ -1,9 +1,8 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
-import bcrypt
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash
 import mysql.connector
 from ..database import get_db
 from ..utils.common import _get_student_attendance_status
-from ..utils.pdf import generate_exam_results_pdf
+from .jobs import queue_download
 from datetime import datetime
 import logging
 
@@ -111,54 +110,17 @@ def download_results():
     term = request.args.get("term")
     exam_type = request.args.get("exam_type")
     
-    conn = None
-    try:
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-
-        # Student info
-        cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
-        student = cursor.fetchone()
+    filename = f"exam_results_{student_id}"
+    if term: filename += f"_{term.replace(' ', '_')}"
+    if exam_type: filename += f"_{exam_type.replace(' ', '_')}"
 
-        # Build dynamic query for Exam Results
-        query = """
-            SELECT er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks
-            FROM ExamResults er
-            JOIN Subjects s ON er.subject_id = s.id
-            WHERE er.student_id = %s
-        """
-        params = [student_id]
-        
-        if term:
-            query += " AND er.term = %s"
-            params.append(term)
-        if exam_type:
-            query += " AND er.exam_type = %s"
-            params.append(exam_type)
-            
-        query += " ORDER BY er.term DESC, er.exam_type ASC"
-        
-        cursor.execute(query, tuple(params))
-        exam_results = cursor.fetchall()
-
-        pdf_content = generate_exam_results_pdf(student, exam_results)
-
-        filename = f"exam_results_{student_id}"
-        if term: filename += f"_{term.replace(' ', '_')}"
-        if exam_type: filename += f"_{exam_type.replace(' ', '_')}"
-
-        return Response(
-            pdf_content,
-            mimetype="application/pdf",
-            headers={"Content-disposition": f"attachment; filename={filename}.pdf"}
-        )
+    try:
+        return queue_download('exam_results_pdf', {"student_id": student_id, "term": term,
+                                                   "exam_type": exam_type, "filename": f"{filename}.pdf"})
     except Exception as e:
-        logger.exception("Error generating results PDF: %s", e)
+        logger.exception("Error queueing results PDF: %s", e)
         flash("Could not generate PDF.", "error")
         return redirect(url_for("student.student_dashboard"))
-    finally:
-        if conn:
-            conn.close()
 
 
 @student_bp.route('/logout')
@@ -203,36 +165,10 @@ def my_audit_pdf():
     if "student_id" not in session:
         return redirect(url_for("student.student_login"))
 
-    student_id = session["student_id"]
-    conn = None
     try:
-        conn = get_db()
-        cursor = conn.cursor(dictionary=True)
-
-        cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
-        student = cursor.fetchone()
-
-        cursor.execute("""
-            SELECT s.name as subject_name, sa.status, sa.notes
-            FROM StudentAudit sa
-            JOIN Subjects s ON sa.subject_id = s.id
-            WHERE sa.student_id = %s
-            ORDER BY s.name
-        """, (student_id,))
-        audit_records = cursor.fetchall()
-
-        from ..utils.pdf import generate_audit_report_pdf
-        pdf_data = generate_audit_report_pdf(student, audit_records)
-
-        from flask import Response
-        response = Response(pdf_data, mimetype='application/pdf')
-        response.headers['Content-Disposition'] = 'attachment; filename=my_clearance.pdf'
-        return response
-
+        return queue_download('student_audit_pdf', {"student_id": session["student_id"],
+                                                    "filename": "my_clearance.pdf"})
     except mysql.connector.Error as e:
-        logger.exception("MySQL Error generating student audit PDF: %s", e)
+        logger.exception("MySQL Error queueing student audit PDF: %s", e)
         flash(f"Database error: {e}", "error")
         return redirect(url_for("student.student_dashboard"))
-    finally:
-        if conn:
-            conn.close()
@@ -1,10 +1,13 @@
-from flask import Blueprint, render_template, request, redirect, url_for, session, flash, Response
+from flask import Blueprint, render_template, request, redirect, url_for, session, flash, current_app
 from datetime import datetime
-import bcrypt
 import mysql.connector
 from ..database import get_db
 from ..utils.common import _get_student_attendance_status
-from ..utils.pdf import generate_attendance_pdf, generate_exam_results_pdf
+from ..utils.passwords import hash_password
+from ..utils.accounts import username_taken, register_account
+from ..utils.jobs import enqueue_job
+from .jobs import queue_download
+from ..hardware.fingerprint import FINGER_NAMES
 import logging
 
 logger = logging.getLogger(__name__)
@@ -134,7 +137,8 @@ def teacher_dashboard():
                                timetables=timetables,
                                teachers=teachers_list,
                                exam_results=exam_results,
-                               exam_types=exam_types)
+                               exam_types=exam_types,
+                               finger_names=FINGER_NAMES)
 
     except mysql.connector.Error as e:
         logger.exception("MySQL Error on teacher dashboard: %s", e)
@@ -169,16 +173,20 @@ def create_parent():
         flash("Missing required fields", "error")
         return redirect(url_for("teacher.teacher_dashboard"))
 
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    password_hash = hash_password(password)
 
     conn = None
     try:
         conn = get_db()
         cursor = conn.cursor()
+        if username_taken(cursor, username):
+            flash(f"Username '{username}' is already taken", "error")
+            return redirect(url_for("teacher.teacher_dashboard"))
         cursor.execute(
             "INSERT INTO Parents (name, username, email, phone, password_hash) VALUES (%s, %s, %s, %s, %s)",
             (name, username, email, phone, password_hash)
         )
+        register_account(cursor, username, 'parent', cursor.lastrowid)
         conn.commit()
         flash(f"Parent account created successfully! Username: {username}", "success")
         return redirect(url_for("teacher.teacher_dashboard"))
@@ -205,35 +213,37 @@ def create_student():
         flash("Missing required fields", "error")
         return redirect(url_for("teacher.teacher_dashboard"))
 
-    password_hash = bcrypt.hashpw(password.encode(), bcrypt.gensalt()).decode()
+    password_hash = hash_password(password)
 
     conn = None
     try:
         conn = get_db()
         cursor = conn.cursor()
+        if username_taken(cursor, username):
+            flash(f"Username '{username}' is already taken", "error")
+            return redirect(url_for("teacher.teacher_dashboard"))
         cursor.execute(
             "INSERT INTO Users (name, username, class, password_hash) VALUES (%s, %s, %s, %s)",
             (name, username, class_, password_hash)
         )
-        conn.commit()
         user_id = cursor.lastrowid
+        register_account(cursor, username, 'student', user_id)
+        conn.commit()
         flash(f"Student account created successfully! Username: {username}", "success")
 
         if fingerprint == '1':
+            # Three placements per finger take a while: enrol in the background
+            from ..utils.enrollment_jobs import parse_fingers
             try:
-                from ..hardware.fingerprint import enroll_fingerprint
-                # Enrolls returns BYTES (the template) or None
-                template_bytes = enroll_fingerprint() 
-                
-                if template_bytes:
-                    cursor.execute("UPDATE Users SET fingerprint_template = %s WHERE id = %s", (template_bytes, user_id))
-                    conn.commit()
-                    flash("Fingerprint enrolled and saved to database.", "success")
-                else:
-                    flash("Fingerprint enrollment failed or timed out.", "warning")
-            except Exception as e:
-                logger.exception("Fingerprint enrollment error: %s", e)
-                flash("Fingerprint enrollment failed: {}".format(e), "error")
+                fingers = parse_fingers(request.form.getlist("fingers") or "1")
+                job_id = enqueue_job('enroll_fingerprint',
+                                     {"person_type": "student", "person_id": user_id, "fingers": fingers},
+                                     owner=f"teacher:{session['teacher_id']}", max_attempts=1)
+                flash(f"Fingerprint enrollment queued (job #{job_id}): the student should place each finger "
+                      "on the scanner three times.", "info")
+            except (ValueError, mysql.connector.Error) as e:
+                logger.exception("Could not queue fingerprint enrollment: %s", e)
+                flash("Fingerprint enrollment could not be queued: {}".format(e), "error")
 
         return redirect(url_for("teacher.teacher_dashboard"))
     except mysql.connector.Error as e:
@@ -408,30 +418,13 @@ def student_attendance_pdf(student_id):
         conn = get_db()
         cursor = conn.cursor(dictionary=True)
 
-        cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
-        student = cursor.fetchone()
-        if not student:
+        cursor.execute("SELECT id FROM Users WHERE id = %s", (student_id,))
+        if not cursor.fetchone():
             flash("Student not found", "error")
             return redirect(request.referrer or url_for("main.home"))
 
-        # Get attendance logs for the last 30 days
-        cursor.execute("""
-            SELECT DATE(timestamp) as date, COUNT(*) as scan_count,
-                   MIN(TIME(timestamp)) as first_scan, MAX(TIME(timestamp)) as last_scan
-            FROM FingerprintLogs
-            WHERE person_type = 'student' AND person_id = %s
-            AND timestamp >= DATE_SUB(NOW(), INTERVAL 30 DAY)
-            GROUP BY DATE(timestamp)
-            ORDER BY date DESC
-        """, (student_id,))
-        attendance_logs = cursor.fetchall()
-
-        pdf_data = generate_attendance_pdf(student, attendance_logs)
-
-        from flask import Response
-        response = Response(pdf_data, mimetype='application/pdf')
-        response.headers['Content-Disposition'] = f'attachment; filename=student_{student_id}_attendance.pdf'
-        return response
+        # Rendered by a job worker; the wait page downloads it when ready
+        return queue_download('student_attendance_pdf', {"student_id": student_id})
 
     except mysql.connector.Error as e:
         logger.exception("MySQL Error generating PDF: %s", e)
@@ -472,23 +465,7 @@ def student_audit_pdf(student_id):
                 flash("You are not authorized to view this student's audit report.", "error")
                 return redirect(request.referrer or url_for("teacher.teacher_dashboard"))
 
-        # Get audit records for the student
-        cursor.execute("""
-            SELECT s.name as subject_name, sa.status, sa.notes
-            FROM StudentAudit sa
-            JOIN Subjects s ON sa.subject_id = s.id
-            WHERE sa.student_id = %s
-            ORDER BY s.name
-        """, (student_id,))
-        audit_records = cursor.fetchall()
-
-        from ..utils.pdf import generate_audit_report_pdf
-        pdf_data = generate_audit_report_pdf(student, audit_records)
-
-        from flask import Response
-        response = Response(pdf_data, mimetype='application/pdf')
-        response.headers['Content-Disposition'] = f'attachment; filename=student_{student_id}_clearance.pdf'
-        return response
+        return queue_download('student_audit_pdf', {"student_id": student_id})
 
     except mysql.connector.Error as e:
         logger.exception("MySQL Error generating audit PDF: %s", e)
@@ -625,42 +602,7 @@ def student_results_pdf(student_id):
             flash("You are not authorized to view results for this student.", "error")
             return redirect(url_for("teacher.teacher_dashboard"))
 
-        # Build dynamic query for Exam Results
-        query = """
-            SELECT er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks
-            FROM ExamResults er
-            JOIN Subjects s ON er.subject_id = s.id
-            WHERE er.student_id = %s
-        """
-        params = [student_id]
-        
-        if term:
-            query += " AND er.term = %s"
-            params.append(term)
-        if exam_type:
-            query += " AND er.exam_type = %s"
-            params.append(exam_type)
-            
-        query += " ORDER BY er.term DESC, er.exam_type ASC"
-        
-        cursor.execute(query, tuple(params))
-        exam_results = cursor.fetchall()
-
-        # Student info full
-        cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
-        student = cursor.fetchone()
-
-        pdf_content = generate_exam_results_pdf(student, exam_results)
-
-        filename = f"results_{student['name'].replace(' ', '_')}"
-        if term: filename += f"_{term.replace(' ', '_')}"
-        if exam_type: filename += f"_{exam_type.replace(' ', '_')}"
-
-        return Response(
-            pdf_content,
-            mimetype="application/pdf",
-            headers={"Content-disposition": f"attachment; filename={filename}.pdf"}
-        )
+        return queue_download('exam_results_pdf', {"student_id": student_id, "term": term, "exam_type": exam_type})
     except Exception as e:
         logger.exception("Error generating teacher student results PDF: %s", e)
         flash("Could not generate PDF.", "error")
@@ -26,7 +26,7 @@ class Config:
     DB_PASSWORD = os.getenv('DB_PASSWORD', 'fp_pass')
     DB_NAME = os.getenv('DB_NAME', 'fpsnsdb')
     DB_PORT = int(os.getenv('DB_PORT', '3306'))
-    DB_POOL_SIZE = int(os.getenv("DB_POOL_SIZE", "5"))
+    # DB_POOL_SIZE defaults from the thread counts below (see the Production Server section)
 
     LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
     FLASK_HOST = os.getenv("FLASK_HOST", "0.0.0.0")
@@ -38,3 +38,95 @@ class Config:
     SMTP_PORT = int(os.getenv("SMTP_PORT", "587"))
     SMTP_USERNAME = os.getenv("SMTP_USERNAME")
     SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
+    # SMTP_FROM, SMTP_STARTTLS, SMTP_TIMEOUT, SMTP_MAX_PER_MINUTE and REPORT_RENDER_WORKERS
+    # are read where they are used, in utils/email.py
+
+    # Background Jobs
+    JOB_WORKERS = int(os.getenv("JOB_WORKERS", "2"))
+    JOB_POLL_INTERVAL = float(os.getenv("JOB_POLL_INTERVAL", "2"))
+    JOB_MAX_ATTEMPTS = int(os.getenv("JOB_MAX_ATTEMPTS", "3"))
+    JOB_RETRY_BASE_SECONDS = int(os.getenv("JOB_RETRY_BASE_SECONDS", "30"))
+    JOB_STALE_SECONDS = int(os.getenv("JOB_STALE_SECONDS", "3600"))
+    # Settings cache: each process polls the SettingsVersion counter this often
+    SETTINGS_POLL_SECONDS = float(os.getenv("SETTINGS_POLL_SECONDS", "1"))
+
+    # Email Outbox
+    OUTBOX_POLL_SECONDS = int(os.getenv("OUTBOX_POLL_SECONDS", "60"))
+    # Batch size, attempts, backoff and per-domain rate are read in utils/outbox.py
+
+    # Password Hashing
+    BCRYPT_ROUNDS = int(os.getenv("BCRYPT_ROUNDS", "12"))
+    # bcrypt releases the GIL, so each worker uses one core while request threads stay free
+    PASSWORD_WORKERS = int(os.getenv("PASSWORD_WORKERS", "2"))
+    # Each in-flight hash holds a waitress request thread, so at most WAITRESS_THREADS minus
+    # this many are admitted (running or waiting for a worker); the rest get 503 at once
+    PASSWORD_RESERVED_THREADS = int(os.getenv("PASSWORD_RESERVED_THREADS", "1"))
+    PASSWORD_TIMEOUT_SECONDS = float(os.getenv("PASSWORD_TIMEOUT_SECONDS", "15"))
+    PASSWORD_RETRY_AFTER_SECONDS = int(os.getenv("PASSWORD_RETRY_AFTER_SECONDS", "3"))
+
+    # Fingerprint Scanner
+    SCANNER_MODE = os.getenv("SCANNER_MODE", "embedded").lower()
+    SCANNER_SERVICE_HOST = os.getenv("SCANNER_SERVICE_HOST", "127.0.0.1")
+    SCANNER_SERVICE_PORT = int(os.getenv("SCANNER_SERVICE_PORT", "8765"))
+    FINGERPRINT_BACKEND = os.getenv("FINGERPRINT_BACKEND", "zkfp").lower()  # 'zkfp' or 'simulator'
+    SIMULATOR_SCRIPT = os.getenv("SIMULATOR_SCRIPT", "600/1200")
+    SIMULATOR_SPEED = float(os.getenv("SIMULATOR_SPEED", "1"))
+    SIMULATOR_DEVICES = int(os.getenv("SIMULATOR_DEVICES", "1"))
+    MATCH_THRESHOLD = int(os.getenv("MATCH_THRESHOLD", "80"))
+    # Best-vs-runner-up margin under which a match is ambiguous; AMBIGUOUS_POLICY 'reject' or 'flag'
+    MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "3"))
+    MATCH_MIN_MARGIN = int(os.getenv("MATCH_MIN_MARGIN", "10"))
+    AMBIGUOUS_POLICY = os.getenv("AMBIGUOUS_POLICY", "flag").lower()
+    # Repeat placements within RECENT_MATCH_SECONDS are matched 1:1 against recent captures first
+    RECENT_MATCH_SIZE = int(os.getenv("RECENT_MATCH_SIZE", "8"))
+    RECENT_MATCH_SECONDS = float(os.getenv("RECENT_MATCH_SECONDS", "10"))
+    RECENT_MATCH_SCORE = int(os.getenv("RECENT_MATCH_SCORE", "90"))
+    # A person logged within DEBOUNCE_SECONDS isn't logged again; the window is reloaded from logs on restart
+    DEBOUNCE_SECONDS = float(os.getenv("DEBOUNCE_SECONDS", "60"))
+    DEBOUNCE_MAX_ENTRIES = int(os.getenv("DEBOUNCE_MAX_ENTRIES", "10000"))
+    DEBOUNCE_SEED_FROM_LOGS = os.getenv("DEBOUNCE_SEED_FROM_LOGS", "true").lower() == "true"
+    # Capture polling: fast after a scan and in arrival windows, backing off to POLL_MAX_MS when idle
+    POLL_MIN_MS = int(os.getenv("POLL_MIN_MS", "20"))
+    POLL_MAX_MS = int(os.getenv("POLL_MAX_MS", "500"))
+    POLL_HOT_SECONDS = float(os.getenv("POLL_HOT_SECONDS", "15"))
+    POLL_FAST_WINDOWS = os.getenv("POLL_FAST_WINDOWS", "06:30-08:00")
+    FINGER_LIFT_TIMEOUT_SECONDS = float(os.getenv("FINGER_LIFT_TIMEOUT_SECONDS", "3"))
+    # Reader supervisor: jittered reopen backoff, then a temporary ban after repeated failures
+    RECONNECT_BASE_SECONDS = float(os.getenv("RECONNECT_BASE_SECONDS", "1"))
+    RECONNECT_MAX_SECONDS = float(os.getenv("RECONNECT_MAX_SECONDS", "60"))
+    BAN_AFTER_FAILURES = int(os.getenv("BAN_AFTER_FAILURES", "6"))
+    BAN_SECONDS = float(os.getenv("BAN_SECONDS", "300"))
+    # Gate feedback worker: LED blink and LCD message durations, optional buzzer and LCD
+    FEEDBACK_QUEUE_SIZE = int(os.getenv("FEEDBACK_QUEUE_SIZE", "32"))
+    FEEDBACK_LED_SECONDS = float(os.getenv("FEEDBACK_LED_SECONDS", "0.5"))
+    FEEDBACK_LCD_SECONDS = float(os.getenv("FEEDBACK_LCD_SECONDS", "3"))
+    FEEDBACK_BUZZER = os.getenv("FEEDBACK_BUZZER", "false").lower() == "true"
+    FEEDBACK_LCD = os.getenv("FEEDBACK_LCD", "false").lower() == "true"
+    # Enrolment: three samples per finger merged with DBMerge; pairs must cross-match at ENROLL_MIN_SCORE
+    ENROLL_MIN_SCORE = int(os.getenv("ENROLL_MIN_SCORE", "60"))
+    ENROLL_SAMPLE_TIMEOUT_SECONDS = float(os.getenv("ENROLL_SAMPLE_TIMEOUT_SECONDS", "15"))
+    # A new finger matching someone else's at DUPLICATE_THRESHOLD is refused, or stored flagged ('flag')
+    DUPLICATE_THRESHOLD = int(os.getenv("DUPLICATE_THRESHOLD", os.getenv("MATCH_THRESHOLD", "80")))
+    DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "refuse").lower()
+    FINGERPRINT_TRACE_PATH = os.getenv("FINGERPRINT_TRACE_PATH")  # record scans for scripts/replay_trace.py
+    FINGERPRINT_TRACE_MAX_MB = int(os.getenv("FINGERPRINT_TRACE_MAX_MB", "512"))
+
+    # Production Server (run_production.py)
+    WEB_PROCESSES = int(os.getenv("WEB_PROCESSES", "1"))
+    WAITRESS_THREADS = int(os.getenv("WAITRESS_THREADS", "4"))
+    # Threads that may each hold a DB connection at once: request threads, job workers, the
+    # scanner owner's enrolment worker, and the job dispatcher, outbox dispatcher, settings
+    # poller and fingerprint listener. An exhausted pool raises PoolError at once. (max 32)
+    DB_POOL_MIN_SIZE = min(32, WAITRESS_THREADS + JOB_WORKERS + 1 + 4)
+    DB_POOL_SIZE = min(32, int(os.getenv("DB_POOL_SIZE") or DB_POOL_MIN_SIZE))
+    CONNECTION_LIMIT = int(os.getenv("CONNECTION_LIMIT", "100"))
+    CHANNEL_TIMEOUT = int(os.getenv("CHANNEL_TIMEOUT", "120"))
+    LEADER_LOCK_DIR = os.getenv("LEADER_LOCK_DIR")
+
+    # Health / Readiness (/readyz flips to 503 when a threshold is crossed; 0 disables a check)
+    READY_DB_LATENCY_MS = float(os.getenv("READY_DB_LATENCY_MS", "500"))
+    READY_REQUIRE_SCANNER = os.getenv("READY_REQUIRE_SCANNER", "false").lower() == "true"
+    READY_MIN_CACHE_SIZE = int(os.getenv("READY_MIN_CACHE_SIZE", "0"))
+    READY_MAX_CACHE_AGE_SECONDS = int(os.getenv("READY_MAX_CACHE_AGE_SECONDS", "300"))
+    READY_MAX_SCAN_AGE_SECONDS = int(os.getenv("READY_MAX_SCAN_AGE_SECONDS", "0"))
+    READY_MAX_WRITER_BACKLOG = int(os.getenv("READY_MAX_WRITER_BACKLOG", "10"))
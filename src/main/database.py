@@ -1,8 +1,11 @@
 import os
+import threading
 import mysql.connector
 from mysql.connector import pooling
 import logging
 
+from .config import Config
+
 logger = logging.getLogger(__name__)
 
 DB_CONFIG = {
@@ -13,16 +16,36 @@ DB_CONFIG = {
     'port': int(os.getenv('DB_PORT', '3306')),
 }
 
+# Sized from the threads that can each hold a connection at once (see Config.DB_POOL_MIN_SIZE)
+DB_POOL_MIN_SIZE = Config.DB_POOL_MIN_SIZE
+DB_POOL_SIZE = Config.DB_POOL_SIZE
+
 db_pool = None
-try:
-    db_pool = pooling.MySQLConnectionPool(pool_name="fp_pool", pool_size=int(os.getenv("DB_POOL_SIZE", "5")), **DB_CONFIG)
-except mysql.connector.Error as e:
-    logger.error("DB pool init failed: %s", e)
+_pool_lock = threading.Lock()
+_pool_failed = False
+
+
+def _get_pool():
+    """Creates the connection pool on first use rather than at import."""
+    global db_pool, _pool_failed
+    if db_pool is None and not _pool_failed:
+        with _pool_lock:
+            if db_pool is None and not _pool_failed:
+                if DB_POOL_SIZE < DB_POOL_MIN_SIZE:
+                    logger.warning("DB_POOL_SIZE=%d is below the %d threads that may hold a connection at once; "
+                                   "requests can fail with PoolError under load.", DB_POOL_SIZE, DB_POOL_MIN_SIZE)
+                try:
+                    db_pool = pooling.MySQLConnectionPool(pool_name="fp_pool", pool_size=DB_POOL_SIZE, **DB_CONFIG)
+                except mysql.connector.Error as e:
+                    _pool_failed = True
+                    logger.error("DB pool init failed: %s", e)
+    return db_pool
 
 def get_db():
     try:
-        if db_pool:
-            return db_pool.get_connection()
+        pool = _get_pool()
+        if pool:
+            return pool.get_connection()
         else:
             # Fallback to direct connection if pool failed to initialize
             conn = mysql.connector.connect(**DB_CONFIG)
@@ -31,3 +54,15 @@ def get_db():
     except mysql.connector.Error as e:
         logger.exception("Failed to get database connection: %s", e)
         raise # Re-raise the exception after logging
+
+
+def warm_up():
+    """Opens the pool and loads the PDF toolkit in the background so the first request is fast."""
+    try:
+        get_db().close()
+    except mysql.connector.Error:
+        pass  # already logged; requests will retry
+    try:
+        from .utils import pdf  # noqa: F401
+    except Exception as e:
+        logger.warning("PDF toolkit warm-up failed: %s", e)
@@ -0,0 +1,80 @@
+"""
+Scan debounce: a person logged within the last DEBOUNCE_SECONDS is not logged
+again. Entries live in a dict plus a min-heap of expiry times, so expiry is
+O(log n) per entry and the set never outgrows the people seen in one window.
+"""
+import os
+import time
+import heapq
+import threading
+
+# --- Debounce Constants ---
+DEBOUNCE_SECONDS = float(os.getenv("DEBOUNCE_SECONDS", "60"))
+DEBOUNCE_MAX_ENTRIES = int(os.getenv("DEBOUNCE_MAX_ENTRIES", "10000"))
+# Seed the window from FingerprintLogs at startup so a restart doesn't double-log
+DEBOUNCE_SEED_FROM_LOGS = os.getenv("DEBOUNCE_SEED_FROM_LOGS", "true").lower() == "true"
+
+
+class ExpiringSet:
+    """Thread-safe set whose members expire `window` seconds after being added."""
+
+    def __init__(self, window=DEBOUNCE_SECONDS, max_entries=DEBOUNCE_MAX_ENTRIES):
+        self.window = window
+        self.max_entries = max(1, max_entries)
+        self._expires = {}  # key -> monotonic expiry
+        self._heap = []  # (expiry, key); stale pairs are skipped when popped
+        self._lock = threading.Lock()
+
+    def _expire(self, now):
+        heap = self._heap
+        while heap and (heap[0][0] <= now or len(self._expires) > self.max_entries):
+            expiry, key = heapq.heappop(heap)
+            if self._expires.get(key) == expiry:
+                del self._expires[key]
+
+    def _add(self, key, expiry):
+        self._expires[key] = expiry
+        heapq.heappush(self._heap, (expiry, key))
+
+    def add(self, key, remaining=None):
+        """Adds `key` for `remaining` seconds (default: the whole window)."""
+        now = time.monotonic()
+        with self._lock:
+            self._add(key, now + (self.window if remaining is None else remaining))
+            self._expire(now)
+
+    def check_and_add(self, key):
+        """True if `key` is still inside its window; otherwise adds it and returns False."""
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            if key in self._expires:
+                return True
+            self._add(key, now + self.window)
+            return False
+
+    def __contains__(self, key):
+        now = time.monotonic()
+        with self._lock:
+            self._expire(now)
+            return key in self._expires
+
+    def __len__(self):
+        with self._lock:
+            self._expire(time.monotonic())
+            return len(self._expires)
+
+    def seed_from_logs(self, cursor):
+        """Adds everyone logged within the window, for the time left of it. Returns the count."""
+        cursor.execute("""
+            SELECT person_type, person_id, TIMESTAMPDIFF(MICROSECOND, MAX(timestamp), NOW(3)) / 1e6 AS age
+            FROM FingerprintLogs
+            WHERE timestamp >= NOW(3) - INTERVAL %s SECOND
+            GROUP BY person_type, person_id
+        """, (int(self.window) + 1,))
+        rows = cursor.fetchall()
+        for person_type, person_id, age in rows:
+            remaining = self.window - float(age)
+            if remaining > 0:
+                self.add((person_type, person_id), remaining)
+        return len(rows)
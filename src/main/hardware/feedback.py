@@ -0,0 +1,137 @@
+"""
+Gate feedback (reader LEDs, LCD, optional buzzer) driven by one worker thread.
+
+The listener calls `emit(device_index, outcome)` on its hot path; it only
+enqueues. Commands are coalesced per reader (a newer outcome replaces one not
+yet shown), the queue is bounded (the oldest pending command is dropped), and
+"turn it off again" is a timer on the same thread rather than a sleep, so a
+long blink on one lane never delays another.
+"""
+import os
+import time
+import threading
+import heapq
+import logging
+from collections import OrderedDict
+
+logger = logging.getLogger(__name__)
+
+# --- Feedback Constants ---
+FEEDBACK_QUEUE_SIZE = int(os.getenv("FEEDBACK_QUEUE_SIZE", "32"))
+FEEDBACK_LED_SECONDS = float(os.getenv("FEEDBACK_LED_SECONDS", "0.5"))
+FEEDBACK_LCD_SECONDS = float(os.getenv("FEEDBACK_LCD_SECONDS", "3"))
+FEEDBACK_BUZZER = os.getenv("FEEDBACK_BUZZER", "false").lower() == "true"
+FEEDBACK_LCD = os.getenv("FEEDBACK_LCD", "false").lower() == "true"
+
+ACCEPTED = 'accepted'
+REJECTED = 'rejected'
+DEBOUNCED = 'debounced'
+
+# outcome -> (LED colour, LCD text, beep)
+SIGNALS = {
+    ACCEPTED: ('green', "Welcome", False),
+    REJECTED: ('red', "Not recognised", True),
+    DEBOUNCED: ('white', "Already scanned", False),
+}
+
+
+class FeedbackDispatcher(threading.Thread):
+    """Single consumer for all feedback. `scanner` provides set_indicator(); `lcd` is optional."""
+
+    def __init__(self, scanner, lcd=None, queue_size=FEEDBACK_QUEUE_SIZE):
+        super().__init__(name="feedback")
+        self.daemon = True
+        self.scanner = scanner
+        self.lcd = lcd
+        self.queue_size = queue_size
+        self._pending = OrderedDict()  # device_index -> outcome, oldest first
+        self._timers = []  # heap of (due, seq, device_index, indicator, generation); indicator None = clear LCD
+        self._lit = {}  # device_index -> indicators currently on
+        self._generation = {}  # device_index -> count of outcomes shown; older timers are stale
+        self._seq = 0
+        self._lcd_until = 0.0  # the LCD is shared: only the latest message's timer clears it
+        self._cond = threading.Condition()
+        self.stats = {"emitted": 0, "coalesced": 0, "dropped": 0, "shown": 0, "errors": 0}
+
+    def emit(self, device_index, outcome):
+        """Queues feedback for a reader. Never blocks."""
+        with self._cond:
+            self.stats["emitted"] += 1
+            if device_index in self._pending:
+                self.stats["coalesced"] += 1
+                del self._pending[device_index]
+            elif len(self._pending) >= self.queue_size:
+                self._pending.popitem(last=False)
+                self.stats["dropped"] += 1
+            self._pending[device_index] = outcome
+            self._cond.notify()
+
+    def run(self):
+        while True:
+            with self._cond:
+                while not self._pending and not self._due():
+                    timeout = self._timers[0][0] - time.monotonic() if self._timers else None
+                    self._cond.wait(timeout)
+                commands = list(self._pending.items())
+                self._pending.clear()
+                expired = []
+                while self._due():
+                    expired.append(heapq.heappop(self._timers))
+            for _, _, device_index, indicator, generation in expired:
+                self._off(device_index, indicator, generation)
+            for device_index, outcome in commands:
+                self._show(device_index, outcome)
+
+    def _due(self):
+        return bool(self._timers) and self._timers[0][0] <= time.monotonic()
+
+    def _schedule(self, delay, device_index, indicator):
+        with self._cond:
+            self._seq += 1
+            heapq.heappush(self._timers, (time.monotonic() + delay, self._seq, device_index, indicator,
+                                          self._generation[device_index]))
+
+    def _show(self, device_index, outcome):
+        color, text, beep = SIGNALS[outcome]
+        # A new outcome replaces whatever this reader is still showing, and its off-timers
+        self._generation[device_index] = self._generation.get(device_index, 0) + 1
+        for indicator in self._lit.pop(device_index, ()):
+            self._set(device_index, indicator, False)
+        lit = [color] + (['beep'] if beep and FEEDBACK_BUZZER else [])
+        for indicator in lit:
+            self._set(device_index, indicator, True)
+            self._schedule(FEEDBACK_LED_SECONDS, device_index, indicator)
+        self._lit[device_index] = lit
+        if self.lcd is not None:
+            try:
+                self.lcd.clear()
+                self.lcd.text(text, 1)
+                self._lcd_until = time.monotonic() + FEEDBACK_LCD_SECONDS
+                self._schedule(FEEDBACK_LCD_SECONDS, device_index, None)
+            except Exception as e:
+                self.stats["errors"] += 1
+                logger.debug(f"LCD write failed: {e}")
+        self.stats["shown"] += 1
+
+    def _off(self, device_index, indicator, generation):
+        if indicator is None:
+            if time.monotonic() < self._lcd_until:
+                return
+            try:
+                self.lcd.clear()
+            except Exception as e:
+                logger.debug(f"LCD clear failed: {e}")
+            return
+        if generation != self._generation.get(device_index):
+            return  # a later outcome re-lit this reader; its own timer turns it off
+        lit = self._lit.get(device_index, [])
+        if indicator in lit:
+            lit.remove(indicator)
+            self._set(device_index, indicator, False)
+
+    def _set(self, device_index, indicator, on):
+        try:
+            self.scanner.set_indicator(device_index, indicator, on)
+        except Exception as e:
+            self.stats["errors"] += 1
+            logger.debug(f"Indicator {indicator} failed on device {device_index}: {e}")
@@ -1,83 +1,248 @@
+import os
 import time
 import threading
+import heapq
 import logging
-try:
-    from zkfp import ZKFP2
-except ImportError:
-    ZKFP2 = None
+from collections import namedtuple
+from contextlib import nullcontext
+from .poller import AdaptivePoller, ArrivalWindows
+from .supervisor import DeviceSupervisor
+from .recent import RecentMatches
 
 logger = logging.getLogger(__name__)
 
+# 'embedded': the web app owns the scanner and runs the listener thread.
+# 'remote': scripts/scanner_service.py owns the device; the web app talks to it over loopback HTTP.
+SCANNER_MODE = os.getenv("SCANNER_MODE", "embedded").lower()
+
+# 'zkfp': the ZKFinger SDK (mock mode when it isn't installed).
+# 'simulator': hardware/simulator.py, synthetic scan traffic for development and load testing.
+FINGERPRINT_BACKEND = os.getenv("FINGERPRINT_BACKEND", "zkfp").lower()
+
+# Minimum DBMatch score accepted as a match
+MATCH_THRESHOLD = int(os.getenv("MATCH_THRESHOLD", "80"))
+# Top-k matching: the best candidates are kept per person, and a best match whose lead over
+# the runner-up (another person) is under MATCH_MIN_MARGIN is ambiguous. AMBIGUOUS_POLICY
+# 'reject' treats it as unrecognised, 'flag' logs the best candidate; both are recorded.
+MATCH_TOP_K = int(os.getenv("MATCH_TOP_K", "3"))
+MATCH_MIN_MARGIN = int(os.getenv("MATCH_MIN_MARGIN", "10"))
+AMBIGUOUS_POLICY = os.getenv("AMBIGUOUS_POLICY", "flag").lower()
+# Enrolment: three placements of one finger are merged with DBMerge. Every pair of samples
+# must cross-match at ENROLL_MIN_SCORE, and the merged template must match each sample above
+# MATCH_THRESHOLD, or the enrolment is rejected instead of storing a template that rescans at the gate.
+ENROLL_SAMPLES = 3
+ENROLL_MIN_SCORE = int(os.getenv("ENROLL_MIN_SCORE", "60"))
+ENROLL_SAMPLE_TIMEOUT_SECONDS = float(os.getenv("ENROLL_SAMPLE_TIMEOUT_SECONDS", "15"))
+# A new template scoring DUPLICATE_THRESHOLD or more against another person's finger is
+# refused ('refuse') or stored marked as a suspected duplicate ('flag')
+DUPLICATE_THRESHOLD = int(os.getenv("DUPLICATE_THRESHOLD", str(MATCH_THRESHOLD)))
+DUPLICATE_POLICY = os.getenv("DUPLICATE_POLICY", "refuse").lower()
+# Finger numbers stored in FingerprintTemplates.finger
+FINGER_NAMES = ("Right thumb", "Right index", "Right middle", "Right ring", "Right little",
+                "Left thumb", "Left index", "Left middle", "Left ring", "Left little")
+# A finger still on the sensor after a capture is the same placement until it lifts or this elapses
+FINGER_LIFT_TIMEOUT_SECONDS = float(os.getenv("FINGER_LIFT_TIMEOUT_SECONDS", "3"))
+
+# Driver class, imported on first use so importing this module never loads the SDK
+ZKFP2 = None
+_driver_loaded = False
+
+
+def _load_driver():
+    global ZKFP2, _driver_loaded
+    if not _driver_loaded:
+        if FINGERPRINT_BACKEND == 'simulator':
+            from .simulator import SimulatedZKFP2
+            ZKFP2 = SimulatedZKFP2
+        else:
+            try:
+                from zkfp import ZKFP2 as driver
+                ZKFP2 = driver
+            except ImportError:
+                ZKFP2 = None
+        _driver_loaded = True
+    return ZKFP2
+
+
 # Singleton simulation for module-level access
 _scanner_instance = None
 _lock = threading.Lock()
+_instance_lock = threading.Lock()
+# Set by the web app in embedded mode: only the process elected to run the listener may
+# open the device. Standalone scripts and the scanner service never set it.
+_ownership_required = False
+_owns_scanner = False
+
+
+class ScannerNotOwned(RuntimeError):
+    """This web process was not elected to own the scanner; another process holds the device."""
+
+
+class EnrollmentError(Exception):
+    """The enrolment samples were captured but do not make a usable template."""
+
+
+class DuplicateFingerError(EnrollmentError):
+    """The new template matches a finger already enrolled for someone else."""
+
+    def __init__(self, duplicates):
+        self.duplicates = duplicates  # [(person key, score), ...], best first
+        key, score = duplicates[0]
+        super().__init__(f"This finger is already enrolled for {person_label(key)} (score {score}).")
+
+
+# Result of a successful enrolment; duplicates is non-empty only under DUPLICATE_POLICY=flag
+Enrollment = namedtuple('Enrollment', ['template', 'quality', 'duplicates'])
+
+
+# Outcome of a 1:N search. `candidates` is the top-k [(key, score), ...] (at least two
+# when available), one per person, best first; `key` is the best one if it clears the
+# match threshold, else None. `margin` is the best score minus the runner-up's (the best
+# score with one candidate); `ambiguous` means a match whose margin is under the minimum.
+MatchResult = namedtuple('MatchResult', ['key', 'score', 'candidates', 'margin', 'ambiguous'])
+
+NO_MATCH = MatchResult(None, 0, [], 0, False)
+
+
+def person_label(key):
+    """'student_12:1' -> 'student 12'"""
+    return key.split(':')[0].replace('_', ' ')
+
+
+class ScannerDevice:
+    """One opened reader: its own driver instance (the SDK keeps one device handle per instance)."""
+
+    def __init__(self, index, zk, windows=None):
+        self.index = index
+        self.zk = zk
+        self.opened_at = time.time()
+        self.captures = 0
+        self.poller = AdaptivePoller(windows)
+        self.lift_deadline = 0.0  # until then, captures are the finger that was just read
+
 
 class FingerprintScanner:
+    """
+    Opens every reader the SDK reports and matches against one shared template
+    cache. Capture is per device (see capture_template's device_index), so a
+    multi-lane gate runs one capture worker per reader.
+    """
+
     def __init__(self):
-        self.zk = None
+        self.zk = None  # library instance: Init/Terminate and matching
+        self.devices = {}  # {device index: ScannerDevice}, open readers only
         self.device_count = 0
-        self.is_connected = False
         self.users_cache = {}  # {db_id: template_bytes}
+        self.fid_keys = {}  # {device cache fid: db_id}, simulator backend only
+        self.cache_generation = 0  # bumped on every load_users
         self.initialized = False
-        self._last_init_attempt = 0
-        self.current_device_index = -1
-        self.banned_indices = set()
+        self.supervisor = None  # opens and reopens readers; None in mock mode
+        self.on_error = None  # callable(device_index, message), e.g. the scan trace
+        self.arrival_windows = ArrivalWindows()  # fast-polling times, shared by every reader
+        self.recent = RecentMatches()  # repeat placements are checked 1:1 before the 1:N search
+        # Live-tunable (the listener applies the match_threshold / match_min_margin settings)
+        self.match_threshold = MATCH_THRESHOLD
+        self.min_margin = MATCH_MIN_MARGIN
+        # Set by the listener: capture_guard(device_index) pauses that reader's worker, or every
+        # worker for None (enrolment),
+        # on_templates_changed() reloads the template cache
+        self.capture_guard = None
+        self.on_templates_changed = None
+        self._devices_lock = threading.Lock()
         self._init_hardware()
 
-    def _init_hardware(self):
-        # Prevent rapid re-initialization attempts (Backoff Strategy)
-        if (time.time() - self._last_init_attempt) < 5:
-            return
+    @property
+    def is_connected(self):
+        return bool(self.devices)
 
-        self._last_init_attempt = time.time()
-        
-        # If we are already connected, verify it's still alive, otherwise reset
-        if self.is_connected:
-            return
+    @property
+    def current_device_index(self):
+        """Lowest open device index, or -1. Used for single-reader callers such as enrolment."""
+        return min(self.devices) if self.devices else -1
 
-        if ZKFP2:
-            try:
-                # Only re-instantiate if null
-                if self.zk is None:
-                    self.zk = ZKFP2()
-                    self.zk.Init()
-                
-                self.device_count = self.zk.GetDeviceCount()
-                logger.info(f"ZKFP initialized. Devices found: {self.device_count}")
-                
-                if self.device_count > 0:
-                    # If all devices are banned, reset the ban list to try again
-                    if len(self.banned_indices) >= self.device_count:
-                        logger.warning("All devices were banned. Resetting ban list to retry.")
-                        self.banned_indices.clear()
-
-                    # Try to open available devices until one works
-                    for i in range(self.device_count):
-                        if i in self.banned_indices:
-                            logger.info(f"Skipping banned device index {i}")
-                            continue
-
-                        try:
-                            logger.info(f"Attempting to open device index {i}...")
-                            self.zk.OpenDevice(i)
-                            self.is_connected = True
-                            self.current_device_index = i
-                            logger.info(f"Successfully opened ZK9500 (Index {i})")
-                            break
-                        except Exception as open_err:
-                            logger.warning(f"Failed to open device {i}: {open_err}")
-                    
-                    if not self.is_connected:
-                        logger.error("Could not open any detected devices.")
-            except Exception as e:
-                logger.error(f"ZKFP Initialization/Connection failed: {e}")
-                # If Init failed, maybe we need to recreate the object next time
-                self.zk = None 
+    @property
+    def banned_indices(self):
+        return self.supervisor.banned_indices() if self.supervisor else set()
+
+    def device_indices(self):
+        return sorted(self.devices)
+
+    def known_device_indices(self):
+        """Every reader index the SDK has reported, open or not."""
+        return sorted(self.supervisor.states) if self.supervisor else []
+
+    def device_states(self):
+        """Per-reader lifecycle state and time spent disconnected (see supervisor.py)."""
+        return self.supervisor.snapshot() if self.supervisor else []
+
+    def reconnect(self):
+        """Asks the supervisor to look for readers now instead of at its next scheduled pass."""
+        if self.supervisor:
+            self.supervisor.wake()
+
+    def wait_ready(self, device_index=None, timeout=None):
+        if self.supervisor is None:
+            time.sleep(timeout or 0)
+            return False
+        return self.supervisor.wait_ready(device_index, timeout)
+
+    def _init_hardware(self):
+        if _load_driver():
+            if self.supervisor is None:
+                self.supervisor = DeviceSupervisor(self, ZKFP2)
+                self.supervisor.bootstrap()
         else:
             if not self.initialized: # Log once
-                logger.warning("ZKFP library not found. Running in MOCK mode.")
+                logger.warning("ZKFP library not found. Running in MOCK mode "
+                               "(set FINGERPRINT_BACKEND=simulator for synthetic scans).")
             self.initialized = True # Mark as "initialized" so we don't spam mock warning
 
+    # --- Called by the supervisor ---
+
+    def library_device_count(self):
+        # Only re-instantiate if null
+        if self.zk is None:
+            zk = ZKFP2()
+            zk.Init()
+            zk.DBInit()
+            self.zk = zk
+        self.device_count = self.zk.GetDeviceCount()
+        logger.debug(f"ZKFP devices found: {self.device_count}")
+        return self.device_count
+
+    def reset_library(self):
+        """Terminate + Init, which makes the SDK rescan USB. Only done while no reader is open."""
+        with _lock:
+            zk, self.zk = self.zk, None
+            if zk is not None:
+                try:
+                    zk.Terminate()
+                except Exception:
+                    pass
+            self.library_device_count()
+
+    def attach_device(self, index, zk):
+        with self._devices_lock:
+            self.devices[index] = ScannerDevice(index, zk, self.arrival_windows)
+        if FINGERPRINT_BACKEND == 'simulator':
+            with _lock:
+                self._mirror_to_device(zk)
+
+    def detach_device(self, index):
+        with self._devices_lock:
+            device = self.devices.pop(index, None)
+        if device is not None:
+            try:
+                device.zk.CloseDevice()
+            except Exception:
+                pass
+
+    def _drop_device(self, index, error):
+        """Hands a failed reader back to the supervisor for reopening."""
+        self.supervisor.lost(index, error)
+        if self.on_error:
+            self.on_error(index, str(error))
+
     def load_users(self, users_dict):
         """
         Load users into memory for fast matching.
@@ -85,102 +250,285 @@ class FingerprintScanner:
         """
         with _lock:
             self.users_cache = users_dict
+            self.cache_generation += 1
+            self.recent.clear()  # cached results may name re-enrolled or deleted templates
+            if FINGERPRINT_BACKEND == 'simulator':
+                for device in list(self.devices.values()):
+                    self._mirror_to_device(device.zk)
             logger.info(f"Loaded {len(self.users_cache)} templates into memory.")
 
-    def capture_template(self, timeout=10):
+    def _mirror_to_device(self, zk):
+        # The simulator draws its scripted arrivals from the templates in its device cache
+        zk.DBClear()
+        self.fid_keys = {}
+        for fid, (uid, template) in enumerate(self.users_cache.items(), start=1):
+            zk.DBAdd(fid, template)
+            self.fid_keys[fid] = uid
+
+    def capture_template(self, timeout=10, device_index=None):
         """
         Waits for a finger and returns the template bytes.
-        Blocking call with timeout.
+        Blocking call with timeout. `device_index` picks the reader (default: the
+        lowest open one); returns None early if that reader is lost.
         """
-        if not self.is_connected:
-            # Try to reconnect if not connected
-            self._init_hardware()
-            if not self.is_connected:
-                time.sleep(1)
+        if device_index is None:
+            device_index = self.current_device_index
+        device = self.devices.get(device_index)
+        if device is None:
+            # Wait for the supervisor to (re)open the reader rather than reconnecting inline
+            if not self.wait_ready(None if device_index == -1 else device_index, timeout):
+                return None
+            if device_index == -1:
+                device_index = self.current_device_index
+            device = self.devices.get(device_index)
+            if device is None:
                 return None
 
+        poller = device.poller
         start_time = time.time()
         while (time.time() - start_time) < timeout:
             try: 
-                capture = self.zk.AcquireFingerprint()
-                if capture:
-                    tmp, img = capture
-                    return bytes(tmp)
+                # Template-only: reuses the driver's buffers and skips the image copy
+                tmp = device.zk.AcquireTemplate()
+                if tmp is None:
+                    device.lift_deadline = 0.0  # sensor is clear
+                else:
+                    poller.activity()
+                    self.supervisor.healthy(device_index)
+                    if time.monotonic() >= device.lift_deadline:
+                        device.lift_deadline = time.monotonic() + FINGER_LIFT_TIMEOUT_SECONDS
+                        device.captures += 1
+                        return bytes(tmp)
+                    # Still the previous placement: wait for the finger to lift
             except Exception as e:
-                # If handle is invalid or device disconnected, mark as not connected
+                # If handle is invalid or device disconnected, drop this reader
                 err_msg = str(e).lower()
                 if "handle" in err_msg or "device" in err_msg:
-                    logger.error(f"Hardware connection lost: {e}")
-                    
-                    # Mark this specific index as bad so we don't pick it again immediately
-                    if self.current_device_index != -1:
-                        logger.warning(f"Banning device index {self.current_device_index} due to error.")
-                        self.banned_indices.add(self.current_device_index)
-                    
-                    self.is_connected = False
-                    self.current_device_index = -1
+                    logger.error(f"Hardware connection lost on device {device_index}: {e}")
+                    self._drop_device(device_index, e)
                     return None
                 
-                # For other errors (glitches), just log and continue
+                # For other errors (glitches), log and back off; repeated glitches count as a disconnect
                 logger.error(f"Capture error: {e}")
-                time.sleep(1)
-            time.sleep(0.1)
+                if self.supervisor.glitch(device_index, e):
+                    if self.on_error:
+                        self.on_error(device_index, str(e))
+                    return None
+                time.sleep(poller.failed())
+                continue
+            time.sleep(poller.idle())
         return None
 
-    def match_template(self, scanned_template):
+    def enroll(self, timeout=ENROLL_SAMPLE_TIMEOUT_SECONDS, on_sample=None, person=None):
         """
-        Matches a scanned template against the loaded cache.
-        Returns: (best_id, score) or (None, 0)
+        Captures ENROLL_SAMPLES placements of one finger and merges them.
+        `on_sample(n, total)` is called before each placement is awaited.
+        Returns an Enrollment, quality being the weakest sample cross-match score,
+        or None if a placement timed out. Raises EnrollmentError when the samples
+        do not cross-match or the merge fails, and DuplicateFingerError when the
+        finger belongs to someone other than `person` ('student_12') and
+        DUPLICATE_POLICY is 'refuse'.
         """
-        if not self.is_connected:
-            return None, 0
+        # All three placements come from one reader; only that reader's capture worker is paused
+        device_index = self.current_device_index
+        guarded = device_index if device_index >= 0 else None  # none open yet: pause them all
+        with self.capture_guard(guarded) if self.capture_guard else nullcontext():
+            samples = []
+            while len(samples) < ENROLL_SAMPLES:
+                if on_sample:
+                    on_sample(len(samples) + 1, ENROLL_SAMPLES)
+                template = self.capture_template(timeout=timeout, device_index=device_index)
+                if not template:
+                    return None
+                samples.append(template)
 
-        best_score = 0
-        best_id = None
-        
+        if self.zk is None:
+            raise EnrollmentError("Fingerprint library not initialised.")
+        with _lock:
+            scores = [self.zk.DBMatch(a, b) for i, a in enumerate(samples) for b in samples[i + 1:]]
+            quality = min(scores)
+            if quality < ENROLL_MIN_SCORE:
+                raise EnrollmentError(f"Samples do not match each other (score {quality}); "
+                                      "place the same finger each time.")
+            try:
+                merged, length = self.zk.DBMerge(*samples)
+            except Exception as e:
+                raise EnrollmentError(f"Could not merge the samples: {e}")
+            merged = bytes(merged)[:length]
+            weakest = min(self.zk.DBMatch(merged, sample) for sample in samples)
+        if weakest <= self.match_threshold:
+            raise EnrollmentError(f"Merged template matches its own samples poorly (score {weakest}).")
+        logger.info(f"Enrollment merged {ENROLL_SAMPLES} samples (cross-match {quality}, merged {weakest}).")
+
+        duplicates = self.find_duplicates(merged, exclude_person=person)
+        if duplicates:
+            logger.warning(f"Enrolled finger matches {len(duplicates)} template(s) of other people, "
+                           f"best {duplicates[0][0]} ({duplicates[0][1]}).")
+            if DUPLICATE_POLICY != 'flag':
+                raise DuplicateFingerError(duplicates)
+        return Enrollment(merged, quality, duplicates)
+
+    def find_duplicates(self, template, exclude_person=None, threshold=DUPLICATE_THRESHOLD):
+        """
+        1:N search of `template` against the loaded cache. Returns [(key, score), ...]
+        scoring at least `threshold`, best first, skipping `exclude_person`'s own fingers.
+        """
+        if self.zk is None:
+            return []
+        found = []
+        with _lock:
+            for key, stored in list(self.users_cache.items()):
+                if exclude_person and key.split(':')[0] == exclude_person:
+                    continue
+                try:
+                    score = self.zk.DBMatch(stored, template)
+                except Exception:
+                    continue
+                if score >= threshold:
+                    found.append((key, score))
+        return sorted(found, key=lambda item: item[1], reverse=True)
+
+    def set_indicator(self, device_index, name, on):
+        """Switches a reader's LED or buzzer. Synchronous; called from the feedback worker."""
+        device = self.devices.get(device_index)
+        if device is None:
+            return
+        device.zk.SetIndicator(name, on)
+
+    def match(self, scanned_template, k=MATCH_TOP_K):
+        """
+        Matches a scanned template against the loaded cache and returns a MatchResult
+        with the top `k` people. Matching needs the algorithm library, not an open reader.
+        """
+        if self.zk is None:
+            return NO_MATCH
+
+        with _lock:
+            recent = self.recent.lookup(scanned_template, self.zk.DBMatch)
+        if recent is not None:
+            return recent
+
+        best = {}  # person -> (score, key): a person's fingers don't compete with each other
         with _lock:
             # We iterate over a copy of items to avoid runtime errors if cache changes
             for uid, stored_tmpl in list(self.users_cache.items()):
                 try:
                     score = self.zk.DBMatch(stored_tmpl, scanned_template)
-                    if score > 80 and score > best_score:
-                        best_score = score
-                        best_id = uid
                 except:
                     continue
-        
-        return best_id, best_score
+                if score > 0:
+                    person = uid.split(':')[0]
+                    if score > best.get(person, (0, None))[0]:
+                        best[person] = (score, uid)
+
+        # Always keep the runner-up: the margin is measured against it
+        top = heapq.nlargest(max(2, k), best.values())
+        if not top:
+            return NO_MATCH
+        candidates = [(uid, score) for score, uid in top]
+        margin = top[0][0] - (top[1][0] if len(top) > 1 else 0)
+        key = candidates[0][0] if top[0][0] > self.match_threshold else None
+        ambiguous = key is not None and len(candidates) > 1 and margin < self.min_margin
+        result = MatchResult(key, top[0][0] if key else 0, candidates, margin, ambiguous)
+        if key and not result.ambiguous:
+            self.recent.add(bytes(scanned_template), result)
+        return result
+
+    def match_template(self, scanned_template):
+        """
+        Matches a scanned template against the loaded cache.
+        Returns: (best_id, score) or (None, 0)
+        """
+        result = self.match(scanned_template)
+        return result.key, result.score
     
     def close(self):
+        if self.supervisor:
+            self.supervisor.stop()
+        for device in list(self.devices.values()):
+            try:
+                device.zk.CloseDevice()
+            except:
+                pass
+        self.devices = {}
         if self.zk: 
             try:
-                self.zk.CloseDevice()
                 self.zk.Terminate()
             except: 
                 pass
 
+def require_scanner_ownership():
+    """Called by the web app: get_scanner() raises until claim_scanner() runs in this process."""
+    global _ownership_required
+    _ownership_required = True
+
+
+def claim_scanner():
+    """Marks this process as the scanner owner (the leader, just before it starts the listener)."""
+    global _owns_scanner
+    _owns_scanner = True
+
+
+def owns_scanner():
+    return _owns_scanner or not _ownership_required
+
+
 # Global instance
 def get_scanner():
     global _scanner_instance
-    if _scanner_instance is None:
-        _scanner_instance = FingerprintScanner()
+    if not owns_scanner():
+        raise ScannerNotOwned("The fingerprint scanner is owned by another web process; "
+                              "set SCANNER_MODE=remote to use it from every process.")
+    with _instance_lock:
+        if _scanner_instance is None:
+            _scanner_instance = FingerprintScanner()
     return _scanner_instance
 
 # Wrapper functions to maintain some compatibility or easy access
-def enroll_fingerprint(db_id=None):
+def enroll_fingerprint(timeout=ENROLL_SAMPLE_TIMEOUT_SECONDS, on_sample=None, person=None):
     """
-    Captures a fingerprint and returns the template bytes.
-    Note: The original app expected an ID returned. 
-    Here we return the TEMPLATE (bytes) so the caller can save it to DB.
+    Enrols one finger of `person` ('student_12'): three placements merged into a
+    single template, checked against everyone else's enrolled fingers.
+    Returns an Enrollment or None on timeout; raises EnrollmentError for
+    inconsistent samples or a refused duplicate. The caller saves the template
+    (see store_template). In remote mode the capture is delegated to the scanner service.
     """
+    if SCANNER_MODE == 'remote':
+        from .scanner_service import request_enrollment
+        return request_enrollment(timeout=timeout, person=person)
+
     scanner = get_scanner()
+    if scanner.cache_generation == 0:
+        # No listener has loaded the matcher in this process: load it for the duplicate check
+        from .fingerprint_listener import fetch_templates
+        from ..database import get_db
+        conn = get_db()
+        try:
+            scanner.load_users(fetch_templates(conn.cursor(dictionary=True)))
+        finally:
+            conn.close()
     logger.info("Starting enrollment capture...")
-    template = scanner.capture_template(timeout=15)
-    if template:
+    result = scanner.enroll(timeout=timeout, on_sample=on_sample, person=person)
+    if result:
         logger.info("Enrollment capture successful.")
-        return template
+        return result
     logger.warning("Enrollment capture timed out.")
     return None
 
-# Export 'finger'-like object if needed, but we prefer direct usage
-finger = get_scanner()
+
+def templates_changed():
+    """Tells whoever matches scans to reload templates now rather than at its next refresh."""
+    if SCANNER_MODE == 'remote':
+        from .scanner_service import request_reload
+        request_reload()
+    elif _scanner_instance is not None and _scanner_instance.on_templates_changed:
+        _scanner_instance.on_templates_changed()
+
+
+def __getattr__(name):
+    # 'finger' used to be created at import, which opened the USB device in every
+    # process that imported this module. It is now created on first use, and only
+    # in the process that owns the scanner.
+    if name == 'finger':
+        return get_scanner() if SCANNER_MODE != 'remote' and owns_scanner() else None
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -1,81 +1,334 @@
 import os
+import json
 import logging
-from dotenv import load_dotenv
 import time
 import mysql.connector
 from ..database import get_db as connect_db
-# from ..hardware.lcd import lcd # LCD not supported
-from ..hardware.fingerprint import get_scanner
-from datetime import datetime, timedelta
+from ..hardware.lcd import lcd
+from ..hardware.fingerprint import get_scanner, AMBIGUOUS_POLICY, MATCH_THRESHOLD, MATCH_MIN_MARGIN
+from ..hardware.debounce import ExpiringSet, DEBOUNCE_SECONDS, DEBOUNCE_SEED_FROM_LOGS
+from ..utils.settings import get_settings
+from ..hardware.feedback import FeedbackDispatcher, FEEDBACK_LCD, ACCEPTED, REJECTED, DEBOUNCED
+from ..hardware.trace import open_trace
+from datetime import datetime
 import threading
 import queue
-
-load_dotenv()
+from contextlib import nullcontext, contextmanager
 
 # --- Constants ---
 PERSON_TYPE_STUDENT = 'student'
 PERSON_TYPE_TEACHER = 'teacher'
 
-# --- Logging ---
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO),
-                    format="%(asctime)s %(levelname)s %(name)s - %(message)s")
+# Scan outcomes passed to the feedback callback (see hardware/feedback.py for what each shows)
+FEEDBACK_ACCEPTED = ACCEPTED
+FEEDBACK_REJECTED = REJECTED
+FEEDBACK_DEBOUNCED = DEBOUNCED
+
 logger = logging.getLogger("fingerprint_listener")
 
+
+def fetch_templates(cursor):
+    """
+    All enrolled templates as one dict: { 'student_123:1': bytes, 'teacher_456': bytes }.
+    Keys are 'type_id:finger' for FingerprintTemplates rows; a person with none falls
+    back to the legacy single template column, keyed 'type_id'. See parse_person_key.
+    `cursor` must be a dictionary cursor.
+    """
+    cache = {}
+    enrolled = set()
+    try:
+        cursor.execute("SELECT person_type, person_id, finger, template FROM FingerprintTemplates")
+        rows = cursor.fetchall()
+    except mysql.connector.Error as err:
+        if err.errno != 1146:  # No such table
+            raise
+        # Not migrated yet: every enrolment is still in the legacy columns below
+        logger.warning("FingerprintTemplates missing; run scripts/migrate_fingerprint_templates.py.")
+        rows = []
+    for row in rows:
+        cache[f"{row['person_type']}_{row['person_id']}:{row['finger']}"] = row['template']
+        enrolled.add((row['person_type'], row['person_id']))
+
+    cursor.execute("SELECT id, fingerprint_template FROM Users WHERE fingerprint_template IS NOT NULL")
+    users = cursor.fetchall()
+    cursor.execute("SELECT id, fingerprint_template FROM Teachers WHERE fingerprint_template IS NOT NULL")
+    teachers = cursor.fetchall()
+
+    for p_type, rows in ((PERSON_TYPE_STUDENT, users), (PERSON_TYPE_TEACHER, teachers)):
+        for r in rows:
+            if r['fingerprint_template'] and (p_type, r['id']) not in enrolled:
+                cache[f"{p_type}_{r['id']}"] = r['fingerprint_template']
+    return cache
+
+
+def parse_person_key(key):
+    """'student_123:1' or 'student_123' -> ('student', 123)"""
+    p_type, p_id = key.split(':')[0].split('_')
+    return p_type, int(p_id)
+
+
+def store_template(cursor, person_type, person_id, finger, template, quality=None, duplicate=None):
+    """
+    Saves (or replaces) one finger's enrolment template. `duplicate` is the
+    (person key, score) of a suspected duplicate to flag it with. The caller commits.
+    """
+    duplicate_of, duplicate_score = (duplicate[0].split(':')[0], duplicate[1]) if duplicate else (None, None)
+    cursor.execute("""
+        INSERT INTO FingerprintTemplates (person_type, person_id, finger, template, quality, duplicate_of, duplicate_score)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+        ON DUPLICATE KEY UPDATE template = VALUES(template), quality = VALUES(quality),
+            duplicate_of = VALUES(duplicate_of), duplicate_score = VALUES(duplicate_score), created_at = NOW()
+    """, (person_type, person_id, finger, template, quality, duplicate_of, duplicate_score))
+
+
+class CaptureWorker(threading.Thread):
+    """
+    Polls one reader and hands templates to the listener's shared matcher and
+    writer. While the reader is disconnected it waits for the supervisor to
+    report it ready again.
+    """
+
+    def __init__(self, listener, device_index):
+        super().__init__(name=f"capture-{device_index}")
+        self.daemon = True
+        self.listener = listener
+        self.device_index = device_index
+
+    def run(self):
+        listener = self.listener
+        scanner = listener.scanner
+        lock = listener._capture_lock(self.device_index)
+        logger.info(f"Capture worker started for device {self.device_index}.")
+        while True:
+            if (listener._paused.is_set() or listener._disabled.is_set()
+                    or self.device_index in listener._paused_devices):
+                time.sleep(0.2)
+                continue
+            # The supervisor reopens lost readers; just wait for this one to be ready
+            if not scanner.wait_ready(self.device_index, timeout=1):
+                continue
+            try:
+                # We use a short timeout so pause() takes effect quickly
+                with lock:
+                    started = time.perf_counter()
+                    template = scanner.capture_template(timeout=1, device_index=self.device_index)
+                if template:
+                    listener._captures.put((template, self.device_index, time.perf_counter() - started,
+                                            time.monotonic()))
+            except Exception as e:
+                logger.error(f"Capture worker {self.device_index} error: {e}")
+                time.sleep(1)
+
+
 class FingerprintListener(threading.Thread):
-    def __init__(self, app, scan_queue):
+    """
+    Captures, matches and logs scans. Every open reader gets a CaptureWorker;
+    this thread matches their captures against the shared template cache and
+    writes the logs. `app` may be None when running inside the standalone
+    scanner service, which has no Flask application.
+    """
+
+    def __init__(self, app, scan_queue, scanner=None, feedback=None):
         super().__init__()
         self.daemon = True
         self.app = app
         self.scan_queue = scan_queue
-        self._first_scan_cache = {}
-        self.scanner = get_scanner()
+        # People logged within DEBOUNCE_SECONDS; shared by every reader
+        self.debounce = ExpiringSet()
+        # Opened in run() so a slow or missing device never delays app startup
+        self.scanner = scanner
+        # feedback(device_index, outcome) runs on the matching thread and must not block;
+        # by default it enqueues on a FeedbackDispatcher started in run()
+        self.feedback = feedback
+        self.dispatcher = None
+        self._paused = threading.Event()
+        self._disabled = threading.Event()  # fingerprint_listener_enabled = '0'
+        self._paused_devices = set()  # readers lent out by exclusive(device_index)
+        # One per reader, held while capturing; exclusive() takes them all
+        self._capture_locks = {}
+        self._workers = {}
+        self._captures = queue.Queue()  # (template, device_index, capture_seconds, captured_at)
+        self._refresh_requested = threading.Event()
+        # Health counters (see health())
+        self._pending_writes = 0
+        self._log_device_index = True  # cleared if FingerprintLogs predates migrate_log_device_index
+        self._stats_lock = threading.Lock()
+        self.last_write_at = None
+        self.last_write_error = None
+        self.last_cache_refresh_at = None
+        self.ambiguous_matches = 0
+        # Optional scan trace (FINGERPRINT_TRACE_PATH) for scripts/replay_trace.py
+        self.trace = open_trace()
+
+    def _context(self):
+        return self.app.app_context() if self.app is not None else nullcontext()
+
+    def pause(self):
+        """Stops capturing so another caller (e.g. enrolment) can use the device."""
+        self._paused.set()
+
+    def resume(self):
+        self._paused.clear()
+
+    def _signal(self, device_index, outcome):
+        if self.feedback is None:
+            return
+        try:
+            self.feedback(device_index, outcome)
+        except Exception as e:
+            logger.error(f"Feedback callback failed: {e}")
+
+    def _capture_lock(self, device_index):
+        return self._capture_locks.setdefault(device_index, threading.Lock())
+
+    @contextmanager
+    def exclusive(self, device_index=None):
+        """
+        Pauses the capture worker of `device_index` (every worker for None) and waits
+        for its in-flight capture, e.g. for enrolment. Other readers keep scanning.
+        """
+        if device_index is None:
+            self.pause()
+            indices = sorted(self._capture_locks.copy())
+        else:
+            self._paused_devices.add(device_index)
+            indices = [device_index]
+        locks = [self._capture_lock(i) for i in indices]
+        for lock in locks:
+            lock.acquire()
+        try:
+            yield
+        finally:
+            for lock in reversed(locks):
+                lock.release()
+            if device_index is None:
+                self.resume()
+            else:
+                self._paused_devices.discard(device_index)
+
+    def _ensure_workers(self):
+        """Starts a worker for every reader the SDK has reported, including ones still reconnecting."""
+        for index in self.scanner.known_device_indices():
+            worker = self._workers.get(index)
+            if worker is None or not worker.is_alive():
+                self._workers[index] = CaptureWorker(self, index)
+                self._workers[index].start()
+
+    def request_refresh(self):
+        """Reloads templates on the next loop instead of waiting for the periodic refresh."""
+        self._refresh_requested.set()
+
+    def health(self):
+        """Snapshot of device, matcher cache and attendance writer state for /readyz."""
+        scanner = self.scanner
+        with self._stats_lock:
+            pending = self._pending_writes
+            last_write = self.last_write_at
+        # Captures waiting to be matched and written, plus the write in progress
+        backlog = self._captures.qsize() + pending
+        with self._captures.mutex:
+            oldest = self._captures.queue[0][3] if self._captures.queue else None
+        return {
+            "running": self.is_alive(),
+            "paused": self._paused.is_set(),
+            "paused_devices": sorted(self._paused_devices),
+            "enabled": not self._disabled.is_set(),
+            "connected": bool(scanner and scanner.is_connected),
+            "devices": scanner.device_states() if scanner else [],
+            "disconnected_seconds": (
+                round(sum(d["disconnected_seconds"] for d in scanner.device_states()), 1) if scanner else 0
+            ),
+            "capture_workers": sum(w.is_alive() for w in list(self._workers.values())),
+            "banned_devices": sorted(scanner.banned_indices) if scanner else [],
+            "cache_generation": scanner.cache_generation if scanner else 0,
+            "cache_size": len(scanner.users_cache) if scanner else 0,
+            "recent_match_hits": scanner.recent.hits if scanner else 0,
+            "recent_match_misses": scanner.recent.misses if scanner else 0,
+            "last_cache_refresh_age_seconds": (
+                round(time.time() - self.last_cache_refresh_at, 1) if self.last_cache_refresh_at else None
+            ),
+            "last_write_age_seconds": round(time.time() - last_write, 1) if last_write else None,
+            "last_write_error": self.last_write_error,
+            "writer_backlog": backlog,
+            "oldest_capture_age_seconds": round(time.monotonic() - oldest, 2) if oldest else None,
+            "ambiguous_matches": self.ambiguous_matches,
+            "debounce_entries": len(self.debounce),
+            "feedback": dict(self.dispatcher.stats) if self.dispatcher else None,
+        }
 
     def _refresh_cache_from_db(self):
         """Loads all student/teacher templates from DB into the scanner cache."""
-        with self.app.app_context():
+        with self._context():
             conn = None
             try:
                 conn = connect_db()
-                cursor = conn.cursor(dictionary=True)
-                
-                # Fetch Users
-                cursor.execute("SELECT id, fingerprint_template FROM Users WHERE fingerprint_template IS NOT NULL")
-                users = cursor.fetchall()
-                
-                # Fetch Teachers
-                cursor.execute("SELECT id, fingerprint_template FROM Teachers WHERE fingerprint_template IS NOT NULL")
-                teachers = cursor.fetchall()
-
-                # Merge into a single dict: { 'student_123': bytes, 'teacher_456': bytes }
-                # We prefix IDs to distinguish types
-                cache = {}
-                for u in users:
-                    if u['fingerprint_template']:
-                        cache[f"student_{u['id']}"] = u['fingerprint_template']
-                for t in teachers:
-                    if t['fingerprint_template']:
-                        cache[f"teacher_{t['id']}"] = t['fingerprint_template']
-                
+                cache = fetch_templates(conn.cursor(dictionary=True))
                 self.scanner.load_users(cache)
+                self.last_cache_refresh_at = time.time()
+                self.scanner.arrival_windows.load_timetable(conn.cursor())
+                if self.trace:
+                    self.trace.cache(self.scanner.cache_generation, len(cache))
                 
             except Exception as e:
                 logger.error(f"Failed to refresh fingerprint cache: {e}")
             finally:
                 if conn: conn.close()
 
-    def _clear_old_scans(self):
-        now = datetime.now()
-        keys_to_remove = []
-        for key, scan_time in self._first_scan_cache.items():
-            if (now - scan_time) > timedelta(hours=24) or \
-               (now.hour >= 22 and scan_time.date() < now.date()):
-                keys_to_remove.append(key)
-        for key in keys_to_remove:
-            self._first_scan_cache.pop(key)
-
-    def log_fingerprint(self, person_type, person_id):
-        with self.app.app_context():
+    def _subscribe_settings(self):
+        """Applies admin settings live; the settings cache calls back within SETTINGS_POLL_SECONDS of a change."""
+        settings = get_settings()
+        settings.subscribe('fingerprint_listener_enabled', self._on_enabled_changed)
+        settings.subscribe('match_threshold', self._on_match_threshold_changed)
+        settings.subscribe('match_min_margin', self._on_min_margin_changed)
+        settings.subscribe('debounce_seconds', self._on_debounce_changed)
+
+    def _on_enabled_changed(self, value):
+        if value == '0':
+            if not self._disabled.is_set():
+                logger.info("Fingerprint listener disabled by settings.")
+            self._disabled.set()
+        elif self._disabled.is_set():
+            logger.info("Fingerprint listener enabled by settings.")
+            self._disabled.clear()
+
+    def _on_match_threshold_changed(self, value):
+        self.scanner.match_threshold = int(value) if value else MATCH_THRESHOLD
+        self.scanner.recent.clear()  # cached matches were accepted under the old threshold
+
+    def _on_min_margin_changed(self, value):
+        self.scanner.min_margin = int(value) if value else MATCH_MIN_MARGIN
+
+    def _on_debounce_changed(self, value):
+        self.debounce.window = float(value) if value else DEBOUNCE_SECONDS
+
+    def _seed_debounce(self):
+        """Carries the debounce window over a restart from the latest FingerprintLogs."""
+        with self._context():
+            conn = None
+            try:
+                conn = connect_db()
+                seeded = self.debounce.seed_from_logs(conn.cursor())
+                logger.info(f"Debounce seeded with {seeded} recent scan(s).")
+            except Exception as e:
+                logger.error(f"Failed to seed debounce from logs: {e}")
+            finally:
+                if conn: conn.close()
+
+    def log_fingerprint(self, person_type, person_id, device_index=None):
+        with self._stats_lock:
+            self._pending_writes += 1
+        started = time.perf_counter()
+        ok = False
+        try:
+            ok = self._write_log(person_type, person_id, device_index)
+        finally:
+            with self._stats_lock:
+                self._pending_writes -= 1
+            if self.trace:
+                self.trace.write(f"{person_type}_{person_id}", ok, time.perf_counter() - started)
+
+    def _write_log(self, person_type, person_id, device_index=None):
+        with self._context():
             conn = None
             try:
                 conn = connect_db()
@@ -94,11 +347,10 @@ class FingerprintListener(threading.Thread):
                     new_type = 'OUT'
                 
                 # Insert
-                cursor.execute(
-                    "INSERT INTO FingerprintLogs (person_type, person_id, log_type) VALUES (%s, %s, %s)",
-                    (person_type, person_id, new_type)
-                )
+                self._insert_log(cursor, person_type, person_id, new_type, device_index)
                 conn.commit()
+                self.last_write_at = time.time()
+                self.last_write_error = None
                 
                 action = "Checked IN" if new_type == 'IN' else "Checked OUT"
                 logger.info(f"[LOG] {person_type} ID {person_id} - {action}")
@@ -107,68 +359,142 @@ class FingerprintListener(threading.Thread):
                     "person_type": person_type,
                     "person_id": person_id,
                     "type": new_type,
+                    "device_index": device_index,
                     "timestamp": datetime.now().isoformat()
                 })
+                return True
             except Exception as e:
+                self.last_write_error = str(e)
                 logger.error(f"DB error during logging: {e}")
+                return False
+            finally:
+                if conn: conn.close()
+
+    def _insert_log(self, cursor, person_type, person_id, log_type, device_index):
+        if self._log_device_index:
+            try:
+                cursor.execute(
+                    "INSERT INTO FingerprintLogs (person_type, person_id, log_type, device_index) VALUES (%s, %s, %s, %s)",
+                    (person_type, person_id, log_type, device_index)
+                )
+                return
+            except mysql.connector.Error as err:
+                if err.errno != 1054:  # Unknown column
+                    raise
+                # Not migrated yet: keep logging attendance without the reader number
+                logger.warning("FingerprintLogs.device_index missing; run scripts/migrate_log_device_index.py.")
+                self._log_device_index = False
+        cursor.execute(
+            "INSERT INTO FingerprintLogs (person_type, person_id, log_type) VALUES (%s, %s, %s)",
+            (person_type, person_id, log_type)
+        )
+
+    def record_ambiguous(self, result, device_index, decision):
+        """Stores a scan whose best and second-best people scored too close, for review."""
+        self.ambiguous_matches += 1
+        best_type, best_id = parse_person_key(result.candidates[0][0])
+        second_type, second_id = parse_person_key(result.candidates[1][0])
+        with self._context():
+            conn = None
+            try:
+                conn = connect_db()
+                cursor = conn.cursor()
+                cursor.execute("""
+                    INSERT INTO AmbiguousMatches
+                        (device_index, decision, best_person_type, best_person_id, best_score,
+                         second_person_type, second_person_id, second_score, margin, candidates)
+                    VALUES (%s, %s, %s, %s, %s, %s, %s, %s, %s, %s)
+                """, (device_index, decision, best_type, best_id, result.candidates[0][1],
+                      second_type, second_id, result.candidates[1][1], result.margin,
+                      json.dumps(result.candidates)))
+                conn.commit()
+            except Exception as e:
+                logger.error(f"DB error recording ambiguous match: {e}")
             finally:
                 if conn: conn.close()
 
     def run(self):
         logger.info("Fingerprint listener started.")
+        if self.scanner is None:
+            self.scanner = get_scanner()
+        if self.trace:
+            self.scanner.on_error = self.trace.error
+        if self.feedback is None:
+            self.dispatcher = FeedbackDispatcher(self.scanner, lcd=lcd if FEEDBACK_LCD else None)
+            self.dispatcher.start()
+            self.feedback = self.dispatcher.emit
+        self.scanner.capture_guard = self.exclusive
+        self.scanner.on_templates_changed = self.request_refresh
         
+        self._subscribe_settings()
+
         # Initial Cache Load
         self._refresh_cache_from_db()
+        if DEBOUNCE_SEED_FROM_LOGS:
+            self._seed_debounce()
         
         last_cache_refresh = time.time()
 
         while True:
-            # Refresh cache every 60 seconds to pick up new enrollments
-            if time.time() - last_cache_refresh > 60:
+            # Refresh cache every 60 seconds (or on request) to pick up new enrollments
+            if self._refresh_requested.is_set() or time.time() - last_cache_refresh > 60:
+                self._refresh_requested.clear()
                 self._refresh_cache_from_db()
                 last_cache_refresh = time.time()
+                if self.trace:
+                    self.trace.flush()
 
             try:
-                # 1. Check if allowed to run
-                # (Skipping DB check every loop for performance, relies on periodic refresh or restart if settings change)
-                
-                # 2. Capture
-                # We use a short timeout so we can check other conditions
-                template = self.scanner.capture_template(timeout=1)
-                
-                if template:
-                    # 3. Match
-                    match_id, score = self.scanner.match_template(template)
-                    
-                    if match_id:
-                        # match_id is string "student_123" or "teacher_456"
-                        p_type, p_id = match_id.split('_')
-                        p_id = int(p_id)
-                        
-                        logger.info(f"Matched {p_type} {p_id} (Score: {score})")
-                        
-                        # Logic for "First Scan" vs "Log" (from original app)
-                        # Original app logic: If scan is new -> "Scan again". If cached -> "Logged".
-                        # Simplification for ZK: Just log it, but utilize debounce.
-                        
-                        cache_key = (p_type, p_id)
-                        now = datetime.now()
-                        
-                        # Check debounce (e.g., don't log same person within 1 minute)
-                        last_scan = self._first_scan_cache.get(cache_key)
-                        if last_scan and (now - last_scan) < timedelta(minutes=1):
-                            logger.info("Debounced scan.")
-                            continue
-                            
-                        self._first_scan_cache[cache_key] = now
-                        self.log_fingerprint(p_type, p_id)
-                        
-                        # Visual feedback delay
-                        time.sleep(1) 
-                    else:
-                        logger.info("Finger not recognized.")
-                        time.sleep(1)
-                
+                # 1. Check if allowed to run (the settings cache flips _disabled; no DB access here)
+                self._ensure_workers()
+
+                # 2. Capture (done by the per-reader workers)
+                try:
+                    template, device_index, capture_seconds, _ = self._captures.get(timeout=0.5)
+                except queue.Empty:
+                    continue
+                if self._disabled.is_set():
+                    continue  # captured just before the listener was switched off
+
+                # 3. Match
+                match_started = time.perf_counter()
+                result = self.scanner.match(template)
+                match_id, score = result.key, result.score
+                if self.trace:
+                    self.trace.capture(template, device_index, capture_seconds)
+                    self.trace.match(match_id, score, time.perf_counter() - match_started)
+
+                if result.ambiguous:
+                    rejected = AMBIGUOUS_POLICY == 'reject'
+                    logger.warning(f"Ambiguous match on device {device_index}: {result.candidates} "
+                                   f"(margin {result.margin}){'; rejected' if rejected else ''}")
+                    self.record_ambiguous(result, device_index, 'rejected' if rejected else 'flagged')
+                    if rejected:
+                        self._signal(device_index, FEEDBACK_REJECTED)
+                        continue
+
+                if match_id:
+                    # match_id is "student_123:1" (or legacy "teacher_456")
+                    p_type, p_id = parse_person_key(match_id)
+
+                    logger.info(f"Matched {p_type} {p_id} on device {device_index} (Score: {score})")
+
+                    # Logic for "First Scan" vs "Log" (from original app)
+                    # Original app logic: If scan is new -> "Scan again". If cached -> "Logged".
+                    # Simplification for ZK: Just log it, but utilize debounce.
+
+                    # Check debounce (don't log same person within DEBOUNCE_SECONDS)
+                    if self.debounce.check_and_add((p_type, p_id)):
+                        logger.info("Debounced scan.")
+                        self._signal(device_index, FEEDBACK_DEBOUNCED)
+                        continue
+
+                    self._signal(device_index, FEEDBACK_ACCEPTED)
+                    self.log_fingerprint(p_type, p_id, device_index)
+                else:
+                    logger.info(f"Finger not recognized on device {device_index}.")
+                    self._signal(device_index, FEEDBACK_REJECTED)
+
             except Exception as e:
                 logger.error(f"Listener loop error: {e}")
                 time.sleep(1)
@@ -0,0 +1,116 @@
+"""
+Adaptive capture polling. Readers are polled fast while a finger is likely
+(just after a scan, or inside an arrival/departure window) and back off
+exponentially when idle, so peak latency drops and the overnight loop stays
+almost idle.
+"""
+import os
+import time
+import threading
+from datetime import datetime, timedelta
+
+# --- Poller Constants ---
+POLL_MIN_MS = int(os.getenv("POLL_MIN_MS", "20"))
+POLL_MAX_MS = int(os.getenv("POLL_MAX_MS", "500"))
+POLL_BACKOFF = float(os.getenv("POLL_BACKOFF", "1.5"))
+POLL_HOT_SECONDS = float(os.getenv("POLL_HOT_SECONDS", "15"))  # fast polling after a scan
+# Always-fast windows, "HH:MM-HH:MM,..."; the timetable adds per-weekday windows on top
+POLL_FAST_WINDOWS = os.getenv("POLL_FAST_WINDOWS", "06:30-08:00")
+# Timetable windows: before the first period / around the last one, in minutes
+ARRIVAL_LEAD_MINUTES = int(os.getenv("ARRIVAL_LEAD_MINUTES", "60"))
+DEPARTURE_TAIL_MINUTES = int(os.getenv("DEPARTURE_TAIL_MINUTES", "45"))
+ERROR_BACKOFF_MAX_SECONDS = 2.0
+
+
+def _minutes(value):
+    """'07:30' or a TIME column (timedelta) -> minutes after midnight."""
+    if isinstance(value, timedelta):
+        return int(value.total_seconds() // 60)
+    hours, minutes = value.strip().split(":")
+    return int(hours) * 60 + int(minutes)
+
+
+def parse_windows(spec):
+    """'06:30-08:00,15:30-17:00' -> [(390, 480), (930, 1020)]"""
+    windows = []
+    for part in spec.split(","):
+        if part.strip():
+            start, end = part.split("-")
+            windows.append((_minutes(start), _minutes(end)))
+    return windows
+
+
+class ArrivalWindows:
+    """Times of day when people are expected at the gate. Shared by every reader's poller."""
+
+    def __init__(self, spec=POLL_FAST_WINDOWS):
+        self.daily = parse_windows(spec)
+        self.by_weekday = {}  # 'Monday' -> [(start_minute, end_minute), ...]
+        self._lock = threading.Lock()
+
+    def load_timetable(self, cursor):
+        """Derives arrival and departure windows from each weekday's first and last period."""
+        cursor.execute("SELECT day_of_week, MIN(start_time), MAX(end_time) FROM Timetable GROUP BY day_of_week")
+        by_weekday = {}
+        for day, first_start, last_end in cursor.fetchall():
+            start, end = _minutes(first_start), _minutes(last_end)
+            by_weekday[day] = [(start - ARRIVAL_LEAD_MINUTES, start + 15), (end - 10, end + DEPARTURE_TAIL_MINUTES)]
+        with self._lock:
+            self.by_weekday = by_weekday
+
+    def active(self, now=None):
+        now = now or datetime.now()
+        minute = now.hour * 60 + now.minute
+        with self._lock:
+            windows = self.daily + self.by_weekday.get(now.strftime("%A"), [])
+        return any(start <= minute < end for start, end in windows)
+
+
+class AdaptivePoller:
+    """
+    Interval between polls of one reader: POLL_MIN_MS while hot, otherwise
+    growing by POLL_BACKOFF per empty poll up to POLL_MAX_MS.
+    """
+
+    def __init__(self, windows=None, min_ms=POLL_MIN_MS, max_ms=POLL_MAX_MS,
+                 backoff=POLL_BACKOFF, hot_seconds=POLL_HOT_SECONDS):
+        self.windows = windows
+        self.min_interval = min_ms / 1000
+        self.max_interval = max(max_ms, min_ms) / 1000
+        self.backoff = backoff
+        self.hot_seconds = hot_seconds
+        self.interval = self.min_interval
+        self.hot_until = 0.0
+        self.error_delay = 0.0
+        self._window_checked_at = 0.0
+        self._in_window = False
+
+    def activity(self):
+        """A finger was seen: poll fast for a while."""
+        self.hot_until = time.monotonic() + self.hot_seconds
+        self.interval = self.min_interval
+        self.error_delay = 0.0
+
+    def hot(self):
+        now = time.monotonic()
+        if now < self.hot_until:
+            return True
+        if self.windows is not None:
+            if now - self._window_checked_at > 30:
+                self._in_window = self.windows.active()
+                self._window_checked_at = now
+            return self._in_window
+        return False
+
+    def idle(self):
+        """Seconds to wait after an empty poll."""
+        if self.hot():
+            self.interval = self.min_interval
+        else:
+            self.interval = min(self.max_interval, self.interval * self.backoff)
+        return self.interval
+
+    def failed(self):
+        """Seconds to wait after a capture error: doubles up to ERROR_BACKOFF_MAX_SECONDS."""
+        self.error_delay = min(ERROR_BACKOFF_MAX_SECONDS, max(0.1, self.error_delay * 2))
+        return self.error_delay
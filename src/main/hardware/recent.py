@@ -0,0 +1,63 @@
+"""
+Recent-match cache. People often place the same finger two or three times in
+a row; each repeat is compared 1:1 against the last few seconds' confident
+matches before the full 1:N search, and a strong hit skips that search.
+"""
+import os
+import time
+import threading
+from collections import deque
+
+# --- Recent Match Constants ---
+RECENT_MATCH_SIZE = int(os.getenv("RECENT_MATCH_SIZE", "8"))
+RECENT_MATCH_SECONDS = float(os.getenv("RECENT_MATCH_SECONDS", "10"))
+# 1:1 score against a recent capture that counts as the same finger (stricter than MATCH_THRESHOLD)
+RECENT_MATCH_SCORE = int(os.getenv("RECENT_MATCH_SCORE", "90"))
+
+
+class RecentMatches:
+    """Bounded, time-expiring list of (capture template, match) pairs, newest first."""
+
+    def __init__(self, size=RECENT_MATCH_SIZE, ttl=RECENT_MATCH_SECONDS, min_score=RECENT_MATCH_SCORE):
+        self.ttl = ttl
+        self.min_score = min_score
+        self._entries = deque(maxlen=max(1, size))  # (expires_at, template, result)
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def _live(self):
+        now = time.monotonic()
+        with self._lock:
+            while self._entries and self._entries[-1][0] <= now:
+                self._entries.pop()
+            return list(self._entries)
+
+    def lookup(self, template, match_1to1):
+        """
+        Returns the cached result whose capture scores at least min_score against
+        `template` under `match_1to1(stored, scanned)`, or None.
+        """
+        if self.ttl <= 0:
+            return None
+        for _, stored, result in self._live():
+            try:
+                score = match_1to1(stored, template)
+            except Exception:
+                continue
+            if score >= self.min_score:
+                self.hits += 1
+                return result
+        self.misses += 1
+        return None
+
+    def add(self, template, result):
+        """Remembers a confident match. Entries are added newest-first, so the oldest expire from the end."""
+        if self.ttl <= 0:
+            return
+        with self._lock:
+            self._entries.appendleft((time.monotonic() + self.ttl, template, result))
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
@@ -0,0 +1,208 @@
+import os
+import json
+import base64
+import threading
+import time
+import logging
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib import request as urlrequest
+from urllib.error import URLError, HTTPError
+from urllib.parse import urlparse, parse_qs
+
+from .fingerprint import EnrollmentError, DuplicateFingerError, Enrollment, ENROLL_SAMPLES
+
+logger = logging.getLogger(__name__)
+
+# --- Scanner Service Constants ---
+# Loopback only: the service hands out raw templates and must not be exposed
+SCANNER_SERVICE_HOST = os.getenv("SCANNER_SERVICE_HOST", "127.0.0.1")
+SCANNER_SERVICE_PORT = int(os.getenv("SCANNER_SERVICE_PORT", "8765"))
+SCANNER_EVENT_BUFFER = int(os.getenv("SCANNER_EVENT_BUFFER", "500"))
+SCANNER_CLIENT_TIMEOUT = float(os.getenv("SCANNER_CLIENT_TIMEOUT", "5"))
+
+
+class EventLog:
+    """
+    Bounded, sequenced buffer of scan events. Quacks like the listener's
+    scan_queue (put), and lets any number of web processes read with `since`.
+    """
+
+    def __init__(self, maxlen=SCANNER_EVENT_BUFFER):
+        self._events = deque(maxlen=maxlen)
+        self._seq = 0
+        self._lock = threading.Lock()
+
+    def put(self, event):
+        with self._lock:
+            self._seq += 1
+            self._events.append(dict(event, seq=self._seq))
+
+    def since(self, after):
+        with self._lock:
+            return [e for e in self._events if e["seq"] > after], self._seq
+
+
+class ScannerService:
+    """
+    Owns the fingerprint device, the template matcher and the attendance writer
+    in a single process, and serves them to the web tier over loopback HTTP:
+
+        GET  /status                 device and cache state
+        GET  /events?after=<seq>     scan events newer than `seq`
+        POST /enroll?timeout=<s>&person=<key>
+                                     enrol one finger of `person`: merged template (base64),
+                                     quality and suspected duplicates
+        POST /reload                 reload templates from the database now
+    """
+
+    def __init__(self, host=None, port=None):
+        from .fingerprint import get_scanner
+        from .fingerprint_listener import FingerprintListener
+
+        self.host = host or SCANNER_SERVICE_HOST
+        self.port = port or SCANNER_SERVICE_PORT
+        self.events = EventLog()
+        self.scanner = get_scanner()
+        self.listener = FingerprintListener(None, self.events, scanner=self.scanner)
+        self.started_at = time.time()
+        self._server = ThreadingHTTPServer((self.host, self.port), self._make_handler())
+        self._server.daemon_threads = True
+
+    def status(self):
+        status = self.listener.health()
+        status["uptime_seconds"] = round(time.time() - self.started_at, 1)
+        return status
+
+    def enroll(self, timeout, person=None):
+        """Enrols one finger; the scanner pauses the listener through its capture guard."""
+        logger.info("Starting enrollment capture...")
+        return self.scanner.enroll(timeout=timeout, person=person)
+
+    def _make_handler(self):
+        service = self
+
+        class Handler(BaseHTTPRequestHandler):
+            def _reply(self, status, payload):
+                body = json.dumps(payload).encode()
+                self.send_response(status)
+                self.send_header("Content-Type", "application/json")
+                self.send_header("Content-Length", str(len(body)))
+                self.end_headers()
+                self.wfile.write(body)
+
+            def do_GET(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/status":
+                    return self._reply(200, service.status())
+                if url.path == "/events":
+                    try:
+                        after = int(query.get("after", ["0"])[0])
+                    except ValueError:
+                        return self._reply(400, {"error": "after must be an integer"})
+                    events, last_seq = service.events.since(after)
+                    return self._reply(200, {"events": events, "last_seq": last_seq})
+                return self._reply(404, {"error": "Not found"})
+
+            def do_POST(self):
+                url = urlparse(self.path)
+                query = parse_qs(url.query)
+                if url.path == "/enroll":
+                    try:
+                        timeout = min(float(query.get("timeout", ["15"])[0]), 60)
+                    except ValueError:
+                        return self._reply(400, {"error": "timeout must be a number"})
+                    person = query.get("person", [None])[0]
+                    try:
+                        result = service.enroll(timeout, person)
+                    except DuplicateFingerError as e:
+                        return self._reply(409, {"error": str(e), "duplicates": e.duplicates})
+                    except EnrollmentError as e:
+                        return self._reply(422, {"error": str(e)})
+                    if not result:
+                        return self._reply(408, {"error": "Enrollment capture timed out"})
+                    return self._reply(200, {"template": base64.b64encode(result.template).decode(),
+                                             "quality": result.quality, "duplicates": result.duplicates})
+                if url.path == "/reload":
+                    service.listener.request_refresh()
+                    return self._reply(202, {"status": "reload requested"})
+                return self._reply(404, {"error": "Not found"})
+
+            def log_message(self, fmt, *args):
+                logger.debug("scanner-service %s - %s", self.address_string(), fmt % args)
+
+        return Handler
+
+    def serve_forever(self):
+        self.listener.start()
+        logger.info("Scanner service listening on http://%s:%s", self.host, self.port)
+        try:
+            self._server.serve_forever()
+        finally:
+            self._server.server_close()
+            self.scanner.close()
+
+
+# --- Client helpers used by the web tier in SCANNER_MODE=remote ---
+
+def _service_url(path):
+    return f"http://{SCANNER_SERVICE_HOST}:{SCANNER_SERVICE_PORT}{path}"
+
+
+def _call(method, path, timeout=None):
+    req = urlrequest.Request(_service_url(path), method=method, data=b"" if method == "POST" else None)
+    with urlrequest.urlopen(req, timeout=timeout or SCANNER_CLIENT_TIMEOUT) as resp:
+        return json.loads(resp.read().decode())
+
+
+def request_enrollment(timeout=15, person=None):
+    """
+    Asks the scanner service to enrol one finger of `person`. Returns an Enrollment
+    or None; raises EnrollmentError when the service rejected the samples.
+    """
+    path = f"/enroll?timeout={timeout}" + (f"&person={person}" if person else "")
+    try:
+        payload = _call("POST", path, timeout=timeout * ENROLL_SAMPLES + SCANNER_CLIENT_TIMEOUT)
+        logger.info("Enrollment capture successful.")
+        return Enrollment(base64.b64decode(payload["template"]), payload["quality"],
+                          [tuple(d) for d in payload["duplicates"]])
+    except HTTPError as e:
+        if e.code == 409:
+            raise DuplicateFingerError([tuple(d) for d in json.loads(e.read().decode())["duplicates"]])
+        if e.code == 422:
+            raise EnrollmentError(json.loads(e.read().decode()).get("error", "Enrollment rejected"))
+        logger.warning("Enrollment capture failed: HTTP %s", e.code)
+    except (URLError, OSError, ValueError, KeyError) as e:
+        logger.error("Scanner service unavailable for enrollment: %s", e)
+    return None
+
+
+def request_reload():
+    """Tells the scanner service to pick up newly enrolled templates."""
+    try:
+        _call("POST", "/reload")
+    except (URLError, OSError, ValueError) as e:
+        logger.warning("Could not ask scanner service to reload templates: %s", e)
+
+
+def fetch_events(after=0):
+    """Returns (events, last_seq) from the scanner service, or ([], after) if it is down."""
+    try:
+        payload = _call("GET", f"/events?after={int(after)}")
+        if payload["last_seq"] < after:
+            # The service restarted and its sequence began again
+            payload = _call("GET", "/events?after=0")
+        return payload["events"], payload["last_seq"]
+    except (URLError, OSError, ValueError, KeyError) as e:
+        logger.warning("Scanner service unavailable: %s", e)
+        return [], after
+
+
+def fetch_status():
+    """Returns the scanner service status dict, or None if it is unreachable."""
+    try:
+        return _call("GET", "/status")
+    except (URLError, OSError, ValueError) as e:
+        logger.warning("Scanner service unavailable: %s", e)
+        return None
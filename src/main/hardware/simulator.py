@@ -0,0 +1,376 @@
+"""
+Simulated ZKFP2 driver (FINGERPRINT_BACKEND=simulator).
+
+Drop-in for `zkfp.ZKFP2` so the listener, matcher, writer and the reconnect /
+ban logic can run on a machine without the SDK or a ZK9500 attached:
+
+- templates are synthetic and deterministic for a seed and person key;
+- DBMatch / DBIdentify score genuine and impostor pairs from configurable
+  distributions and burn a configurable amount of CPU per comparison;
+- AcquireTemplate replays an arrival script ("600/1200" = 600 placements
+  spread over 20 minutes; phases are comma-separated and run back to back),
+  drawing people from the templates mirrored into the device cache (DBAdd).
+  Each finger stays on the sensor for SIMULATOR_DWELL_SECONDS, so people
+  queue at a busy lane;
+- devices unplug at random, raising the SDK's "Invalid Handle" error on the
+  open handle and refusing OpenDevice until they come back.
+"""
+import os
+import time
+import random
+import hashlib
+import base64
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+
+def _pair(name, default):
+    mean, sd = os.getenv(name, default).split(",")
+    return float(mean), float(sd)
+
+
+# --- Simulator Constants ---
+SIMULATOR_SEED = int(os.getenv("SIMULATOR_SEED", "1"))
+SIMULATOR_DEVICES = int(os.getenv("SIMULATOR_DEVICES", "1"))
+SIMULATOR_SCRIPT = os.getenv("SIMULATOR_SCRIPT", "600/1200")
+SIMULATOR_SPEED = float(os.getenv("SIMULATOR_SPEED", "1"))  # >1 compresses script and disconnect time
+SIMULATOR_REPEAT_RATE = float(os.getenv("SIMULATOR_REPEAT_RATE", "0.1"))  # same finger placed again
+SIMULATOR_UNKNOWN_RATE = float(os.getenv("SIMULATOR_UNKNOWN_RATE", "0.02"))  # finger not enrolled
+SIMULATOR_MATCH_LATENCY_US = float(os.getenv("SIMULATOR_MATCH_LATENCY_US", "50"))  # per comparison
+SIMULATOR_GENUINE_SCORE = _pair("SIMULATOR_GENUINE_SCORE", "92,6")  # mean,sd
+SIMULATOR_IMPOSTOR_SCORE = _pair("SIMULATOR_IMPOSTOR_SCORE", "25,12")  # mean,sd
+SIMULATOR_DISCONNECT_EVERY_SECONDS = float(os.getenv("SIMULATOR_DISCONNECT_EVERY_SECONDS", "0"))  # mean; 0 = never
+SIMULATOR_DISCONNECT_SECONDS = float(os.getenv("SIMULATOR_DISCONNECT_SECONDS", "10"))
+SIMULATOR_DWELL_SECONDS = float(os.getenv("SIMULATOR_DWELL_SECONDS", "0.6"))  # finger stays on the sensor
+
+TEMPLATE_SIZE = 1024
+IDENTIFY_THRESHOLD = 70  # SDK default for DBIdentify
+_MAGIC = b"SIMT"
+_HEADER_SIZE = len(_MAGIC) + 16 + 4
+
+
+class SimulatorError(Exception):
+    """Raised with the same messages as the SDK's errors so callers can't tell them apart."""
+
+
+def _template(identity, sample):
+    header = _MAGIC + identity + sample.to_bytes(4, "big")
+    return header + hashlib.shake_256(header).digest(TEMPLATE_SIZE - _HEADER_SIZE)
+
+
+def identity_of(template):
+    """Finger identity of a template. Templates not made here (e.g. real enrolments) hash to one."""
+    template = bytes(template)
+    if template[:len(_MAGIC)] == _MAGIC and len(template) >= _HEADER_SIZE:
+        return template[len(_MAGIC):len(_MAGIC) + 16]
+    return hashlib.sha256(template).digest()[:16]
+
+
+def synthetic_template(person_key, finger=0, seed=SIMULATOR_SEED):
+    """Enrolment template for `person_key` (e.g. 'student_12'); stable for a seed."""
+    identity = hashlib.sha256(f"{seed}:{person_key}:{finger}".encode()).digest()[:16]
+    return _template(identity, 0)
+
+
+def parse_script(script):
+    """'600/1200,50/600' -> [(600, 1200.0), (50, 600.0)]"""
+    phases = []
+    for phase in script.split(","):
+        if phase.strip():
+            count, seconds = phase.split("/")
+            phases.append((int(count), float(seconds)))
+    return phases
+
+
+def arrival_times(script, seed=SIMULATOR_SEED, repeat_rate=SIMULATOR_REPEAT_RATE):
+    """
+    Sorted (seconds_from_start, is_repeat) placements for an arrival script.
+    Within a phase arrivals are uniform at random, so bursts happen naturally.
+    """
+    rng = random.Random(seed)
+    times = []
+    offset = 0.0
+    for count, seconds in parse_script(script):
+        for _ in range(count):
+            at = offset + rng.uniform(0, seconds)
+            times.append((at, False))
+            if rng.random() < repeat_rate:
+                times.append((at + rng.uniform(1, 4), True))
+        offset += seconds
+    times.sort()
+    return times
+
+
+def _spin(seconds):
+    # time.sleep can't do microseconds (15 ms resolution on Windows); matching is CPU work anyway
+    end = time.perf_counter() + seconds
+    while time.perf_counter() < end:
+        pass
+
+
+class _Device:
+    def __init__(self, index, rng):
+        self.index = index
+        self.rng = rng
+        self.unplugged_until = 0.0
+        self.next_disconnect = None
+
+    def schedule_disconnect(self, now):
+        if SIMULATOR_DISCONNECT_EVERY_SECONDS > 0:
+            self.next_disconnect = now + self.rng.expovariate(1 / SIMULATOR_DISCONNECT_EVERY_SECONDS)
+
+    def plugged(self, now):
+        if self.next_disconnect is not None and now >= self.next_disconnect:
+            self.unplugged_until = self.next_disconnect + SIMULATOR_DISCONNECT_SECONDS
+            self.next_disconnect = None
+            logger.warning(f"[SIMULATOR] Device {self.index} unplugged for {SIMULATOR_DISCONNECT_SECONDS:g}s")
+            return False
+        return now >= self.unplugged_until
+
+
+class _Bus:
+    """
+    State shared by every driver instance in the process, as a USB bus would be:
+    the readers, the arrival script and the people queuing at each lane.
+    """
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.started = time.perf_counter()
+        self.rng = random.Random(SIMULATOR_SEED)
+        self.devices = [_Device(i, random.Random(SIMULATOR_SEED * 1000 + i)) for i in range(SIMULATOR_DEVICES)]
+        self.arrivals = arrival_times(SIMULATOR_SCRIPT)
+        self.next_arrival = 0
+        self.backlog = {}  # device index -> [identity, ...] waiting at that lane
+        self.on_sensor = {}  # device index -> (identity, lifts_at)
+        self.population = set()  # identities enrolled in the device caches
+        self.remaining = []  # shuffled identities not yet delivered this round
+        self.last_identity = None
+        self.sample = 0
+        self.stats = {"placements": 0, "repeats": 0, "unknown": 0, "matches": 0,
+                      "identifies": 0, "disconnects": 0}
+        logger.info(f"[SIMULATOR] {SIMULATOR_DEVICES} device(s), script '{SIMULATOR_SCRIPT}' "
+                    f"({len(self.arrivals)} placements) at {SIMULATOR_SPEED:g}x speed")
+
+    def now(self):
+        return (time.perf_counter() - self.started) * SIMULATOR_SPEED
+
+    def enqueue_due(self, now):
+        """Moves due arrivals onto their lane's backlog; people queue while a reader is down."""
+        while self.next_arrival < len(self.arrivals) and self.arrivals[self.next_arrival][0] <= now:
+            _, is_repeat = self.arrivals[self.next_arrival]
+            self.next_arrival += 1
+            identity = self.pick(is_repeat)
+            if identity is not None:
+                lane = self.rng.randrange(len(self.devices))
+                self.backlog.setdefault(lane, []).append(identity)
+
+    def pick(self, is_repeat):
+        if is_repeat and self.last_identity is not None:
+            self.stats["repeats"] += 1
+            return self.last_identity
+        if self.rng.random() < SIMULATOR_UNKNOWN_RATE:
+            self.stats["unknown"] += 1
+            return self.rng.getrandbits(128).to_bytes(16, "big")
+        if not self.remaining:
+            # Everyone has been seen once; start another round
+            self.remaining = sorted(self.population)
+            self.rng.shuffle(self.remaining)
+        if not self.remaining:
+            return None
+        self.last_identity = self.remaining.pop()
+        return self.last_identity
+
+
+_bus = None
+_bus_lock = threading.Lock()
+
+
+def _get_bus():
+    global _bus
+    with _bus_lock:
+        if _bus is None:
+            _bus = _Bus()
+        return _bus
+
+
+class SimulatedZKFP2:
+    """
+    Implements the subset of `zkfp.ZKFP2` the application uses, with the same
+    signatures. Like the SDK wrapper, each instance holds one device handle.
+    """
+
+    def __init__(self):
+        self.devHandle = None
+        self.dbHandle = None
+        self.dev_serial_number = None
+        self.width = 300
+        self.height = 400
+        self._device = None
+        self._db = {}  # fid -> template
+
+    @property
+    def stats(self):
+        return _get_bus().stats
+
+    def _error(self, message):
+        raise SimulatorError(message)
+
+    # --- Device lifecycle ---
+
+    def Init(self):
+        _get_bus()
+
+    def Terminate(self):
+        pass
+
+    def GetDeviceCount(self):
+        return len(_get_bus().devices)
+
+    def OpenDevice(self, index=0):
+        bus = _get_bus()
+        if not 0 <= index < len(bus.devices):
+            self._error("Invalid parameter")
+        with bus.lock:
+            device = bus.devices[index]
+            now = bus.now()
+            if not device.plugged(now):
+                self._error("Failed to start the device")
+            device.schedule_disconnect(now)
+        self._device = device
+        self.devHandle = index + 1
+        self.dev_serial_number = f"SIM{SIMULATOR_SEED:04d}{index:02d}"
+        self.DBInit()
+        return self.devHandle
+
+    def CloseDevice(self):
+        self._device = None
+        self.devHandle = None
+
+    def SetParameters(self, *args):
+        pass
+
+    def SetIndicator(self, name, on=True):
+        if name not in ("white", "green", "red", "beep"):
+            raise ValueError(f"Invalid indicator: {name}")
+        if self.devHandle is None:
+            self._error("Device not initialized.")
+
+    def Light(self, color, duration=0.5):
+        if color not in ("white", "green", "red"):
+            raise ValueError(f"Invalid color: {color}")
+
+    # --- Capture ---
+
+    def AcquireTemplate(self):
+        """Template for a due placement on this device, else None."""
+        if self.devHandle is None:
+            self._error("Device not initialized.")
+        bus = _get_bus()
+        with bus.lock:
+            now = bus.now()
+            if not self._device.plugged(now):
+                bus.stats["disconnects"] += 1
+                self.devHandle = None
+                self._error("Invalid Handle")
+            bus.enqueue_due(now)
+            index = self._device.index
+            placed = bus.on_sensor.get(index)
+            if placed is not None:
+                identity, lifts_at = placed
+                if now >= lifts_at:
+                    # Finger lifted: the sensor reads empty at least once between people
+                    del bus.on_sensor[index]
+                    return None
+            else:
+                lane = bus.backlog.get(index)
+                if not lane:
+                    return None
+                identity = lane.pop(0)
+                bus.on_sensor[index] = (identity, now + SIMULATOR_DWELL_SECONDS)
+                bus.stats["placements"] += 1
+            bus.sample += 1
+            return _template(identity, bus.sample)
+
+    def AcquireFingerprint(self, with_image=True):
+        template = self.AcquireTemplate()
+        if template is not None:
+            return template, bytes(self.width * self.height) if with_image else None
+
+    def AcquireFingerprintImage(self):
+        capture = self.AcquireFingerprint()
+        return capture[1] if capture else None
+
+    # --- Matching ---
+
+    def _score(self, temp1, temp2):
+        temp1, temp2 = bytes(temp1), bytes(temp2)
+        if temp1 == temp2:
+            return 100
+        mean, sd = SIMULATOR_GENUINE_SCORE if identity_of(temp1) == identity_of(temp2) else SIMULATOR_IMPOSTOR_SCORE
+        # Seeded by the pair so the same two templates always score the same
+        pair = sorted((temp1[:_HEADER_SIZE], temp2[:_HEADER_SIZE]))
+        rng = random.Random(hashlib.sha256(pair[0] + pair[1]).digest())
+        return int(min(100, max(0, rng.gauss(mean, sd))))
+
+    def DBInit(self):
+        self.dbHandle = 1
+        return self.dbHandle
+
+    def DBFree(self):
+        self._db.clear()
+        self.dbHandle = None
+
+    def DBAdd(self, fid, regTemp):
+        if not self.dbHandle:
+            self._error("Cache not initialized.")
+        self._db[fid] = bytes(regTemp)
+        bus = _get_bus()
+        with bus.lock:
+            bus.population.add(identity_of(regTemp))
+            bus.remaining = []
+
+    def DBDel(self, fid):
+        if self._db.pop(fid, None) is None:
+            self._error("Failed to delete the fingerprint template")
+
+    def DBClear(self):
+        self._db.clear()
+        bus = _get_bus()
+        with bus.lock:
+            bus.population.clear()
+            bus.remaining = []
+
+    def DBMatch(self, temp1, temp2):
+        _spin(SIMULATOR_MATCH_LATENCY_US / 1e6)
+        _get_bus().stats["matches"] += 1
+        return self._score(temp1, temp2)
+
+    def DBIdentify(self, temp):
+        """1:N against the device cache. Returns (fid, score), or (0, 0) below the SDK threshold."""
+        if not self.dbHandle:
+            self._error("Cache not initialized.")
+        _get_bus().stats["identifies"] += 1
+        best_fid, best_score = 0, 0
+        for fid, stored in list(self._db.items()):
+            _spin(SIMULATOR_MATCH_LATENCY_US / 1e6)
+            score = self._score(stored, temp)
+            if score > best_score:
+                best_fid, best_score = fid, score
+        if best_score < IDENTIFY_THRESHOLD:
+            return 0, 0
+        return best_fid, best_score
+
+    def DBMerge(self, temp1, temp2, temp3):
+        identity = identity_of(temp1)
+        if identity_of(temp2) != identity or identity_of(temp3) != identity:
+            self._error("Failed to combine the registered fingerprint templates")
+        return _template(identity, 0), TEMPLATE_SIZE
+
+    def Blob2Base64String(self, blob):
+        return base64.b64encode(bytes(blob)).decode()
+
+    def Base64String2Blob(self, string):
+        return base64.b64decode(string)
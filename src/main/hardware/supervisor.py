@@ -0,0 +1,262 @@
+"""
+Reader lifecycle supervisor. One background thread opens, watches and reopens
+every reader, so capture workers never reconnect inline; they wait on their
+reader's `ready` event instead.
+
+    connected --capture glitch--> degraded --good capture--> connected
+    connected/degraded --lost handle, or DEGRADED_ERROR_LIMIT glitches--> reconnecting
+    reconnecting --open succeeds--> connected
+    reconnecting --BAN_AFTER_FAILURES failed opens--> banned --BAN_SECONDS--> reconnecting
+
+Reopen attempts back off exponentially with jitter. While no reader is
+connected the SDK is periodically terminated and re-initialised, which makes
+it re-enumerate the USB bus.
+"""
+import os
+import time
+import random
+import threading
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Supervisor Constants ---
+RECONNECT_BASE_SECONDS = float(os.getenv("RECONNECT_BASE_SECONDS", "1"))
+RECONNECT_MAX_SECONDS = float(os.getenv("RECONNECT_MAX_SECONDS", "60"))
+BAN_AFTER_FAILURES = int(os.getenv("BAN_AFTER_FAILURES", "6"))
+BAN_SECONDS = float(os.getenv("BAN_SECONDS", "300"))
+DEGRADED_ERROR_LIMIT = int(os.getenv("DEGRADED_ERROR_LIMIT", "5"))
+ENUMERATE_SECONDS = float(os.getenv("ENUMERATE_SECONDS", "10"))
+REINIT_SECONDS = float(os.getenv("REINIT_SECONDS", "30"))
+
+CONNECTED = 'connected'
+DEGRADED = 'degraded'
+RECONNECTING = 'reconnecting'
+BANNED = 'banned'
+
+
+class DeviceState:
+    """Lifecycle state of one reader index, whether or not it is open."""
+
+    def __init__(self, index):
+        self.index = index
+        self.state = RECONNECTING
+        self.ready = threading.Event()
+        self.failures = 0  # consecutive failed opens
+        self.glitches = 0  # consecutive capture errors while open
+        self.next_attempt = 0.0
+        self.disconnected_since = time.monotonic()
+        self.disconnected_seconds = 0.0  # completed outages
+        self.reconnects = 0
+        self.ever_connected = False
+        self.last_error = None
+
+    def downtime(self, now):
+        """Total seconds spent disconnected, including the current outage."""
+        current = now - self.disconnected_since if self.disconnected_since is not None else 0.0
+        return self.disconnected_seconds + current
+
+    def snapshot(self, now):
+        return {
+            "index": self.index,
+            "state": self.state,
+            "reconnects": self.reconnects,
+            "disconnected_seconds": round(self.downtime(now), 1),
+            "last_error": self.last_error,
+        }
+
+
+class DeviceSupervisor(threading.Thread):
+    """Owns the open/lost/reopen cycle of every reader for a FingerprintScanner."""
+
+    def __init__(self, scanner, driver):
+        super().__init__(name="device-supervisor")
+        self.daemon = True
+        self.scanner = scanner
+        self.driver = driver
+        self.states = {}  # {device index: DeviceState}
+        self.any_ready = threading.Event()
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._rng = random.Random()
+        self._last_enumeration = 0.0
+        self._last_reinit = time.monotonic()
+
+    def bootstrap(self):
+        """Opens every reader once, synchronously, then keeps supervising in the background."""
+        self._enumerate()
+        self._attempt_due()
+        self.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def wake(self):
+        self._wake.set()
+
+    def run(self):
+        while not self._stop.is_set():
+            self._wake.wait(timeout=self._sleep_seconds())
+            self._wake.clear()
+            try:
+                now = time.monotonic()
+                if now - self._last_enumeration >= ENUMERATE_SECONDS:
+                    self._enumerate()
+                self._attempt_due()
+            except Exception as e:
+                logger.error(f"Device supervisor error: {e}")
+                time.sleep(1)
+
+    def _sleep_seconds(self):
+        now = time.monotonic()
+        due = [self._last_enumeration + ENUMERATE_SECONDS]
+        with self._lock:
+            due += [s.next_attempt for s in self.states.values() if s.state in (RECONNECTING, BANNED)]
+        return max(0.05, min(due) - now)
+
+    def _backoff(self, failures):
+        delay = min(RECONNECT_MAX_SECONDS, RECONNECT_BASE_SECONDS * 2 ** max(0, failures - 1))
+        return delay * self._rng.uniform(0.5, 1.5)
+
+    # --- Enumeration ---
+
+    def _enumerate(self):
+        self._last_enumeration = time.monotonic()
+        try:
+            count = self.scanner.library_device_count()
+        except Exception as e:
+            logger.error(f"ZKFP Initialization/Connection failed: {e}")
+            return
+        with self._lock:
+            for index in range(count):
+                if index not in self.states:
+                    logger.info(f"Discovered device index {index}.")
+                    self.states[index] = DeviceState(index)
+
+    def _reinitialise_if_stranded(self, now):
+        """With nothing connected, restart the SDK so it rescans the bus for replugged readers."""
+        if self.any_ready.is_set() or now - self._last_reinit < REINIT_SECONDS:
+            return
+        self._last_reinit = now
+        logger.warning("No reader connected; re-initialising the SDK to re-enumerate USB devices.")
+        try:
+            self.scanner.reset_library()
+        except Exception as e:
+            logger.error(f"SDK re-initialisation failed: {e}")
+        self._enumerate()
+
+    # --- Opening ---
+
+    def _attempt_due(self):
+        now = time.monotonic()
+        with self._lock:
+            due = [s for s in self.states.values() if s.state in (RECONNECTING, BANNED) and now >= s.next_attempt]
+        if due:
+            self._reinitialise_if_stranded(now)
+        for state in due:
+            self._try_open(state)
+
+    def _try_open(self, state):
+        try:
+            logger.info(f"Attempting to open device index {state.index}...")
+            zk = self.driver()
+            zk.OpenDevice(state.index)
+        except Exception as e:
+            now = time.monotonic()
+            with self._lock:
+                state.failures += 1
+                state.last_error = str(e)
+                if state.failures >= BAN_AFTER_FAILURES:
+                    logger.warning(f"Banning device index {state.index} for {BAN_SECONDS:g}s after "
+                                   f"{state.failures} failed opens: {e}")
+                    state.state = BANNED
+                    state.failures = 0
+                    state.next_attempt = now + BAN_SECONDS
+                else:
+                    state.state = RECONNECTING
+                    state.next_attempt = now + self._backoff(state.failures)
+                    logger.warning(f"Failed to open device {state.index}: {e} "
+                                   f"(retry in {state.next_attempt - now:.1f}s)")
+            return
+
+        self.scanner.attach_device(state.index, zk)
+        now = time.monotonic()
+        with self._lock:
+            outage = now - state.disconnected_since if state.disconnected_since is not None else 0.0
+            state.disconnected_seconds += outage
+            state.disconnected_since = None
+            if state.ever_connected:
+                state.reconnects += 1
+                logger.info(f"Device {state.index} reconnected after {outage:.1f}s.")
+            state.ever_connected = True
+            state.state = CONNECTED
+            state.failures = 0
+            state.glitches = 0
+            state.ready.set()
+            self.any_ready.set()
+        logger.info(f"Successfully opened ZK9500 (Index {state.index})")
+
+    # --- Reports from capture workers ---
+
+    def lost(self, index, error):
+        """The reader's handle is gone: close it and schedule a reopen."""
+        self.scanner.detach_device(index)
+        now = time.monotonic()
+        with self._lock:
+            state = self.states.setdefault(index, DeviceState(index))
+            if state.state in (CONNECTED, DEGRADED):
+                state.disconnected_since = now
+            state.state = RECONNECTING
+            state.ready.clear()
+            state.glitches = 0
+            state.last_error = str(error)
+            state.next_attempt = now + self._backoff(1)
+            if not any(s.ready.is_set() for s in self.states.values()):
+                self.any_ready.clear()
+        self._wake.set()
+
+    def glitch(self, index, error):
+        """A capture error on an open reader. Returns True when it escalated to a disconnect."""
+        with self._lock:
+            state = self.states.get(index)
+            if state is None:
+                return False
+            state.glitches += 1
+            state.last_error = str(error)
+            state.state = DEGRADED
+            escalate = state.glitches >= DEGRADED_ERROR_LIMIT
+        if escalate:
+            logger.error(f"Device {index} failed {DEGRADED_ERROR_LIMIT} captures in a row; reconnecting.")
+            self.lost(index, error)
+        return escalate
+
+    def healthy(self, index):
+        state = self.states.get(index)
+        if state is not None and state.state == DEGRADED:
+            with self._lock:
+                state.glitches = 0
+                state.state = CONNECTED
+
+    def wait_ready(self, index=None, timeout=None):
+        """Blocks until the reader (or any reader, when index is None) is connected."""
+        if index is None:
+            return self.any_ready.wait(timeout)
+        state = self.states.get(index)
+        if state is None:
+            # Not enumerated (yet): nothing to wait on
+            self._stop.wait(timeout)
+            return False
+        return state.ready.wait(timeout)
+
+    # --- Metrics ---
+
+    def snapshot(self):
+        now = time.monotonic()
+        with self._lock:
+            return [s.snapshot(now) for s in sorted(self.states.values(), key=lambda s: s.index)]
+
+    def banned_indices(self):
+        with self._lock:
+            return {i for i, s in self.states.items() if s.state == BANNED}
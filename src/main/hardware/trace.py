@@ -0,0 +1,158 @@
+"""
+Binary scan trace: what the gate saw, in order, with timings.
+
+Enabled by FINGERPRINT_TRACE_PATH. The listener records every captured
+template, match decision, attendance write, template cache reload and device
+error; scripts/replay_trace.py feeds a trace back through the matcher and
+writer. Traces hold raw biometric templates: keep them off shared drives and
+delete them once the investigation is over.
+
+File layout: 8-byte header (b"FPTR", version, pad) and a float64 start epoch,
+then records of
+
+    kind (u8) | seconds since start (f64) | payload length (u16) | payload
+"""
+import os
+import struct
+import threading
+import time
+import logging
+from collections import namedtuple
+
+logger = logging.getLogger(__name__)
+
+# --- Trace Constants ---
+FINGERPRINT_TRACE_PATH = os.getenv("FINGERPRINT_TRACE_PATH")
+FINGERPRINT_TRACE_MAX_MB = int(os.getenv("FINGERPRINT_TRACE_MAX_MB", "512"))
+
+_MAGIC = b"FPTR"
+_VERSION = 1
+_FILE_HEADER = struct.Struct("<4sB3xd")
+_RECORD = struct.Struct("<BdH")
+
+CAPTURE, MATCH, WRITE, ERROR, CACHE = 1, 2, 3, 4, 5
+KIND_NAMES = {CAPTURE: "capture", MATCH: "match", WRITE: "write", ERROR: "error", CACHE: "cache"}
+
+# Fixed part of each payload; the rest is the template (capture) or utf-8 text
+_CAPTURE = struct.Struct("<bf")   # device index, capture seconds
+_MATCH = struct.Struct("<hf")     # score, match seconds; text = person key ('' = no match)
+_WRITE = struct.Struct("<?f")     # ok, write seconds; text = person key
+_ERROR = struct.Struct("<b")      # device index; text = message
+_CACHE = struct.Struct("<II")     # cache generation, template count
+
+TraceRecord = namedtuple(
+    "TraceRecord", "kind at device seconds template key score ok message generation size",
+    defaults=(None,) * 9,
+)
+
+
+class TraceWriter:
+    """Appends records to a trace file. Thread-safe; stops recording at `max_bytes`."""
+
+    def __init__(self, path, max_bytes=FINGERPRINT_TRACE_MAX_MB * 1024 * 1024):
+        self.path = path
+        self.max_bytes = max_bytes
+        self._lock = threading.Lock()
+        self._file = open(path, "wb")
+        self._started = time.time()
+        self._clock = time.perf_counter()
+        self._file.write(_FILE_HEADER.pack(_MAGIC, _VERSION, self._started))
+        self._size = _FILE_HEADER.size
+        self.full = False
+        logger.info(f"Recording scan trace to {path}")
+
+    def _append(self, kind, payload):
+        at = time.perf_counter() - self._clock
+        with self._lock:
+            if self._file is None or self.full:
+                return
+            if self._size + _RECORD.size + len(payload) > self.max_bytes:
+                self.full = True
+                logger.warning(f"Scan trace {self.path} reached its size limit; recording stopped.")
+                return
+            self._file.write(_RECORD.pack(kind, at, len(payload)))
+            self._file.write(payload)
+            self._size += _RECORD.size + len(payload)
+
+    def capture(self, template, device, seconds):
+        self._append(CAPTURE, _CAPTURE.pack(device, seconds) + bytes(template))
+
+    def match(self, key, score, seconds):
+        self._append(MATCH, _MATCH.pack(score, seconds) + (key or "").encode())
+
+    def write(self, key, ok, seconds):
+        self._append(WRITE, _WRITE.pack(ok, seconds) + key.encode())
+
+    def error(self, device, message):
+        self._append(ERROR, _ERROR.pack(device) + message.encode()[:1024])
+
+    def cache(self, generation, size):
+        self._append(CACHE, _CACHE.pack(generation, size))
+
+    def flush(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
+
+
+def open_trace(path=None):
+    """TraceWriter for `path` (default FINGERPRINT_TRACE_PATH), or None when tracing is off."""
+    path = path or FINGERPRINT_TRACE_PATH
+    if not path:
+        return None
+    try:
+        return TraceWriter(path)
+    except OSError as e:
+        logger.error(f"Could not open scan trace {path}: {e}")
+        return None
+
+
+def read_trace(path):
+    """Returns (start_epoch, iterator of TraceRecord). A truncated final record is dropped."""
+    f = open(path, "rb")
+    magic, version, started = _FILE_HEADER.unpack(f.read(_FILE_HEADER.size))
+    if magic != _MAGIC:
+        f.close()
+        raise ValueError(f"{path} is not a scan trace")
+    if version != _VERSION:
+        f.close()
+        raise ValueError(f"{path} is trace version {version}, expected {_VERSION}")
+
+    def records():
+        with f:
+            while True:
+                head = f.read(_RECORD.size)
+                if len(head) < _RECORD.size:
+                    return
+                kind, at, length = _RECORD.unpack(head)
+                payload = f.read(length)
+                if len(payload) < length:
+                    return
+                yield _decode(kind, at, payload)
+
+    return started, records()
+
+
+def _decode(kind, at, payload):
+    if kind == CAPTURE:
+        device, seconds = _CAPTURE.unpack_from(payload)
+        return TraceRecord(kind, at, device=device, seconds=seconds, template=payload[_CAPTURE.size:])
+    if kind == MATCH:
+        score, seconds = _MATCH.unpack_from(payload)
+        return TraceRecord(kind, at, seconds=seconds, score=score, key=payload[_MATCH.size:].decode() or None)
+    if kind == WRITE:
+        ok, seconds = _WRITE.unpack_from(payload)
+        return TraceRecord(kind, at, seconds=seconds, ok=ok, key=payload[_WRITE.size:].decode())
+    if kind == ERROR:
+        (device,) = _ERROR.unpack_from(payload)
+        return TraceRecord(kind, at, device=device, message=payload[_ERROR.size:].decode(errors="replace"))
+    if kind == CACHE:
+        generation, size = _CACHE.unpack_from(payload)
+        return TraceRecord(kind, at, generation=generation, size=size)
+    return TraceRecord(kind, at)
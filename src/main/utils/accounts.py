@@ -0,0 +1,54 @@
+import logging
+
+logger = logging.getLogger(__name__)
+
+# Login roles, in the order they won a username before Accounts existed
+ACCOUNT_ROLES = ('admin', 'teacher', 'student', 'parent')
+ROLE_TABLES = {'admin': 'Admins', 'teacher': 'Teachers', 'student': 'Users', 'parent': 'Parents'}
+
+
+def username_taken(cursor, username):
+    """True if any role already uses `username`."""
+    cursor.execute("SELECT 1 FROM Accounts WHERE username = %s", (username,))
+    return cursor.fetchone() is not None
+
+
+def register_account(cursor, username, role, person_id):
+    """
+    Adds the login index row for a user just inserted into its role table.
+    Uses the caller's cursor so both rows commit together (caller commits).
+    Raises mysql.connector.IntegrityError if another role owns the username.
+    """
+    cursor.execute(
+        "INSERT INTO Accounts (username, role, person_id) VALUES (%s, %s, %s)",
+        (username, role, person_id)
+    )
+
+
+def remove_account(cursor, role, person_id):
+    """Drops the login index row for a deleted user (caller commits)."""
+    cursor.execute("DELETE FROM Accounts WHERE role = %s AND person_id = %s", (role, person_id))
+
+
+def find_account(cursor, username):
+    """
+    Resolves a username to its role, id, password hash and display name in a
+    single indexed lookup. Takes a dictionary cursor; returns None if unknown.
+    """
+    cursor.execute("""
+        SELECT a.role, a.person_id,
+               COALESCE(ad.password_hash, t.password_hash, u.password_hash, p.password_hash) AS password_hash,
+               COALESCE(t.name, u.name, p.name) AS name
+        FROM Accounts a
+        LEFT JOIN Admins ad ON a.role = 'admin' AND ad.id = a.person_id
+        LEFT JOIN Teachers t ON a.role = 'teacher' AND t.id = a.person_id
+        LEFT JOIN Users u ON a.role = 'student' AND u.id = a.person_id
+        LEFT JOIN Parents p ON a.role = 'parent' AND p.id = a.person_id
+        WHERE a.username = %s
+    """, (username,))
+    return cursor.fetchone()
+
+
+def update_password_hash(cursor, role, person_id, password_hash):
+    """Stores a new password hash on the user's role table (caller commits)."""
+    cursor.execute(f"UPDATE `{ROLE_TABLES[role]}` SET password_hash = %s WHERE id = %s", (password_hash, person_id))
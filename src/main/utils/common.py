@@ -1,4 +1,4 @@
-from datetime import datetime
+from datetime import datetime, time
 from ..database import get_db
 import mysql.connector
 import logging
@@ -7,34 +7,22 @@ logger = logging.getLogger(__name__)
 
 
 def get_setting(key):
-    """Fetches a setting value from the database."""
-    db = None
-    cursor = None
-    try:
-        db = get_db()
-        cursor = db.cursor(dictionary=True)
-        cursor.execute("SELECT value FROM Settings WHERE `key` = %s", (key,))
-        result = cursor.fetchone()
-        return result['value'] if result else None
-    except mysql.connector.Error as e:
-        logger.exception("Database error in get_setting: %s", e)
-        return None
-    finally:
-        if cursor:
-            cursor.close()
-        if db:
-            db.close()
+    """Returns a setting value from the in-process settings cache (see utils/settings.py)."""
+    from .settings import get_settings
+    return get_settings().get(key)
 
 
 def update_setting(key, value):
-    """Updates a setting value in the database."""
+    """Updates a setting value in the database and notifies the settings cache."""
+    from .settings import get_settings, write_setting
     db = None
     cursor = None
     try:
         db = get_db()
         cursor = db.cursor()
-        cursor.execute("INSERT INTO Settings (`key`, value) VALUES (%s, %s) ON DUPLICATE KEY UPDATE value = %s", (key, value, value))
+        write_setting(cursor, key, value)
         db.commit()
+        get_settings().invalidate()
         return True
     except mysql.connector.Error as e:
         logger.exception("Database error in update_setting: %s", e)
@@ -62,3 +50,59 @@ def _get_student_attendance_status(cursor, student_id, today):
     if log:
         return "Checked In" if log['log_type'] == 'IN' else "Checked Out"
     return "Checked Out"
+
+
+def _get_class_rosters(cursor, classes, today):
+    """
+    Returns {class: [student, ...]} for `classes`, each student carrying today's "status".
+    Pulls every roster and each student's latest log in one set-based query.
+    """
+    if not classes:
+        return {}
+
+    placeholders = ','.join(['%s'] * len(classes))
+    cursor.execute(f"""
+        SELECT u.id, u.name, u.username, u.class, fl.log_type
+        FROM Users u
+        LEFT JOIN (
+            SELECT person_id, MAX(id) AS last_id
+            FROM FingerprintLogs
+            WHERE person_type = 'student'
+            AND timestamp BETWEEN %s AND %s
+            GROUP BY person_id
+        ) last_log ON last_log.person_id = u.id
+        LEFT JOIN FingerprintLogs fl ON fl.id = last_log.last_id
+        WHERE u.class IN ({placeholders})
+        ORDER BY u.class, u.name
+    """, (datetime.combine(today, time(5, 0)), datetime.combine(today, time(22, 0)), *classes))
+
+    rosters = {class_name: [] for class_name in classes}
+    for row in cursor.fetchall():
+        row["status"] = "Checked In" if row.pop("log_type") == 'IN' else "Checked Out"
+        rosters.setdefault(row["class"], []).append(row)
+    return rosters
+
+
+def _get_bulk_attendance_status(cursor, student_ids, today):
+    """Set-based _get_student_attendance_status: returns {student_id: status} in one query."""
+    if not student_ids:
+        return {}
+
+    placeholders = ','.join(['%s'] * len(student_ids))
+    cursor.execute(f"""
+        SELECT fl.person_id, fl.log_type
+        FROM FingerprintLogs fl
+        JOIN (
+            SELECT person_id, MAX(id) AS last_id
+            FROM FingerprintLogs
+            WHERE person_type = 'student'
+            AND person_id IN ({placeholders})
+            AND timestamp BETWEEN %s AND %s
+            GROUP BY person_id
+        ) last_log ON fl.id = last_log.last_id
+    """, (*student_ids, datetime.combine(today, time(5, 0)), datetime.combine(today, time(22, 0))))
+
+    statuses = {student_id: "Checked Out" for student_id in student_ids}
+    for row in cursor.fetchall():
+        statuses[row['person_id']] = "Checked In" if row['log_type'] == 'IN' else "Checked Out"
+    return statuses
@@ -0,0 +1,177 @@
+import os
+from collections import defaultdict
+from datetime import datetime, timedelta
+import logging
+import mysql.connector
+
+from ..database import get_db
+from ..utils.common import get_setting
+
+logger = logging.getLogger(__name__)
+
+DIGEST_DAILY = 'daily'
+DIGEST_WEEKLY = 'weekly'
+# Weekly digests go out on this weekday (Monday=0)
+PARENT_DIGEST_WEEKLY_DAY = int(os.getenv("PARENT_DIGEST_WEEKLY_DAY", "4"))
+
+
+def digest_period(frequency, today):
+    """Returns (start_date, end_date) inclusive for a digest sent on `today`."""
+    if frequency == DIGEST_WEEKLY:
+        return today - timedelta(days=today.weekday()), today
+    return today, today
+
+
+def build_parent_digests(cursor, start_date, end_date):
+    """
+    Collects every parent's children and their attendance for the period
+    using two school-wide queries instead of per-parent, per-child lookups.
+    Returns a list of {parent fields..., "children": [{student fields..., "days": {date: row}}]}.
+    """
+    cursor.execute("""
+        SELECT p.id AS parent_id, p.name AS parent_name, p.email,
+               u.id AS student_id, u.name AS student_name, u.class, sp.relationship
+        FROM StudentParents sp
+        JOIN Parents p ON p.id = sp.parent_id
+        JOIN Users u ON u.id = sp.student_id
+        ORDER BY p.id, u.name
+    """)
+    links = cursor.fetchall()
+    if not links:
+        return []
+
+    # One row per student per day: first/last scan and the final IN/OUT state
+    cursor.execute("""
+        SELECT person_id, DATE(timestamp) AS day,
+               MIN(timestamp) AS first_scan, MAX(timestamp) AS last_scan, COUNT(*) AS scans,
+               SUBSTRING_INDEX(GROUP_CONCAT(log_type ORDER BY id DESC), ',', 1) AS last_type
+        FROM FingerprintLogs
+        WHERE person_type = 'student'
+        AND timestamp >= %s AND timestamp < %s
+        AND person_id IN (SELECT student_id FROM StudentParents)
+        GROUP BY person_id, DATE(timestamp)
+    """, (datetime.combine(start_date, datetime.min.time()),
+          datetime.combine(end_date + timedelta(days=1), datetime.min.time())))
+
+    attendance = defaultdict(dict)
+    for row in cursor.fetchall():
+        attendance[row['person_id']][row['day']] = row
+
+    digests = []
+    by_parent = {}
+    for link in links:
+        digest = by_parent.get(link['parent_id'])
+        if digest is None:
+            digest = {
+                "parent_id": link['parent_id'],
+                "parent_name": link['parent_name'],
+                "email": link['email'],
+                "children": [],
+            }
+            by_parent[link['parent_id']] = digest
+            digests.append(digest)
+        digest["children"].append({
+            "id": link['student_id'],
+            "name": link['student_name'],
+            "class": link['class'],
+            "relationship": link['relationship'],
+            "days": attendance.get(link['student_id'], {}),
+        })
+    return digests
+
+
+def render_parent_digest(digest, start_date, end_date):
+    """Renders one parent's digest as (subject, plain-text body)."""
+    school_days = [start_date + timedelta(days=i) for i in range((end_date - start_date).days + 1)]
+    school_days = [d for d in school_days if d.weekday() < 5] or [end_date]
+
+    if start_date == end_date:
+        period = end_date.strftime('%A %d %B %Y')
+        subject = f"Daily Attendance Summary - {end_date.strftime('%Y-%m-%d')}"
+    else:
+        period = f"{start_date.strftime('%d %B')} - {end_date.strftime('%d %B %Y')}"
+        subject = f"Weekly Attendance Summary - week of {start_date.strftime('%Y-%m-%d')}"
+
+    lines = [f"Dear {digest['parent_name']},", "", f"Here is the attendance summary for {period}.", ""]
+    for child in digest["children"]:
+        present = [d for d in school_days if d in child["days"]]
+        lines.append(f"{child['name']} ({child['class']}) - present {len(present)} of {len(school_days)} school day(s)")
+        for day in school_days:
+            row = child["days"].get(day)
+            if row is None:
+                lines.append(f"  {day.strftime('%a %d %b')}: no scans recorded")
+                continue
+            arrived = row['first_scan'].strftime('%H:%M')
+            if row['scans'] > 1 and row['last_type'] == 'OUT':
+                lines.append(f"  {day.strftime('%a %d %b')}: arrived {arrived}, left {row['last_scan'].strftime('%H:%M')}")
+            else:
+                lines.append(f"  {day.strftime('%a %d %b')}: arrived {arrived}")
+        lines.append("")
+
+    lines.append("This is an automated message from St Nicholas Senior School.")
+    return subject, "\n".join(lines)
+
+
+def queue_parent_digests(frequency=DIGEST_DAILY, today=None):
+    """
+    Builds, renders and queues digests for every parent into the EmailOutbox.
+    Re-running for the same day is a no-op thanks to the outbox's unique key.
+    Returns the number of newly queued messages.
+    """
+    from ..utils.outbox import enqueue_emails
+
+    today = today or datetime.today().date()
+    start_date, end_date = digest_period(frequency, today)
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        digests = build_parent_digests(cursor, start_date, end_date)
+
+        messages = []
+        for digest in digests:
+            if not digest["email"]:
+                continue
+            subject, body = render_parent_digest(digest, start_date, end_date)
+            messages.append((digest["email"], f"parent_digest:{frequency}", today, subject, body, None, None))
+
+        queued = enqueue_emails(cursor, messages)
+        conn.commit()
+        logger.info("Queued %d %s parent digest(s) for %d parent(s).", queued, frequency, len(digests))
+        return queued
+    except mysql.connector.Error as e:
+        logger.exception("Database error while queueing parent digests: %s", e)
+        return 0
+    finally:
+        if conn:
+            conn.close()
+
+
+def digest_due(frequency, today):
+    """True if a digest of `frequency` should go out on `today`."""
+    if frequency == DIGEST_DAILY:
+        return today.weekday() < 5
+    if frequency == DIGEST_WEEKLY:
+        return today.weekday() == PARENT_DIGEST_WEEKLY_DAY
+    return False
+
+
+def send_parent_digests(frequency=None, force=False):
+    """
+    Queues today's parent digests if one is due and drains the outbox.
+    `frequency` defaults to the 'parent_digest_frequency' setting (off/daily/weekly).
+    """
+    from ..utils.outbox import dispatch_outbox
+
+    frequency = frequency or get_setting('parent_digest_frequency') or 'off'
+    today = datetime.today().date()
+    if frequency not in (DIGEST_DAILY, DIGEST_WEEKLY):
+        logger.info("Parent digests are disabled (%s). Skipping.", frequency)
+        return 0
+    if not force and not digest_due(frequency, today):
+        logger.info("No %s parent digest due today (%s). Skipping.", frequency, today)
+        return 0
+
+    queue_parent_digests(frequency, today)
+    return dispatch_outbox()
@@ -1,62 +1,169 @@
 import os
 import smtplib
 import ssl
+import time
+from concurrent.futures import ThreadPoolExecutor
 from email.mime.application import MIMEApplication
 from email.mime.multipart import MIMEMultipart
 from email.mime.text import MIMEText
 from datetime import datetime
 import logging
-from dotenv import load_dotenv
 import mysql.connector
 
 from ..database import get_db
-from ..utils.common import _get_student_attendance_status
-from ..utils.pdf import generate_class_attendance_pdf
+from ..utils.common import _get_class_rosters
 
-# Load environment variables from .env file
-load_dotenv()
-
-# --- Logging ---
-LOG_LEVEL = os.getenv("LOG_LEVEL", "INFO").upper()
-logging.basicConfig(level=getattr(logging, LOG_LEVEL, logging.INFO),
-                    format="%(asctime)s %(levelname)s %(name)s - %(message)s")
 logger = logging.getLogger(__name__)
 
 # --- Email Constants ---
+# For local testing point these at a sink, e.g. `python -m aiosmtpd -n -l localhost:1025`
+# with SMTP_HOST=localhost, SMTP_PORT=1025, SMTP_STARTTLS=false and no credentials.
 SMTP_HOST = os.getenv("SMTP_HOST", "smtp.office365.com")
 SMTP_PORT = int(os.getenv("SMTP_PORT", 587))
 SMTP_USERNAME = os.getenv("SMTP_USERNAME")
 SMTP_PASSWORD = os.getenv("SMTP_PASSWORD")
-
-def send_email(recipient_email, subject, body, attachment_data, attachment_filename):
-    if not all([SMTP_HOST, SMTP_PORT, SMTP_USERNAME, SMTP_PASSWORD]):
-        logger.error("SMTP settings are not configured. Cannot send email.")
-        return
-
+SMTP_FROM = os.getenv("SMTP_FROM") or SMTP_USERNAME
+SMTP_STARTTLS = os.getenv("SMTP_STARTTLS", "true").lower() == "true"
+SMTP_TIMEOUT = float(os.getenv("SMTP_TIMEOUT", "30"))
+# Office 365 throttles at 30 messages per minute per mailbox
+SMTP_MAX_PER_MINUTE = int(os.getenv("SMTP_MAX_PER_MINUTE", "30"))
+REPORT_RENDER_WORKERS = int(os.getenv("REPORT_RENDER_WORKERS", "4"))
+
+
+class SmtpSession:
+    """
+    One authenticated SMTP connection reused across many messages.
+    Connects lazily, reconnects once if the server drops the session, and spaces
+    sends so no more than `max_per_minute` messages go out.
+    """
+
+    def __init__(self, host=None, port=None, username=None, password=None,
+                 starttls=None, max_per_minute=None, timeout=None):
+        self.host = host or SMTP_HOST
+        self.port = port or SMTP_PORT
+        self.username = username if username is not None else SMTP_USERNAME
+        self.password = password if password is not None else SMTP_PASSWORD
+        self.starttls = SMTP_STARTTLS if starttls is None else starttls
+        self.timeout = timeout or SMTP_TIMEOUT
+        max_per_minute = SMTP_MAX_PER_MINUTE if max_per_minute is None else max_per_minute
+        self._min_interval = 60.0 / max_per_minute if max_per_minute > 0 else 0
+        self._last_send = 0.0
+        self._server = None
+
+    def _connect(self):
+        server = smtplib.SMTP(self.host, self.port, timeout=self.timeout)
+        try:
+            if self.starttls:
+                server.starttls(context=ssl.create_default_context())
+            if self.username and self.password:
+                server.login(self.username, self.password)
+        except Exception:
+            server.close()
+            raise
+        self._server = server
+        logger.info("Opened SMTP session to %s:%s", self.host, self.port)
+
+    def close(self):
+        if self._server:
+            try:
+                self._server.quit()
+            except smtplib.SMTPException:
+                self._server.close()
+            except OSError:
+                pass
+            self._server = None
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        self.close()
+
+    def _throttle(self):
+        wait = self._min_interval - (time.monotonic() - self._last_send)
+        if wait > 0:
+            time.sleep(wait)
+
+    def send(self, message):
+        """Sends a prepared message, reconnecting once on a connection-level failure."""
+        self._throttle()
+        for attempt in (1, 2):
+            try:
+                if self._server is None:
+                    self._connect()
+                self._server.send_message(message)
+                self._last_send = time.monotonic()
+                return
+            except (smtplib.SMTPServerDisconnected, smtplib.SMTPConnectError, OSError) as e:
+                self.close()
+                if attempt == 2:
+                    raise
+                logger.warning("SMTP session lost (%s), reconnecting.", e)
+
+
+def build_message(recipient_email, subject, body, attachment_data=None, attachment_filename=None):
     message = MIMEMultipart()
-    message["From"] = SMTP_USERNAME
+    message["From"] = SMTP_FROM
     message["To"] = recipient_email
     message["Subject"] = subject
 
     message.attach(MIMEText(body, "plain"))
 
-    part = MIMEApplication(attachment_data, Name=attachment_filename)
-    part['Content-Disposition'] = f'attachment; filename="{attachment_filename}"'
-    message.attach(part)
+    if attachment_data is not None:
+        part = MIMEApplication(attachment_data, Name=attachment_filename)
+        part['Content-Disposition'] = f'attachment; filename="{attachment_filename}"'
+        message.attach(part)
+    return message
+
+
+def smtp_configured():
+    return bool(SMTP_HOST and SMTP_PORT and SMTP_FROM)
+
 
+def send_email(recipient_email, subject, body, attachment_data, attachment_filename):
+    """Sends a single message over its own session. Batch senders should share an SmtpSession."""
+    if not smtp_configured():
+        logger.error("SMTP settings are not configured. Cannot send email.")
+        return
+
+    message = build_message(recipient_email, subject, body, attachment_data, attachment_filename)
     try:
-        context = ssl.create_default_context()
-        with smtplib.SMTP(SMTP_HOST, SMTP_PORT) as server:
-            server.starttls(context=context)
-            server.login(SMTP_USERNAME, SMTP_PASSWORD)
-            server.sendmail(SMTP_USERNAME, recipient_email, message.as_string())
-            logger.info(f"Successfully sent email to {recipient_email}")
+        with SmtpSession() as session:
+            session.send(message)
+        logger.info(f"Successfully sent email to {recipient_email}")
     except Exception as e:
         logger.exception(f"Failed to send email to {recipient_email}: {e}")
 
+
+def parse_send_days(raw):
+    """Normalize send_days to 0-6 (Monday=0) regardless of input (0-6 or 1-7)."""
+    send_days = []
+    for part in str(raw or '').split(','):
+        part = part.strip()
+        if not part:
+            continue
+        try:
+            d = int(part)
+        except ValueError:
+            continue
+        if 0 <= d <= 6:
+            send_days.append(str(d))
+        elif 1 <= d <= 7:
+            send_days.append(str(d - 1))
+    return send_days
+
+
 def generate_and_send_reports():
+    """
+    Renders each teacher's class report into the EmailOutbox, then drains it.
+    Delivery, retries and rate limiting are handled by the outbox dispatcher.
+    """
+    from ..utils.outbox import enqueue_email, dispatch_outbox
+    from ..utils.pdf import generate_class_attendance_pdf
+
     logger.info("Starting daily report generation...")
     today = datetime.today()
+    report_date = today.date()
     conn = None
     try:
         conn = get_db()
@@ -64,57 +171,78 @@ def generate_and_send_reports():
 
         cursor.execute("SELECT `value` FROM Settings WHERE `key` = 'send_days'")
         send_days_setting = cursor.fetchone()
-        # Normalize send_days to 0-6 (Monday=0) regardless of input (0-6 or 1-7)
-        send_days = []
-        if send_days_setting and isinstance(send_days_setting, dict) and 'value' in send_days_setting:
-            raw = str(send_days_setting['value'])
-            for part in raw.split(','):
-                part = part.strip()
-                if not part:
-                    continue
-                try:
-                    d = int(part)
-                except ValueError:
-                    continue
-                if 0 <= d <= 6:
-                    send_days.append(str(d))
-                elif 1 <= d <= 7:
-                    send_days.append(str(d - 1))
+        send_days = parse_send_days(send_days_setting['value'] if send_days_setting else None)
 
         today_num = today.weekday()
         if str(today_num) not in send_days:
-            logger.info("Today (%s) is not within the scheduled reporting days (%s). Skipping.", today.date(), send_days)
+            logger.info("Today (%s) is not within the scheduled reporting days (%s). Skipping.", report_date, send_days)
             return
 
-        cursor.execute("SELECT * FROM Teachers")
-        teachers = cursor.fetchall()
-
-        for teacher in teachers:
-            teacher_email = teacher.get("email")
-            teacher_class = teacher.get("class")
-
-            if not teacher_email or not teacher_class:
+        # Reports already in the outbox for today are skipped, so re-running the
+        # sender never renders or sends a duplicate.
+        cursor.execute(
+            "SELECT recipient, report_key FROM EmailOutbox WHERE report_date = %s AND report_key LIKE 'class_attendance:%%'",
+            (report_date,)
+        )
+        already_queued = {(row['recipient'], row['report_key']) for row in cursor.fetchall()}
+
+        cursor.execute("SELECT id, email, class FROM Teachers")
+        teachers = []
+        for teacher in cursor.fetchall():
+            if not teacher.get("email") or not teacher.get("class"):
                 logger.warning("Teacher with ID %s is missing email or class. Skipping.", teacher.get('id'))
                 continue
+            if (teacher["email"], f"class_attendance:{teacher['class']}") in already_queued:
+                continue
+            teachers.append(teacher)
 
-            cursor.execute("SELECT * FROM Users WHERE class = %s ORDER BY name", (teacher_class,))
-            students = cursor.fetchall()
-
-            for student in students:
-                student["status"] = _get_student_attendance_status(cursor, student["id"], today.date())
+        # One query for every roster and its attendance status
+        classes = sorted({t["class"] for t in teachers})
+        rosters = _get_class_rosters(cursor, classes, report_date)
+    except mysql.connector.Error as e:
+        logger.exception(f"Database error during report generation: {e}")
+        return
+    finally:
+        if conn:
+            conn.close()
 
-            pdf_data = generate_class_attendance_pdf(teacher_class, students, today.date())
+    # Render each class once, concurrently; teachers sharing a class share the PDF
+    with ThreadPoolExecutor(max_workers=max(1, REPORT_RENDER_WORKERS)) as pool:
+        futures = {
+            class_name: pool.submit(generate_class_attendance_pdf, class_name, rosters.get(class_name, []), report_date)
+            for class_name in classes
+        }
+    pdfs = {}
+    for class_name, future in futures.items():
+        try:
+            pdfs[class_name] = future.result()
+        except Exception as e:
+            logger.exception("Failed to render report for class %s: %s", class_name, e)
+
+    queued = 0
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        for teacher in teachers:
+            teacher_class = teacher["class"]
+            if teacher_class not in pdfs:
+                continue
 
-            subject = f"Daily Attendance Report for Class {teacher_class} - {today.date().strftime('%Y-%m-%d')}"
+            subject = f"Daily Attendance Report for Class {teacher_class} - {report_date.strftime('%Y-%m-%d')}"
             body = f"Please find attached the daily attendance report for your class, {teacher_class}."
-            attachment_filename = f"{teacher_class}_attendance_{today.date()}.pdf"
-
-            send_email(teacher_email, subject, body, pdf_data, attachment_filename)
-
+            attachment_filename = f"{teacher_class}_attendance_{report_date}.pdf"
+            if enqueue_email(cursor, teacher["email"], f"class_attendance:{teacher_class}", report_date,
+                             subject, body, pdfs[teacher_class], attachment_filename):
+                queued += 1
+        conn.commit()
     except mysql.connector.Error as e:
-        logger.exception(f"Database error during report generation: {e}")
+        logger.exception(f"Database error while queueing reports: {e}")
     finally:
         if conn:
             conn.close()
 
+    logger.info("Queued %d daily report(s).", queued)
+    sent = dispatch_outbox()
     logger.info("Daily report generation finished.")
+    return sent
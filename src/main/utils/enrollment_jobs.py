@@ -0,0 +1,70 @@
+import logging
+
+from ..database import get_db
+from ..utils.jobs import job_handler
+
+logger = logging.getLogger(__name__)
+
+
+def parse_fingers(fingers):
+    """'1,6' or [1, 6] -> [1, 6]; finger numbers index FINGER_NAMES."""
+    from ..hardware.fingerprint import FINGER_NAMES
+
+    if isinstance(fingers, str):
+        fingers = [f for f in fingers.split(",") if f.strip()]
+    parsed = sorted({int(f) for f in fingers})
+    if not parsed or any(f < 0 or f >= len(FINGER_NAMES) for f in parsed):
+        raise ValueError(f"Invalid fingers: {fingers}")
+    return parsed
+
+
+# Runs only in the process elected to own the scanner (see create_app)
+@job_handler('enroll_fingerprint', roles=('admin', 'teacher'), duty='scanner')
+def enroll_fingerprint_job(ctx, person_type, person_id, fingers="1"):
+    """Enrols each finger in `fingers` (three placements each) and stores one template per finger."""
+    from ..hardware.fingerprint import (enroll_fingerprint, templates_changed, person_label, FINGER_NAMES,
+                                        SCANNER_MODE, owns_scanner, ScannerNotOwned)
+    from ..hardware.fingerprint_listener import store_template
+
+    if SCANNER_MODE != 'remote' and not owns_scanner():
+        raise ScannerNotOwned("Enrolment must run in the process that owns the scanner; this one does not.")
+
+    if person_type not in ('student', 'teacher'):
+        raise ValueError(f"Invalid person type: {person_type}")
+    person_id = int(person_id)
+    fingers = parse_fingers(fingers)
+
+    person = f"{person_type}_{person_id}"
+    enrolled = []
+    for n, finger in enumerate(fingers):
+        name = FINGER_NAMES[finger]
+
+        def on_sample(sample, total):
+            done = n * total + sample - 1
+            ctx.set_progress(100 * done // (len(fingers) * total),
+                             f"{name}: place the finger on the scanner ({sample}/{total})")
+
+        ctx.set_progress(100 * n // len(fingers), f"{name}: place the finger on the scanner")
+        # Refused duplicates (DUPLICATE_POLICY=refuse) raise and fail the job with the other person's name
+        result = enroll_fingerprint(on_sample=on_sample, person=person)
+        if not result:
+            raise RuntimeError(f"{name}: no finger placed before the timeout")
+        duplicate = result.duplicates[0] if result.duplicates else None
+
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            store_template(cursor, person_type, person_id, finger, result.template, result.quality, duplicate)
+            conn.commit()
+        finally:
+            if conn:
+                conn.close()
+        if duplicate:
+            enrolled.append(f"{name} (flagged: matches {person_label(duplicate[0])})")
+        else:
+            enrolled.append(name)
+        logger.info("Enrolled %s for %s (quality %s)", name, person, result.quality)
+
+    templates_changed()
+    ctx.set_progress(100, "Enrolled: " + ", ".join(enrolled))
@@ -0,0 +1,323 @@
+import inspect
+import json
+import logging
+import threading
+import time
+from collections import namedtuple
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta
+
+import mysql.connector
+
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+# --- Job States ---
+JOB_QUEUED = 'queued'
+JOB_RUNNING = 'running'
+JOB_SUCCEEDED = 'succeeded'
+JOB_FAILED = 'failed'
+
+# Result artifact returned by a handler; stored on the Jobs row for download.
+JobResult = namedtuple('JobResult', ['data', 'mimetype', 'filename'])
+
+# { job_type: (handler, allowed_roles) }
+_handlers = {}
+# { job_type: leader duty } for jobs that only the process elected for that duty may run
+_duties = {}
+
+# How often each dispatcher looks for jobs abandoned by a crashed process
+STALE_CHECK_SECONDS = 60
+
+# Handler errors that a retry cannot fix (bad parameters, missing records): fail at once
+PERMANENT_ERRORS = (TypeError, ValueError, LookupError)
+
+# Set whenever a job is enqueued in this process so the dispatcher wakes early.
+_wake_event = threading.Event()
+
+
+def job_handler(job_type, roles=('admin',), duty=None):
+    """
+    Registers a function as the handler for `job_type`.
+    The handler is called as handler(ctx, **params) and may return a JobResult.
+    `roles` lists the session roles allowed to enqueue it over HTTP.
+    `duty` names the leader duty (e.g. 'scanner') whose process must run it.
+    """
+    def decorator(func):
+        _handlers[job_type] = (func, tuple(roles))
+        if duty:
+            _duties[job_type] = duty
+        return func
+    return decorator
+
+
+def get_duty_job_types(duty):
+    """Job types that must run in the process elected for `duty`."""
+    return tuple(job_type for job_type, d in _duties.items() if d == duty)
+
+
+def job_params(job_type, params):
+    """Drops keys the handler for `job_type` does not accept, so they can't fail the job later."""
+    handler, _ = _handlers[job_type]
+    accepted = list(inspect.signature(handler).parameters)[1:]  # after ctx
+    dropped = sorted(set(params) - set(accepted))
+    if dropped:
+        logger.warning("Ignoring unknown %s job parameter(s): %s", job_type, ", ".join(dropped))
+    return {k: v for k, v in params.items() if k in accepted}
+
+
+def get_job_roles(job_type):
+    """Returns the roles allowed to enqueue `job_type`, or None if it is unknown."""
+    entry = _handlers.get(job_type)
+    return entry[1] if entry else None
+
+
+class JobContext:
+    """Handed to a running handler so it can report progress."""
+
+    def __init__(self, job_id, attempt):
+        self.job_id = job_id
+        self.attempt = attempt
+
+    def set_progress(self, progress, message=None):
+        progress = max(0, min(100, int(progress)))
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.execute(
+                "UPDATE Jobs SET progress = %s, message = %s WHERE id = %s",
+                (progress, message, self.job_id)
+            )
+            conn.commit()
+        except mysql.connector.Error as e:
+            logger.warning("Could not update progress for job %s: %s", self.job_id, e)
+        finally:
+            if conn:
+                conn.close()
+
+
+def enqueue_job(job_type, params=None, owner=None, max_attempts=3):
+    """Persists a new job and returns its id."""
+    if job_type not in _handlers:
+        raise ValueError(f"Unknown job type: {job_type}")
+    params = job_params(job_type, params or {})
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor()
+        cursor.execute(
+            "INSERT INTO Jobs (job_type, params, owner, max_attempts) VALUES (%s, %s, %s, %s)",
+            (job_type, json.dumps(params), owner, max_attempts)
+        )
+        conn.commit()
+        job_id = cursor.lastrowid
+        logger.info("Queued job %s (%s) for %s", job_id, job_type, owner)
+    finally:
+        if conn:
+            conn.close()
+
+    _wake_event.set()
+    return job_id
+
+
+def get_job(job_id, include_result=False):
+    """Returns the Jobs row as a dict (without the artifact unless asked), or None."""
+    columns = ("id, job_type, status, progress, message, attempts, max_attempts, owner, "
+               "result_mimetype, result_filename, error, created_at, started_at, finished_at")
+    if include_result:
+        columns += ", result"
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        cursor.execute(f"SELECT {columns} FROM Jobs WHERE id = %s", (job_id,))
+        return cursor.fetchone()
+    finally:
+        if conn:
+            conn.close()
+
+
+def get_recent_jobs(cursor, limit=10):
+    """Latest jobs for dashboard listings, using the caller's cursor."""
+    cursor.execute("""
+        SELECT id, job_type, status, progress, message, result_filename, created_at, finished_at
+        FROM Jobs
+        ORDER BY id DESC
+        LIMIT %s
+    """, (limit,))
+    return cursor.fetchall()
+
+
+class JobWorker(threading.Thread):
+    """
+    Dispatcher thread feeding a bounded worker pool from the Jobs table.
+    Jobs are claimed with a conditional UPDATE so several processes can share the table.
+    `job_types` restricts the worker to those types; `exclude_types` leaves those to another worker.
+    """
+
+    def __init__(self, workers=2, poll_interval=2.0, retry_base=30, stale_after=3600,
+                 job_types=None, exclude_types=(), name="job-dispatcher"):
+        super().__init__(name=name)
+        self.daemon = True
+        self.workers = max(1, int(workers))
+        self.poll_interval = poll_interval
+        self.retry_base = retry_base
+        self.stale_after = stale_after
+        self.job_types = tuple(job_types) if job_types is not None else None
+        self.exclude_types = tuple(exclude_types)
+        self._slots = threading.BoundedSemaphore(self.workers)
+        self._pool = ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="job-worker")
+
+    def _type_filter(self):
+        """SQL condition and params limiting the job types this worker claims."""
+        if self.job_types is not None:
+            if not self.job_types:
+                return "1 = 0", ()
+            return f"job_type IN ({', '.join(['%s'] * len(self.job_types))})", self.job_types
+        if self.exclude_types:
+            return f"job_type NOT IN ({', '.join(['%s'] * len(self.exclude_types))})", self.exclude_types
+        return "1 = 1", ()
+
+    def _requeue_stale(self):
+        """
+        Returns jobs left 'running' by a crashed process to the queue, or fails them
+        when they have used every attempt (a job that kills its process can't loop forever).
+        """
+        cutoff = datetime.now() - timedelta(seconds=self.stale_after)
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            cursor.execute("""
+                UPDATE Jobs SET status = %s, error = 'Abandoned by a crashed worker', finished_at = NOW()
+                WHERE status = %s AND started_at < %s AND attempts >= max_attempts
+            """, (JOB_FAILED, JOB_RUNNING, cutoff))
+            failed = cursor.rowcount
+            cursor.execute(
+                "UPDATE Jobs SET status = %s WHERE status = %s AND started_at < %s",
+                (JOB_QUEUED, JOB_RUNNING, cutoff)
+            )
+            conn.commit()
+            if failed:
+                logger.warning("Failed %d stale job(s) with no attempts left.", failed)
+            if cursor.rowcount:
+                logger.warning("Requeued %d stale job(s).", cursor.rowcount)
+        except mysql.connector.Error as e:
+            logger.error("Failed to requeue stale jobs: %s", e)
+        finally:
+            if conn:
+                conn.close()
+
+    def _claim_next(self):
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor(dictionary=True)
+            type_filter, type_params = self._type_filter()
+            cursor.execute(f"""
+                SELECT id FROM Jobs
+                WHERE status = %s AND run_after <= NOW() AND {type_filter}
+                ORDER BY id
+                LIMIT 5
+            """, (JOB_QUEUED,) + type_params)
+            for row in cursor.fetchall():
+                cursor.execute(
+                    "UPDATE Jobs SET status = %s, attempts = attempts + 1, started_at = NOW() WHERE id = %s AND status = %s",
+                    (JOB_RUNNING, row['id'], JOB_QUEUED)
+                )
+                conn.commit()
+                if cursor.rowcount == 1:
+                    cursor.execute("SELECT id, job_type, params, attempts, max_attempts FROM Jobs WHERE id = %s", (row['id'],))
+                    return cursor.fetchone()
+            return None
+        except mysql.connector.Error as e:
+            logger.error("Failed to claim job: %s", e)
+            return None
+        finally:
+            if conn:
+                conn.close()
+
+    def _finish(self, job_id, status, result=None, error=None, retry_at=None):
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            if retry_at:
+                cursor.execute(
+                    "UPDATE Jobs SET status = %s, error = %s, run_after = %s WHERE id = %s",
+                    (JOB_QUEUED, error, retry_at, job_id)
+                )
+            elif result:
+                cursor.execute("""
+                    UPDATE Jobs SET status = %s, progress = 100, result = %s, result_mimetype = %s,
+                        result_filename = %s, error = NULL, finished_at = NOW()
+                    WHERE id = %s
+                """, (status, result.data, result.mimetype, result.filename, job_id))
+            elif status == JOB_SUCCEEDED:
+                cursor.execute(
+                    "UPDATE Jobs SET status = %s, progress = 100, error = NULL, finished_at = NOW() WHERE id = %s",
+                    (status, job_id)
+                )
+            else:
+                cursor.execute(
+                    "UPDATE Jobs SET status = %s, error = %s, finished_at = NOW() WHERE id = %s",
+                    (status, error, job_id)
+                )
+            conn.commit()
+        except mysql.connector.Error as e:
+            logger.error("Failed to record outcome of job %s: %s", job_id, e)
+        finally:
+            if conn:
+                conn.close()
+
+    def _run(self, job):
+        try:
+            handler, _ = _handlers.get(job['job_type'], (None, None))
+            if handler is None:
+                self._finish(job['id'], JOB_FAILED, error=f"No handler for job type {job['job_type']}")
+                return
+
+            params = json.loads(job['params'] or '{}')
+            ctx = JobContext(job['id'], job['attempts'])
+            start = time.time()
+            try:
+                result = handler(ctx, **params)
+            except Exception as e:
+                logger.exception("Job %s (%s) failed on attempt %s: %s", job['id'], job['job_type'], job['attempts'], e)
+                if job['attempts'] < job['max_attempts'] and not isinstance(e, PERMANENT_ERRORS):
+                    delay = self.retry_base * (2 ** (job['attempts'] - 1))
+                    self._finish(job['id'], JOB_QUEUED, error=str(e), retry_at=datetime.now() + timedelta(seconds=delay))
+                else:
+                    self._finish(job['id'], JOB_FAILED, error=str(e))
+                return
+
+            self._finish(job['id'], JOB_SUCCEEDED, result=result)
+            logger.info("Job %s (%s) finished in %.1fs", job['id'], job['job_type'], time.time() - start)
+        finally:
+            self._slots.release()
+            _wake_event.set()
+
+    def run(self):
+        logger.info("Job dispatcher started with %d worker(s).", self.workers)
+        self._requeue_stale()
+        last_stale_check = time.monotonic()
+
+        while True:
+            _wake_event.wait(self.poll_interval)
+            _wake_event.clear()
+
+            if time.monotonic() - last_stale_check >= STALE_CHECK_SECONDS:
+                self._requeue_stale()
+                last_stale_check = time.monotonic()
+
+            # Only claim as many jobs as there are free workers
+            while self._slots.acquire(blocking=False):
+                job = self._claim_next()
+                if job is None:
+                    self._slots.release()
+                    break
+                self._pool.submit(self._run, job)
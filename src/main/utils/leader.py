@@ -0,0 +1,79 @@
+import os
+import sys
+import tempfile
+import threading
+import time
+import logging
+
+logger = logging.getLogger(__name__)
+
+# --- Leader Election Constants ---
+# Directory holding the lock files; every web process of one deployment must share it
+LEADER_LOCK_DIR = os.getenv("LEADER_LOCK_DIR") or tempfile.gettempdir()
+LEADER_RETRY_SECONDS = float(os.getenv("LEADER_RETRY_SECONDS", "10"))
+
+
+class LeaderLock:
+    """
+    Non-blocking, process-wide exclusive lock on a file. The OS releases it
+    when the holding process exits, so a crashed leader is replaced by
+    whichever process tries next.
+    """
+
+    def __init__(self, name, lock_dir=None):
+        db_name = os.getenv("DB_NAME", "fpsnsdb")
+        self.path = os.path.join(lock_dir or LEADER_LOCK_DIR, f"{db_name}-{name}.lock")
+        self._file = None
+
+    def acquire(self):
+        if self._file is not None:
+            return True
+        f = open(self.path, "a+b")
+        try:
+            if sys.platform == "win32":
+                import msvcrt
+                f.seek(0)
+                msvcrt.locking(f.fileno(), msvcrt.LK_NBLCK, 1)
+            else:
+                import fcntl
+                fcntl.flock(f.fileno(), fcntl.LOCK_EX | fcntl.LOCK_NB)
+        except OSError:
+            f.close()
+            return False
+        self._file = f
+        return True
+
+    @property
+    def held(self):
+        return self._file is not None
+
+
+class LeaderElector(threading.Thread):
+    """
+    Keeps trying to take the `name` lock and, once it has it, runs `on_elected`
+    exactly once in this process. Used for singleton duties (fingerprint listener,
+    outbox dispatcher) when several web processes share the same socket.
+    """
+
+    def __init__(self, name, on_elected, retry_interval=None):
+        super().__init__(name=f"leader-{name}")
+        self.daemon = True
+        self.lock = LeaderLock(name)
+        self.on_elected = on_elected
+        self.retry_interval = retry_interval or LEADER_RETRY_SECONDS
+
+    def run(self):
+        while not self.lock.acquire():
+            time.sleep(self.retry_interval)
+        logger.info("Process %s elected leader for %s.", os.getpid(), self.lock.path)
+        try:
+            self.on_elected()
+        except Exception as e:
+            logger.exception("Leader duty failed to start: %s", e)
+
+
+def run_as_leader(name, on_elected, retry_interval=None):
+    """Starts a LeaderElector for `name` and returns it."""
+    elector = LeaderElector(name, on_elected, retry_interval)
+    elector.start()
+    return elector
@@ -0,0 +1,217 @@
+import os
+import smtplib
+import threading
+import time
+import uuid
+from collections import defaultdict, deque
+from datetime import datetime, timedelta
+import logging
+import mysql.connector
+
+from ..database import get_db
+from ..utils.email import SmtpSession, build_message, smtp_configured
+
+logger = logging.getLogger(__name__)
+
+# --- Outbox Constants ---
+OUTBOX_BATCH_SIZE = int(os.getenv("OUTBOX_BATCH_SIZE", "50"))
+OUTBOX_MAX_ATTEMPTS = int(os.getenv("OUTBOX_MAX_ATTEMPTS", "6"))
+OUTBOX_BACKOFF_BASE_SECONDS = int(os.getenv("OUTBOX_BACKOFF_BASE_SECONDS", "60"))
+OUTBOX_BACKOFF_MAX_SECONDS = int(os.getenv("OUTBOX_BACKOFF_MAX_SECONDS", "21600"))
+OUTBOX_PER_HOST_PER_MINUTE = int(os.getenv("OUTBOX_PER_HOST_PER_MINUTE", "20"))
+# A row stuck in 'sending' this long belongs to a dispatcher that died mid-batch
+OUTBOX_CLAIM_TIMEOUT_SECONDS = int(os.getenv("OUTBOX_CLAIM_TIMEOUT_SECONDS", "900"))
+
+# Recent send times per recipient domain, shared by every dispatch in this process
+_host_sends = defaultdict(deque)
+_dispatch_lock = threading.Lock()
+
+
+def enqueue_email(cursor, recipient, report_key, report_date, subject, body,
+                  attachment=None, attachment_filename=None):
+    """
+    Adds a message to the outbox using the caller's cursor (caller commits).
+    (recipient, report_key, report_date) is unique, so re-queueing the same
+    report is a no-op. Returns True if a new row was written.
+    """
+    cursor.execute("""
+        INSERT IGNORE INTO EmailOutbox
+            (recipient, report_key, report_date, subject, body, attachment, attachment_filename)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, (recipient, report_key, report_date, subject, body, attachment, attachment_filename))
+    return cursor.rowcount == 1
+
+
+def enqueue_emails(cursor, messages):
+    """
+    Batched enqueue_email: `messages` is a list of
+    (recipient, report_key, report_date, subject, body, attachment, attachment_filename).
+    Duplicates are ignored. Returns the number of new rows.
+    """
+    if not messages:
+        return 0
+    cursor.executemany("""
+        INSERT IGNORE INTO EmailOutbox
+            (recipient, report_key, report_date, subject, body, attachment, attachment_filename)
+        VALUES (%s, %s, %s, %s, %s, %s, %s)
+    """, messages)
+    return cursor.rowcount
+
+
+def get_outbox_counts(cursor):
+    """Takes a dictionary cursor. Returns {'queued': n, 'sent': n, 'failed': n} for the admin dashboard."""
+    cursor.execute("SELECT status, COUNT(*) AS cnt FROM EmailOutbox GROUP BY status")
+    counts = {'queued': 0, 'sent': 0, 'failed': 0}
+    for row in cursor.fetchall():
+        # In-flight rows are still waiting to be delivered
+        key = 'queued' if row['status'] == 'sending' else row['status']
+        counts[key] += row['cnt']
+    return counts
+
+
+def _recipient_host(recipient):
+    return recipient.rsplit('@', 1)[-1].lower()
+
+
+def _host_wait(host, now):
+    """Seconds until `host` may receive another message (0 if allowed now)."""
+    if OUTBOX_PER_HOST_PER_MINUTE <= 0:
+        return 0
+    sends = _host_sends[host]
+    while sends and now - sends[0] >= 60:
+        sends.popleft()
+    if len(sends) < OUTBOX_PER_HOST_PER_MINUTE:
+        return 0
+    return 60 - (now - sends[0])
+
+
+def _backoff_seconds(attempts):
+    return min(OUTBOX_BACKOFF_BASE_SECONDS * (2 ** max(0, attempts - 1)), OUTBOX_BACKOFF_MAX_SECONDS)
+
+
+def _claim_batch(cursor, conn, batch_size):
+    token = uuid.uuid4().hex
+    cursor.execute("""
+        UPDATE EmailOutbox SET status = 'queued', claim_token = NULL
+        WHERE status = 'sending' AND claimed_at < %s
+    """, (datetime.now() - timedelta(seconds=OUTBOX_CLAIM_TIMEOUT_SECONDS),))
+    cursor.execute("""
+        UPDATE EmailOutbox SET status = 'sending', claim_token = %s, claimed_at = NOW()
+        WHERE status = 'queued' AND next_attempt_at <= NOW()
+        ORDER BY id
+        LIMIT %s
+    """, (token, batch_size))
+    conn.commit()
+
+    cursor.execute("""
+        SELECT id, recipient, subject, body, attachment, attachment_filename, attempts
+        FROM EmailOutbox WHERE claim_token = %s ORDER BY id
+    """, (token,))
+    return cursor.fetchall()
+
+
+def dispatch_outbox(batch_size=None):
+    """
+    Sends every due outbox message over batched SMTP sessions.
+    Failed sends are retried with exponential backoff until OUTBOX_MAX_ATTEMPTS.
+    Returns the number of messages sent.
+    """
+    if not smtp_configured():
+        logger.error("SMTP settings are not configured. Outbox not dispatched.")
+        return 0
+
+    batch_size = batch_size or OUTBOX_BATCH_SIZE
+    sent_total = 0
+
+    with _dispatch_lock:
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor(dictionary=True)
+
+            with SmtpSession() as session:
+                while True:
+                    rows = _claim_batch(cursor, conn, batch_size)
+                    if not rows:
+                        break
+
+                    deferred = 0
+                    for row in rows:
+                        host = _recipient_host(row['recipient'])
+                        wait = _host_wait(host, time.monotonic())
+                        if wait > 0:
+                            # Host is at its per-minute limit; hand the row back for later
+                            cursor.execute("""
+                                UPDATE EmailOutbox SET status = 'queued', claim_token = NULL, next_attempt_at = %s
+                                WHERE id = %s
+                            """, (datetime.now() + timedelta(seconds=wait), row['id']))
+                            conn.commit()
+                            deferred += 1
+                            continue
+
+                        message = build_message(row['recipient'], row['subject'], row['body'],
+                                                row['attachment'], row['attachment_filename'])
+                        try:
+                            session.send(message)
+                        except Exception as e:
+                            attempts = row['attempts'] + 1
+                            permanent = isinstance(e, smtplib.SMTPRecipientsRefused)
+                            if permanent or attempts >= OUTBOX_MAX_ATTEMPTS:
+                                logger.error("Giving up on outbox message %s to %s: %s", row['id'], row['recipient'], e)
+                                cursor.execute("""
+                                    UPDATE EmailOutbox SET status = 'failed', attempts = %s, last_error = %s, claim_token = NULL
+                                    WHERE id = %s
+                                """, (attempts, str(e)[:1000], row['id']))
+                            else:
+                                retry_at = datetime.now() + timedelta(seconds=_backoff_seconds(attempts))
+                                logger.warning("Outbox message %s to %s failed (attempt %s), retrying at %s: %s",
+                                               row['id'], row['recipient'], attempts, retry_at, e)
+                                cursor.execute("""
+                                    UPDATE EmailOutbox SET status = 'queued', attempts = %s, last_error = %s,
+                                        next_attempt_at = %s, claim_token = NULL
+                                    WHERE id = %s
+                                """, (attempts, str(e)[:1000], retry_at, row['id']))
+                            conn.commit()
+                            continue
+
+                        _host_sends[host].append(time.monotonic())
+                        cursor.execute("""
+                            UPDATE EmailOutbox SET status = 'sent', attempts = attempts + 1, sent_at = NOW(),
+                                last_error = NULL, claim_token = NULL
+                            WHERE id = %s
+                        """, (row['id'],))
+                        conn.commit()
+                        sent_total += 1
+                        logger.info("Sent outbox message %s to %s", row['id'], row['recipient'])
+
+                    # Everything left in this batch is rate limited; try again next run
+                    if deferred == len(rows):
+                        break
+
+        except mysql.connector.Error as e:
+            logger.exception("Database error while dispatching outbox: %s", e)
+        finally:
+            if conn:
+                conn.close()
+
+    if sent_total:
+        logger.info("Outbox dispatch finished. Sent %d message(s).", sent_total)
+    return sent_total
+
+
+class OutboxDispatcher(threading.Thread):
+    """Periodically drains the EmailOutbox so failed sends are retried without a rerun."""
+
+    def __init__(self, poll_interval=60):
+        super().__init__(name="outbox-dispatcher")
+        self.daemon = True
+        self.poll_interval = poll_interval
+
+    def run(self):
+        logger.info("Outbox dispatcher started.")
+        while True:
+            try:
+                dispatch_outbox()
+            except Exception as e:
+                logger.error(f"Outbox dispatcher error: {e}")
+            time.sleep(self.poll_interval)
@@ -0,0 +1,129 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError as FutureTimeoutError
+import logging
+import bcrypt
+
+from ..config import Config
+
+logger = logging.getLogger(__name__)
+
+# --- Password Hashing Constants (set in Config) ---
+# Work factor for new hashes; older hashes are upgraded on the next successful login
+BCRYPT_ROUNDS = Config.BCRYPT_ROUNDS
+PASSWORD_WORKERS = max(1, Config.PASSWORD_WORKERS)
+# Running plus waiting hashes; kept below the request thread count so other pages still get a thread
+PASSWORD_MAX_IN_FLIGHT = max(1, Config.WAITRESS_THREADS - max(1, Config.PASSWORD_RESERVED_THREADS))
+PASSWORD_TIMEOUT_SECONDS = Config.PASSWORD_TIMEOUT_SECONDS
+PASSWORD_RETRY_AFTER_SECONDS = Config.PASSWORD_RETRY_AFTER_SECONDS
+
+
+class HasherBusy(Exception):
+    """Raised when the password pool is full; callers should answer 503 with Retry-After."""
+
+    def __init__(self, retry_after=None):
+        self.retry_after = retry_after or PASSWORD_RETRY_AFTER_SECONDS
+        super().__init__(f"Password hashing is busy, retry in {self.retry_after}s")
+
+
+_executor = ThreadPoolExecutor(max_workers=PASSWORD_WORKERS, thread_name_prefix="bcrypt")
+# Admission control: running + waiting hashes never exceed PASSWORD_MAX_IN_FLIGHT
+_slots = threading.BoundedSemaphore(PASSWORD_MAX_IN_FLIGHT)
+
+_metrics_lock = threading.Lock()
+_metrics = {
+    "pending": 0,
+    "max_pending": 0,
+    "completed": 0,
+    "rejected": 0,
+    "timed_out": 0,
+    "wait_seconds_total": 0.0,
+    "hash_seconds_total": 0.0,
+    "hash_seconds_max": 0.0,
+}
+
+
+def _timed(submitted_at, fn, *args):
+    started = time.monotonic()
+    try:
+        return fn(*args)
+    finally:
+        finished = time.monotonic()
+        with _metrics_lock:
+            _metrics["completed"] += 1
+            _metrics["wait_seconds_total"] += started - submitted_at
+            _metrics["hash_seconds_total"] += finished - started
+            _metrics["hash_seconds_max"] = max(_metrics["hash_seconds_max"], finished - started)
+
+
+def _release(_future):
+    with _metrics_lock:
+        _metrics["pending"] -= 1
+    _slots.release()
+
+
+def _run(fn, *args):
+    """Runs `fn` on the bcrypt pool and waits for it, or raises HasherBusy if the pool is full."""
+    if not _slots.acquire(blocking=False):
+        with _metrics_lock:
+            _metrics["rejected"] += 1
+        logger.warning("Password pool full (%d in flight), rejecting request.", PASSWORD_MAX_IN_FLIGHT)
+        raise HasherBusy()
+
+    with _metrics_lock:
+        _metrics["pending"] += 1
+        _metrics["max_pending"] = max(_metrics["max_pending"], _metrics["pending"])
+    try:
+        future = _executor.submit(_timed, time.monotonic(), fn, *args)
+    except Exception:
+        _release(None)
+        raise
+    future.add_done_callback(_release)
+
+    try:
+        return future.result(timeout=PASSWORD_TIMEOUT_SECONDS)
+    except FutureTimeoutError:
+        with _metrics_lock:
+            _metrics["timed_out"] += 1
+        raise HasherBusy()
+
+
+def _hash(password, rounds):
+    return bcrypt.hashpw(password.encode(), bcrypt.gensalt(rounds)).decode()
+
+
+def _check(password, password_hash):
+    return bcrypt.checkpw(password.encode(), password_hash.encode())
+
+
+def hash_password(password, rounds=None):
+    """Hashes `password` at BCRYPT_ROUNDS on the bounded pool."""
+    return _run(_hash, password, rounds or BCRYPT_ROUNDS)
+
+
+def verify_password(password, password_hash):
+    """Checks `password` against a stored bcrypt hash on the bounded pool."""
+    if not password_hash:
+        return False
+    return _run(_check, password, password_hash)
+
+
+def needs_rehash(password_hash):
+    """True if `password_hash` was made with a work factor other than BCRYPT_ROUNDS."""
+    try:
+        return int(password_hash.split('$')[2]) != BCRYPT_ROUNDS
+    except (AttributeError, IndexError, ValueError):
+        return False
+
+
+def get_password_metrics():
+    """Snapshot of pool depth and hash latency for health checks and logs."""
+    with _metrics_lock:
+        snapshot = dict(_metrics)
+    completed = snapshot["completed"] or 1
+    snapshot["workers"] = PASSWORD_WORKERS
+    snapshot["max_in_flight"] = PASSWORD_MAX_IN_FLIGHT
+    snapshot["queued"] = max(0, snapshot["pending"] - PASSWORD_WORKERS)
+    snapshot["hash_seconds_avg"] = snapshot["hash_seconds_total"] / completed
+    snapshot["wait_seconds_avg"] = snapshot["wait_seconds_total"] / completed
+    return snapshot
@@ -0,0 +1,160 @@
+from datetime import datetime
+import logging
+
+from werkzeug.utils import secure_filename
+
+from ..database import get_db
+from ..utils.common import _get_class_rosters
+from ..utils.jobs import job_handler, JobResult
+
+logger = logging.getLogger(__name__)
+
+
+@job_handler('send_reports', roles=('admin',))
+def send_reports_job(ctx):
+    """Runs the daily teacher report mailer off the request thread."""
+    from ..utils.email import generate_and_send_reports
+
+    ctx.set_progress(5, "Generating reports")
+    generate_and_send_reports()
+
+
+@job_handler('parent_digest', roles=('admin',))
+def parent_digest_job(ctx, frequency=None):
+    """Queues and sends parent attendance digests; `frequency` overrides the setting."""
+    from ..utils.digest import send_parent_digests
+
+    ctx.set_progress(5, "Building parent digests")
+    send_parent_digests(frequency, force=frequency is not None)
+
+
+@job_handler('class_report', roles=('admin', 'teacher'))
+def class_report_job(ctx, class_name, date=None):
+    """Renders the class attendance report book for `class_name` on `date` (YYYY-MM-DD)."""
+    from ..utils.pdf import generate_class_attendance_pdf
+
+    report_date = datetime.strptime(date, "%Y-%m-%d").date() if date else datetime.today().date()
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        students = _get_class_rosters(cursor, [class_name], report_date)[class_name]
+    finally:
+        if conn:
+            conn.close()
+
+    ctx.set_progress(60, "Rendering PDF")
+    pdf_data = generate_class_attendance_pdf(class_name, students, report_date)
+    filename = secure_filename(f"{class_name}_attendance_{report_date}.pdf")
+    return JobResult(pdf_data, "application/pdf", filename)
+
+
+# Per-student exports. They have no HTTP roles: the dashboard routes check access to
+# the student, then queue the job themselves and send the user to the wait page.
+
+def _fetch_student(cursor, student_id):
+    cursor.execute("SELECT * FROM Users WHERE id = %s", (student_id,))
+    student = cursor.fetchone()
+    if not student:
+        raise LookupError(f"Student {student_id} not found")
+    return student
+
+
+@job_handler('student_attendance_pdf', roles=())
+def student_attendance_pdf_job(ctx, student_id):
+    """Renders a student's attendance for the last 30 days."""
+    from ..utils.pdf import generate_attendance_pdf
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        student = _fetch_student(cursor, student_id)
+        cursor.execute("""
+            SELECT DATE(timestamp) as date, COUNT(*) as scan_count,
+                   MIN(TIME(timestamp)) as first_scan, MAX(TIME(timestamp)) as last_scan
+            FROM FingerprintLogs
+            WHERE person_type = 'student' AND person_id = %s
+            AND timestamp >= DATE_SUB(NOW(), INTERVAL 30 DAY)
+            GROUP BY DATE(timestamp)
+            ORDER BY date DESC
+        """, (student_id,))
+        attendance_logs = cursor.fetchall()
+    finally:
+        if conn:
+            conn.close()
+
+    ctx.set_progress(60, "Rendering PDF")
+    return JobResult(generate_attendance_pdf(student, attendance_logs), "application/pdf",
+                     f"student_{student_id}_attendance.pdf")
+
+
+@job_handler('student_audit_pdf', roles=())
+def student_audit_pdf_job(ctx, student_id, filename=None):
+    """Renders a student's clearance (audit) report."""
+    from ..utils.pdf import generate_audit_report_pdf
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        student = _fetch_student(cursor, student_id)
+        cursor.execute("""
+            SELECT s.name as subject_name, sa.status, sa.notes
+            FROM StudentAudit sa
+            JOIN Subjects s ON sa.subject_id = s.id
+            WHERE sa.student_id = %s
+            ORDER BY s.name
+        """, (student_id,))
+        audit_records = cursor.fetchall()
+    finally:
+        if conn:
+            conn.close()
+
+    ctx.set_progress(60, "Rendering PDF")
+    return JobResult(generate_audit_report_pdf(student, audit_records), "application/pdf",
+                     secure_filename(filename or f"student_{student_id}_clearance.pdf"))
+
+
+@job_handler('exam_results_pdf', roles=())
+def exam_results_pdf_job(ctx, student_id, term=None, exam_type=None, filename=None):
+    """Renders a student's exam results, optionally for one term and/or exam type."""
+    from ..utils.pdf import generate_exam_results_pdf
+
+    query = """
+        SELECT er.exam_type, er.term, s.name as subject_name, er.score, er.max_score, er.grade, er.remarks
+        FROM ExamResults er
+        JOIN Subjects s ON er.subject_id = s.id
+        WHERE er.student_id = %s
+    """
+    params = [student_id]
+    if term:
+        query += " AND er.term = %s"
+        params.append(term)
+    if exam_type:
+        query += " AND er.exam_type = %s"
+        params.append(exam_type)
+    query += " ORDER BY er.term DESC, er.exam_type ASC"
+
+    conn = None
+    try:
+        conn = get_db()
+        cursor = conn.cursor(dictionary=True)
+        student = _fetch_student(cursor, student_id)
+        cursor.execute(query, tuple(params))
+        exam_results = cursor.fetchall()
+    finally:
+        if conn:
+            conn.close()
+
+    if not filename:
+        filename = f"results_{student['name'].replace(' ', '_')}"
+        if term:
+            filename += f"_{term.replace(' ', '_')}"
+        if exam_type:
+            filename += f"_{exam_type.replace(' ', '_')}"
+        filename += ".pdf"
+
+    ctx.set_progress(60, "Rendering PDF")
+    return JobResult(generate_exam_results_pdf(student, exam_results), "application/pdf", secure_filename(filename))
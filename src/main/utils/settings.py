@@ -0,0 +1,148 @@
+import time
+import threading
+import logging
+import mysql.connector
+
+from ..config import Config
+from ..database import get_db
+
+logger = logging.getLogger(__name__)
+
+_version_missing_logged = False
+
+
+def bump_settings_version(cursor):
+    """Marks Settings as changed, using the caller's cursor (caller commits with the write)."""
+    global _version_missing_logged
+    try:
+        cursor.execute("UPDATE SettingsVersion SET version = version + 1 WHERE id = 1")
+    except mysql.connector.Error as err:
+        if err.errno != 1146:  # No such table
+            raise
+        # Not migrated yet: readers reload the whole table on every poll, so the write is still seen
+        if not _version_missing_logged:
+            logger.warning("SettingsVersion missing; run scripts/migrate_settings_version.py.")
+            _version_missing_logged = True
+
+
+def write_setting(cursor, key, value):
+    """Upserts one setting and bumps the change counter. The caller commits, then calls invalidate()."""
+    cursor.execute(
+        "INSERT INTO Settings (`key`, `value`) VALUES (%s, %s) ON DUPLICATE KEY UPDATE `value` = %s",
+        (key, value, value)
+    )
+    bump_settings_version(cursor)
+
+
+class SettingsCache(threading.Thread):
+    """
+    In-process copy of the Settings table. A poller thread reads the
+    SettingsVersion counter every poll_seconds (SETTINGS_POLL_SECONDS) and reloads the table
+    when it moves, then calls the subscribers of every key whose value changed.
+    """
+
+    def __init__(self, poll_seconds=Config.SETTINGS_POLL_SECONDS):
+        super().__init__(name="settings-cache")
+        self.daemon = True
+        self.poll_seconds = poll_seconds
+        self._values = {}
+        self._version = None
+        self._loaded = False
+        self._subscribers = {}  # key -> [callback(value)]
+        self._lock = threading.Lock()
+        self._refresh_lock = threading.Lock()  # one reload at a time: poller vs invalidate()
+        self._version_error_logged = False
+
+    def get(self, key, default=None):
+        if not self._loaded:
+            self.refresh()
+        value = self._values.get(key)
+        return default if value is None else value
+
+    def subscribe(self, key, callback, fire_now=True):
+        """Calls callback(value) whenever `key` changes (value is None when the row is deleted)."""
+        value = self.get(key)  # loads the cache first, so the first load doesn't fire as a change
+        with self._lock:
+            self._subscribers.setdefault(key, []).append(callback)
+        if fire_now:
+            self._notify(key, callback, value)
+
+    def _notify(self, key, callback, value):
+        try:
+            callback(value)
+        except Exception as e:
+            logger.error("Settings subscriber for %s failed: %s", key, e)
+
+    def invalidate(self):
+        """Picks up a write made by this process now instead of at the next poll."""
+        self.refresh(force=True)
+
+    def _read_version(self, cursor):
+        try:
+            cursor.execute("SELECT version FROM SettingsVersion WHERE id = 1")
+            row = cursor.fetchone()
+            return row[0] if row else None
+        except mysql.connector.Error as e:
+            # Not migrated yet: fall back to reloading the table on every poll
+            if not self._version_error_logged:
+                logger.warning("SettingsVersion unavailable (%s); polling the Settings table instead.", e)
+                self._version_error_logged = True
+            return None
+
+    def refresh(self, force=False):
+        """Reloads Settings if the change counter moved. Returns the keys that changed."""
+        with self._refresh_lock:
+            return self._refresh(force)
+
+    def _refresh(self, force):
+        conn = None
+        try:
+            conn = get_db()
+            cursor = conn.cursor()
+            version = self._read_version(cursor)
+            if self._loaded and not force and version is not None and version == self._version:
+                return []
+            cursor.execute("SELECT `key`, `value` FROM Settings")
+            values = dict(cursor.fetchall())
+        except mysql.connector.Error as e:
+            logger.error("Failed to load settings: %s", e)
+            return []
+        finally:
+            if conn:
+                conn.close()
+
+        with self._lock:
+            previous, self._values = self._values, values
+            self._version = version
+            first_load = not self._loaded
+            self._loaded = True
+            changed = [k for k in set(previous) | set(values) if previous.get(k) != values.get(k)]
+            callbacks = [(k, cb) for k in changed for cb in self._subscribers.get(k, [])]
+        if changed and not first_load:
+            logger.info("Settings changed: %s", ", ".join(sorted(changed)))
+        for key, callback in callbacks:
+            self._notify(key, callback, values.get(key))
+        return changed
+
+    def run(self):
+        while True:
+            time.sleep(self.poll_seconds)
+            try:
+                self.refresh()
+            except Exception as e:
+                logger.error("Settings poller error: %s", e)
+
+
+_settings = None
+_settings_lock = threading.Lock()
+
+
+def get_settings():
+    """The process-wide SettingsCache, loaded and polling from first use."""
+    global _settings
+    with _settings_lock:
+        if _settings is None:
+            _settings = SettingsCache()
+            _settings.refresh()
+            _settings.start()
+    return _settings
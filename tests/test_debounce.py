@@ -0,0 +1,58 @@
+import unittest
+
+from src.main.hardware.debounce import ExpiringSet
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        self.params = params
+
+    def fetchall(self):
+        return self.rows
+
+
+class ExpiringSetTest(unittest.TestCase):
+    def test_check_and_add(self):
+        seen = ExpiringSet(window=60)
+        self.assertFalse(seen.check_and_add(('student', 1)))
+        self.assertTrue(seen.check_and_add(('student', 1)))
+        self.assertFalse(seen.check_and_add(('teacher', 1)))
+        self.assertEqual(len(seen), 2)
+
+    def test_members_expire(self):
+        seen = ExpiringSet(window=60)
+        seen.add(('student', 1), remaining=0)
+        self.assertNotIn(('student', 1), seen)
+        self.assertFalse(seen.check_and_add(('student', 1)))
+        self.assertIn(('student', 1), seen)
+
+    def test_re_adding_extends_the_window(self):
+        seen = ExpiringSet(window=60)
+        seen.add(('student', 1), remaining=0)
+        seen.add(('student', 1))
+        # The stale heap entry for the first add must not evict the second
+        self.assertIn(('student', 1), seen)
+
+    def test_max_entries_evicts_the_oldest(self):
+        seen = ExpiringSet(window=60, max_entries=2)
+        seen.add('a', remaining=10)
+        seen.add('b', remaining=20)
+        seen.add('c', remaining=30)
+        self.assertEqual(len(seen), 2)
+        self.assertNotIn('a', seen)
+        self.assertIn('c', seen)
+
+    def test_seed_from_logs_keeps_the_time_left(self):
+        seen = ExpiringSet(window=60)
+        cursor = FakeCursor([('student', 1, 10.0), ('student', 2, 75.0)])
+        self.assertEqual(seen.seed_from_logs(cursor), 2)
+        self.assertEqual(cursor.params, (61,))
+        self.assertIn(('student', 1), seen)
+        self.assertNotIn(('student', 2), seen)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,71 @@
+import heapq
+import unittest
+
+from src.main.hardware.feedback import FeedbackDispatcher, ACCEPTED, REJECTED, DEBOUNCED
+
+
+class FakeScanner:
+    def __init__(self):
+        self.on = set()  # (device_index, indicator)
+
+    def set_indicator(self, device_index, indicator, on):
+        (self.on.add if on else self.on.discard)((device_index, indicator))
+
+
+class FeedbackDispatcherTest(unittest.TestCase):
+    """Drives the worker's steps directly instead of starting its thread."""
+
+    def setUp(self):
+        self.scanner = FakeScanner()
+        self.feedback = FeedbackDispatcher(self.scanner, queue_size=2)
+
+    def fire_timers(self, count=None):
+        """Runs the earliest `count` off-timers (all by default), as the worker does when they fall due."""
+        timers = self.feedback._timers
+        for _ in range(len(timers) if count is None else count):
+            _, _, device_index, indicator, generation = heapq.heappop(timers)
+            self.feedback._off(device_index, indicator, generation)
+
+    def test_emit_coalesces_per_reader(self):
+        self.feedback.emit(0, REJECTED)
+        self.feedback.emit(0, ACCEPTED)
+        self.assertEqual(list(self.feedback._pending.items()), [(0, ACCEPTED)])
+        self.assertEqual(self.feedback.stats["coalesced"], 1)
+
+    def test_emit_drops_the_oldest_when_full(self):
+        for device_index in range(3):
+            self.feedback.emit(device_index, ACCEPTED)
+        self.assertEqual(list(self.feedback._pending), [1, 2])
+        self.assertEqual(self.feedback.stats["dropped"], 1)
+
+    def test_timer_turns_the_led_off(self):
+        self.feedback._show(0, ACCEPTED)
+        self.assertEqual(self.scanner.on, {(0, 'green')})
+        self.fire_timers()
+        self.assertEqual(self.scanner.on, set())
+
+    def test_stale_timer_leaves_a_re_lit_led_on(self):
+        self.feedback._show(0, ACCEPTED)
+        self.feedback._show(0, ACCEPTED)
+        self.fire_timers(1)  # the first scan's timer
+        self.assertEqual(self.scanner.on, {(0, 'green')})
+        self.fire_timers(1)
+        self.assertEqual(self.scanner.on, set())
+
+    def test_new_outcome_replaces_the_old_one(self):
+        self.feedback._show(0, ACCEPTED)
+        self.feedback._show(0, REJECTED)
+        self.assertEqual(self.scanner.on, {(0, 'red')})
+        self.fire_timers()
+        self.assertEqual(self.scanner.on, set())
+
+    def test_readers_are_independent(self):
+        self.feedback._show(0, ACCEPTED)
+        self.feedback._show(1, DEBOUNCED)
+        self.feedback._show(0, REJECTED)
+        self.fire_timers(2)  # reader 0's stale timer and reader 1's timer
+        self.assertEqual(self.scanner.on, {(0, 'red')})
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,76 @@
+import unittest
+from datetime import datetime, timedelta
+
+from src.main.hardware.poller import (
+    AdaptivePoller, ArrivalWindows, parse_windows, ERROR_BACKOFF_MAX_SECONDS,
+)
+
+
+class FakeCursor:
+    def __init__(self, rows):
+        self.rows = rows
+
+    def execute(self, query, params=None):
+        pass
+
+    def fetchall(self):
+        return self.rows
+
+
+class ArrivalWindowsTest(unittest.TestCase):
+    def test_parse_windows(self):
+        self.assertEqual(parse_windows("06:30-08:00, 15:30-17:00,"), [(390, 480), (930, 1020)])
+        self.assertEqual(parse_windows(""), [])
+
+    def test_daily_windows(self):
+        windows = ArrivalWindows("06:30-08:00")
+        self.assertTrue(windows.active(datetime(2026, 10, 19, 7, 0)))
+        self.assertFalse(windows.active(datetime(2026, 10, 19, 8, 0)))
+
+    def test_timetable_windows(self):
+        windows = ArrivalWindows("")
+        windows.load_timetable(FakeCursor([("Monday", timedelta(hours=8), timedelta(hours=15))]))
+        monday, tuesday = datetime(2026, 10, 19, 7, 30), datetime(2026, 10, 20, 7, 30)
+        self.assertTrue(windows.active(monday))
+        self.assertFalse(windows.active(tuesday))
+        self.assertTrue(windows.active(monday.replace(hour=15, minute=20)))
+
+
+class AdaptivePollerTest(unittest.TestCase):
+    def test_backs_off_when_idle(self):
+        poller = AdaptivePoller(min_ms=20, max_ms=100, backoff=2, hot_seconds=15)
+        self.assertAlmostEqual(poller.idle(), 0.04)
+        self.assertAlmostEqual(poller.idle(), 0.08)
+        self.assertAlmostEqual(poller.idle(), 0.1)
+        self.assertAlmostEqual(poller.idle(), 0.1)
+
+    def test_activity_polls_fast(self):
+        poller = AdaptivePoller(min_ms=20, max_ms=100, backoff=2, hot_seconds=15)
+        for _ in range(5):
+            poller.idle()
+        poller.activity()
+        self.assertTrue(poller.hot())
+        self.assertAlmostEqual(poller.idle(), 0.02)
+
+    def test_hot_expires(self):
+        poller = AdaptivePoller(min_ms=20, max_ms=100, backoff=2, hot_seconds=0)
+        poller.activity()
+        self.assertFalse(poller.hot())
+        self.assertAlmostEqual(poller.idle(), 0.04)
+
+    def test_arrival_window_polls_fast(self):
+        poller = AdaptivePoller(ArrivalWindows("00:00-24:00"), min_ms=20, max_ms=100, backoff=2)
+        self.assertAlmostEqual(poller.idle(), 0.02)
+        self.assertAlmostEqual(poller.idle(), 0.02)
+
+    def test_errors_back_off_until_a_finger(self):
+        poller = AdaptivePoller(min_ms=20, max_ms=100)
+        delays = [poller.failed() for _ in range(6)]
+        self.assertEqual(delays[:3], [0.1, 0.2, 0.4])
+        self.assertEqual(delays[-1], ERROR_BACKOFF_MAX_SECONDS)
+        poller.activity()
+        self.assertEqual(poller.failed(), 0.1)
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,63 @@
+import time
+import unittest
+
+from src.main.hardware.recent import RecentMatches
+
+
+def exact(stored, scanned):
+    return 100 if stored == scanned else 0
+
+
+class RecentMatchesTest(unittest.TestCase):
+    def test_hit_and_miss(self):
+        recent = RecentMatches(size=4, ttl=60, min_score=90)
+        recent.add(b'alice', 'student_1')
+        self.assertEqual(recent.lookup(b'alice', exact), 'student_1')
+        self.assertIsNone(recent.lookup(b'bob', exact))
+        self.assertEqual((recent.hits, recent.misses), (1, 1))
+
+    def test_min_score(self):
+        recent = RecentMatches(size=4, ttl=60, min_score=90)
+        recent.add(b'alice', 'student_1')
+        self.assertIsNone(recent.lookup(b'alice', lambda stored, scanned: 89))
+        self.assertEqual(recent.lookup(b'alice', lambda stored, scanned: 90), 'student_1')
+
+    def test_newest_match_wins(self):
+        recent = RecentMatches(size=4, ttl=60, min_score=90)
+        recent.add(b'alice', 'student_1')
+        recent.add(b'alice', 'student_2')
+        self.assertEqual(recent.lookup(b'alice', exact), 'student_2')
+
+    def test_size_bound(self):
+        recent = RecentMatches(size=2, ttl=60, min_score=90)
+        for template in (b'a', b'b', b'c'):
+            recent.add(template, template.decode())
+        self.assertIsNone(recent.lookup(b'a', exact))
+        self.assertEqual(recent.lookup(b'c', exact), 'c')
+
+    def test_entries_expire(self):
+        recent = RecentMatches(size=4, ttl=0.05, min_score=90)
+        recent.add(b'alice', 'student_1')
+        time.sleep(0.1)
+        self.assertIsNone(recent.lookup(b'alice', exact))
+
+    def test_matcher_errors_are_skipped(self):
+        recent = RecentMatches(size=4, ttl=60, min_score=90)
+        recent.add(b'alice', 'student_1')
+        recent.add(b'broken', 'student_2')
+
+        def match(stored, scanned):
+            if stored == b'broken':
+                raise RuntimeError("bad template")
+            return exact(stored, scanned)
+
+        self.assertEqual(recent.lookup(b'alice', match), 'student_1')
+
+    def test_disabled(self):
+        recent = RecentMatches(size=4, ttl=0, min_score=90)
+        recent.add(b'alice', 'student_1')
+        self.assertIsNone(recent.lookup(b'alice', exact))
+
+
+if __name__ == '__main__':
+    unittest.main()
@@ -0,0 +1,100 @@
+import unittest
+
+from src.main.hardware import supervisor
+from src.main.hardware.simulator import SimulatedZKFP2
+from src.main.hardware.supervisor import DeviceSupervisor, CONNECTED, DEGRADED, RECONNECTING, BANNED
+
+
+class FakeScanner:
+    """The part of FingerprintScanner the supervisor calls. Reports one reader more than the simulator has."""
+
+    def __init__(self, extra=0):
+        self.extra = extra
+        self.devices = {}
+        self.resets = 0
+
+    def library_device_count(self):
+        return SimulatedZKFP2().GetDeviceCount() + self.extra
+
+    def attach_device(self, index, zk):
+        self.devices[index] = zk
+
+    def detach_device(self, index):
+        self.devices.pop(index, None)
+
+    def reset_library(self):
+        self.resets += 1
+
+
+class DeviceSupervisorTest(unittest.TestCase):
+    def make(self, extra=0):
+        scanner = FakeScanner(extra)
+        sup = DeviceSupervisor(scanner, SimulatedZKFP2)
+        # bootstrap() without starting the background thread
+        sup._enumerate()
+        sup._attempt_due()
+        return scanner, sup
+
+    def retry_now(self, sup, index):
+        sup.states[index].next_attempt = 0.0
+        sup._attempt_due()
+
+    def test_opens_every_reader(self):
+        scanner, sup = self.make()
+        self.assertEqual(sup.states[0].state, CONNECTED)
+        self.assertIn(0, scanner.devices)
+        self.assertTrue(sup.wait_ready(0, timeout=0))
+        self.assertTrue(sup.wait_ready(timeout=0))
+
+    def test_glitch_degrades_until_a_good_capture(self):
+        _, sup = self.make()
+        self.assertFalse(sup.glitch(0, "Capture failed"))
+        self.assertEqual(sup.states[0].state, DEGRADED)
+        sup.healthy(0)
+        self.assertEqual(sup.states[0].state, CONNECTED)
+        self.assertEqual(sup.states[0].glitches, 0)
+
+    def test_repeated_glitches_reconnect(self):
+        scanner, sup = self.make()
+        escalated = [sup.glitch(0, "Capture failed") for _ in range(supervisor.DEGRADED_ERROR_LIMIT)]
+        self.assertEqual(escalated[-1], True)
+        self.assertEqual(sup.states[0].state, RECONNECTING)
+        self.assertNotIn(0, scanner.devices)
+        self.assertFalse(sup.wait_ready(0, timeout=0))
+        self.assertFalse(sup.any_ready.is_set())
+
+    def test_lost_reader_reopens(self):
+        scanner, sup = self.make()
+        sup.lost(0, "Invalid Handle")
+        self.assertEqual(sup.states[0].state, RECONNECTING)
+        self.retry_now(sup, 0)
+        state = sup.states[0]
+        self.assertEqual(state.state, CONNECTED)
+        self.assertEqual(state.reconnects, 1)
+        self.assertIn(0, scanner.devices)
+        self.assertTrue(sup.any_ready.is_set())
+
+    def test_failed_opens_back_off_then_ban(self):
+        _, sup = self.make(extra=1)
+        state = sup.states[1]
+        self.assertEqual(state.state, RECONNECTING)
+        self.assertEqual(state.failures, 1)
+        self.assertGreater(state.next_attempt, 0)
+        for _ in range(supervisor.BAN_AFTER_FAILURES - 1):
+            self.retry_now(sup, 1)
+        self.assertEqual(state.state, BANNED)
+        self.assertEqual(sup.banned_indices(), {1})
+        # The other reader is unaffected
+        self.assertEqual(sup.states[0].state, CONNECTED)
+
+    def test_snapshot(self):
+        _, sup = self.make()
+        sup.lost(0, "Invalid Handle")
+        snap = sup.snapshot()
+        self.assertEqual([s["index"] for s in snap], [0])
+        self.assertEqual(snap[0]["state"], RECONNECTING)
+        self.assertEqual(snap[0]["last_error"], "Invalid Handle")
+
+
+if __name__ == '__main__':
+    unittest.main()
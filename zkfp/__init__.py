@@ -1 +1,5 @@
-from pyzkfp.zkfp2 import ZKFP2
+try:
+    from .zkfp2 import ZKFP2
+except ImportError:
+    # Vendored wrapper unavailable (e.g. its DLL path); fall back to the pip package
+    from pyzkfp.zkfp2 import ZKFP2
@@ -8,8 +8,8 @@ sys.path.append(os.path.join(dir_path, "dll"))
 
 import clr
 
-from pyzkfp._construct.errors_handler import *
-from pyzkfp._construct.zkfp import * # this file adds code snippets hints. 
+from ._construct.errors_handler import *
+from ._construct.zkfp import * # this file adds code snippets hints. 
 
 try:
     from PIL import Image
@@ -24,6 +24,10 @@ clr.AddReference("System")
 
 from System import Array, Byte # ignore the warning
 
+TEMPLATE_BUFFER_SIZE = 1024*2
+# SetParameters codes for the reader's LEDs and buzzer
+INDICATOR_CODES = {"white": 101, "green": 102, "red": 103, "beep": 104}
+
 from libzkfpcsharp import * # here too
 
 
@@ -46,6 +50,9 @@ class ZKFP2:
         self.width = None
         self.height = None
 
+        # Capture buffers, allocated once per open device handle and reused by every poll
+        self._buffers = {}
+
 
     def _handle_error(self, err_code):
         error_mapping = {
@@ -123,10 +130,37 @@ class ZKFP2:
         self.height = self._zkfp.imageHeight
 
         self.DBInit()
+        self._allocate_buffers()
 
         return self.devHandle
 
 
+    def _allocate_buffers(self):
+        """
+        Preallocate the image and template arrays for the open handle, so polling
+        doesn't allocate two .NET arrays per call.
+        """
+        self._buffers[self.devHandle] = (Array[Byte](self.width * self.height), Array[Byte](TEMPLATE_BUFFER_SIZE))
+
+
+    def _capture_buffers(self):
+        if self.devHandle is None:
+            raise DeviceNotInitializedError("Device not initialized.")
+        buffers = self._buffers.get(self.devHandle)
+        if buffers is None:
+            self._allocate_buffers()
+            buffers = self._buffers[self.devHandle]
+        return buffers
+
+
+    @staticmethod
+    def _view(buffer, size):
+        try:
+            return memoryview(buffer)[:size]
+        except TypeError: # pythonnet 2 arrays don't expose the buffer protocol
+            return bytes(buffer)[:size]
+
+
     def CloseDevice(self) -> None:
         """
         Shut down a device.
@@ -135,6 +169,7 @@ class ZKFP2:
             raise DeviceNotInitializedError("Device not initialized.")
 
         ret = self.zkfp2.CloseDevice(self.devHandle)
+        self._buffers.pop(self.devHandle, None)
         self._handle_error(ret)
 
 
@@ -174,34 +209,47 @@ class ZKFP2:
         return paramValue
 
 
-    def AcquireFingerprint(self) -> tuple[Array[Byte], bytes]:
+    def AcquireTemplate(self) -> memoryview:
         """
-        Capture a fingerprint image and template.
+        Capture a fingerprint template without copying the image out of the SDK.
 
-        Args:
-            `size` (int): Template array length.
+        Reuses the handle's preallocated buffers. The returned view is sized to the
+        template and is only valid until the next acquire on this handle; copy it
+        with bytes() to keep it.
 
         Returns:
-            if result == 0:
-                bytes: Template data.
-                bytes: Image data.
-            else: None.
+            memoryview: Template data, or None when no finger is on the sensor.
         """
-        if self.devHandle is None:
-            raise DeviceNotInitializedError("Device not initialized.")
-
-        imgBuffer = Array[Byte](self.width * self.height)
-        template = Array[Byte](1024*2)  
-        size = template.Length
+        imgBuffer, template = self._capture_buffers()
 
-        ret, size = self.zkfp2.AcquireFingerprint(self.devHandle, imgBuffer, template, size)
+        ret, size = self.zkfp2.AcquireFingerprint(self.devHandle, imgBuffer, template, template.Length)
         if ret == 0: # only return when ther is a fingerprint captured
-            return template, bytes(imgBuffer)
+            return self._view(template, size)
 
         if ret != -8: 
             self._handle_error(ret) # something went wrong => raise error
 
 
+    def AcquireFingerprint(self, with_image: bool = True) -> tuple[memoryview, bytes]:
+        """
+        Capture a fingerprint image and template.
+
+        Args:
+            `with_image` (bool): Copy the image out of the SDK buffer. When False,
+            the image is returned as None.
+
+        Returns:
+            if result == 0:
+                memoryview: Template data (see AcquireTemplate).
+                bytes: Image data.
+            else: None.
+        """
+        template = self.AcquireTemplate()
+        if template is not None:
+            imgBuffer, _ = self._buffers[self.devHandle]
+            return template, bytes(imgBuffer) if with_image else None
+
+
     def AcquireFingerprintImage(self) -> bytes:
         """
         Capture a fingerprint image.
@@ -212,10 +260,7 @@ class ZKFP2:
         Returns:
             bytes: Image data.
         """
-        imgBuffer = Array[Byte](self.width * self.height)
-
-        if self.devHandle is None:
-            raise DeviceNotInitializedError("Device not initialized.")
+        imgBuffer, _ = self._capture_buffers()
 
         ret = self.zkfp2.AcquireFingerprintImage(self.devHandle, imgBuffer)
 
@@ -267,7 +312,8 @@ class ZKFP2:
 
         regTemp = Array[Byte](1024*2)
         regTempLen = len(regTemp)
-        ret = self.zkfp2.DBMerge(self.dbHandle, temp1, temp2, temp3, regTemp, regTempLen)
+        # pythonnet returns the `ref int` length alongside the return code
+        ret, regTempLen = self.zkfp2.DBMerge(self.dbHandle, temp1, temp2, temp3, regTemp, regTempLen)
         self._handle_error(ret)
         return regTemp, regTempLen
 
@@ -442,15 +488,30 @@ class ZKFP2:
         return template
 
 
+    def SetIndicator(self, name, on=True):
+        """
+        Switch one of the reader's indicators on or off, synchronously.
+
+        Args:
+            name (str): "white", "green", "red" (LEDs) or "beep" (buzzer).
+            on (bool): Whether to turn it on.
+        """
+        if name not in INDICATOR_CODES:
+            raise ValueError(f"Invalid indicator: {name}")
+        if on:
+            self.SetParameters(INDICATOR_CODES[name])
+        else:
+            self.SetParameters(INDICATOR_CODES[name], self.Int2ByteArray(0))
+
+
     def Light(self, color, duration=0.5):
         def light_thread():
-            colors_translation = {"white": 101, "green": 102, "red": 103}
-            if color not in colors_translation:
+            if color not in ("white", "green", "red"):
                 raise ValueError(f"Invalid color: {color}")
 
-            self.SetParameters(colors_translation[color])
+            self.SetIndicator(color, True)
             sleep(duration)
-            self.SetParameters(colors_translation[color], self.Int2ByteArray(0)) 
+            self.SetIndicator(color, False)
 
             # !NOTE: for some reason, the light doesn't turn off when set to 0.
             # I haven't tested it on other devices besides the SLK20R. 